@@ -0,0 +1,80 @@
+"""
+Admin List View Benchmark
+Seeds user_votes and times the admin vote list against Flask-Admin's stock
+ModelView (COUNT(*) plus LIMIT/OFFSET): the first page, paging forward
+deep into the table, and a page filtered by prompt_id.
+
+Usage: python benchmarks/bench_admin.py [--votes N] [--pages N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_admin.contrib.sqla import ModelView
+
+from src import db
+from src.admin.models import Vote
+from src.admin.views import VoteView, create_session
+from src.main import initialize_database
+from src.skills.collect_votes import insert_votes, _vote_row
+
+CHUNK_SIZE = 10000
+
+
+class StockVoteView(ModelView):
+    column_default_sort = ('timestamp', True)
+    column_filters = ['prompt_id']
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def run(votes, pages):
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        db.configure(db_path)
+        initialize_database()
+        for start in range(0, votes, CHUNK_SIZE):
+            insert_votes([_vote_row(f"prompt{rng.randrange(1000)}", f"user{i}", 1 + i % 5)
+                          for i in range(start, min(votes, start + CHUNK_SIZE))])
+        db.get_connection().execute("ANALYZE")
+
+        session = create_session(db_path)
+        views = {'stock': StockVoteView(Vote, session, endpoint='stock'),
+                 'keyset': VoteView(Vote, session, endpoint='keyset')}
+        # Flask-Admin filter arguments (index, name, value): stock filter 0 is prompt_id "contains"
+        prompt_filters = {'stock': [(0, 'contains', 'prompt7')], 'keyset': [(0, 'equals', 'prompt7')]}
+        results = {}
+        for name, view in views.items():
+            view.count_ttl = 0  # time the count itself on every page
+            results[name] = {
+                'first page': timed(lambda: view.get_list(0, None, None, None, None)),
+                f"pages 1-{pages}": timed(lambda: [view.get_list(page, None, None, None, None)
+                                                   for page in range(1, pages + 1)]) / pages,
+                'filtered page': timed(lambda: view.get_list(0, None, None, None, prompt_filters[name])),
+            }
+            session.remove()
+        db.configure(None)
+
+    print(f"{'ms per page':<20}{'stock':>10}{'keyset':>10}")
+    for case in results['stock']:
+        print(f"{case:<20}{results['stock'][case]:>10.2f}{results['keyset'][case]:>10.2f}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--votes', type=int, default=500000)
+    parser.add_argument('--pages', type=int, default=200)
+    args = parser.parse_args()
+    run(args.votes, args.pages)
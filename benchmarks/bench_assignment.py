@@ -0,0 +1,67 @@
+"""
+Variant Assignment Micro-benchmark
+Measures per-call latency of snapshot-based variant assignment against the
+per-request DB lookup each service ran before.
+
+Usage: python benchmarks/bench_assignment.py [--calls N]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.main import initialize_database
+from src.skills.assign_variant import assign_variant
+from src.skills.run_ab_test import run_ab_test
+
+
+def db_assign(test_id, user_id):
+    """Assignment with a DB query per request"""
+    row = db.get_connection().execute(
+        "SELECT variant_a_id, variant_b_id FROM ab_tests WHERE id = ? AND status = 'running'", (test_id,)
+    ).fetchone()
+    digest = hashlib.blake2b(f"{test_id}:{user_id}".encode(), digest_size=8).digest()
+    return row[int.from_bytes(digest, 'big') % 2]
+
+
+def measure(func, test_id, calls):
+    """Return mean microseconds per call"""
+    start = time.perf_counter()
+    for i in range(calls):
+        func(test_id, f"user-{i}")
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run(calls):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'bench.db'))
+        initialize_database()
+        test_id = run_ab_test(
+            {'name': 'bench', 'sample_size': 1000, 'duration_days': 7, 'traffic_split': 30},
+            'variant-a', 'variant-b'
+        )['test_id']
+        assign_variant(test_id, 'warmup')
+
+        results = {
+            'db_lookup': measure(db_assign, test_id, calls),
+            'snapshot': measure(assign_variant, test_id, calls),
+        }
+        db.configure(None)
+
+    print(f"{'method':<12}{'us/call':>10}{'calls/s':>14}")
+    for name, micros in results.items():
+        print(f"{name:<12}{micros:>10.2f}{1e6 / micros:>14.0f}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+    run(args.calls)
@@ -0,0 +1,87 @@
+"""
+Bulk Transfer Benchmark
+Imports templates and votes from gzip-compressed JSONL in batched
+transactions, compares the rate with creating the same records one request
+at a time, and times streaming the tables back out.
+
+Usage: python benchmarks/bench_bulk.py [--rows N] [--batch-size N]
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.main import initialize_database
+from src.skills.bulk_transfer import export_jsonl, import_jsonl
+from src.skills.collect_votes import collect_votes
+from src.skills.manage_templates import manage_templates
+
+# Per-row creates are slow; their rate is measured on a sample this size
+PER_ROW_SAMPLE = 2000
+
+
+def dataset(kind, rows):
+    if kind == 'templates':
+        records = ({'name': f"bulk {i}", 'description': '', 'content': f"Hello {{name}}, request {i}"} for i in range(rows))
+    else:
+        records = ({'prompt_id': f"prompt-{i % 1000}", 'user_id': f"user{i}", 'score': 1 + i % 5} for i in range(rows))
+    return gzip.compress(''.join(json.dumps(record) + '\n' for record in records).encode())
+
+
+def per_row(kind, rows):
+    start = time.perf_counter()
+    for i in range(rows):
+        if kind == 'templates':
+            manage_templates('create', {'name': f"row {i}", 'description': '', 'content': f"Hello {{name}}, row {i}"})
+        else:
+            collect_votes(f"prompt-{i % 1000}", f"row-user{i}", 1 + i % 5)
+    return rows / (time.perf_counter() - start)
+
+
+def run(rows, batch_size=None):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'bench.db'))
+        initialize_database()
+        try:
+            for kind in ('templates', 'votes'):
+                data = dataset(kind, rows)
+                start = time.perf_counter()
+                stats = import_jsonl(kind, io.BytesIO(data), batch_size)
+                import_rate = stats['imported'] / (time.perf_counter() - start)
+
+                start = time.perf_counter()
+                size = sum(len(chunk) for chunk in export_jsonl(kind, compress=True))
+                export_seconds = time.perf_counter() - start
+
+                results[kind] = {
+                    'bulk rows/s': import_rate,
+                    'per-row rows/s': per_row(kind, min(rows, PER_ROW_SAMPLE)),
+                    'export s': export_seconds,
+                    'export MB': size / 1e6,
+                }
+        finally:
+            db.configure(None)
+
+    print(f"{'kind':<11}{'bulk rows/s':>13}{'per-row rows/s':>16}{'speedup':>9}{'export s':>10}{'gzip MB':>9}")
+    for kind, result in results.items():
+        speedup = result['bulk rows/s'] / result['per-row rows/s']
+        print(f"{kind:<11}{result['bulk rows/s']:>13.0f}{result['per-row rows/s']:>16.0f}{speedup:>8.1f}x"
+              f"{result['export s']:>10.2f}{result['export MB']:>9.1f}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int)
+    args = parser.parse_args()
+    run(args.rows, args.batch_size)
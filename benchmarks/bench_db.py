@@ -0,0 +1,88 @@
+"""
+Connection Layer Benchmark
+Compares per-call sqlite3.connect (the old skill pattern) against the shared
+connection layer in src.db, reporting requests per second for each.
+
+Usage: python benchmarks/bench_db.py [--requests N]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.main import initialize_database
+from src.skills.collect_votes import collect_votes
+from src.skills.manage_templates import manage_templates
+
+
+def legacy_collect_vote(db_path, prompt_id):
+    """Vote insert as every skill did it before the shared layer"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO user_votes (id, prompt_id, user_id, score, comment, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (str(uuid.uuid4()), prompt_id, 'bench-user', 4, '', datetime.now()))
+    conn.commit()
+    conn.close()
+
+
+def legacy_get_template(db_path, template_id):
+    """Template lookup as every skill did it before the shared layer"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM templates WHERE id = ?", (template_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return row
+
+
+def measure(func, requests):
+    """Run func `requests` times and return requests per second"""
+    start = time.perf_counter()
+    for _ in range(requests):
+        func()
+    return requests / (time.perf_counter() - start)
+
+
+def run(requests):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        db.configure(db_path)
+        initialize_database()
+
+        template_id = manage_templates('create', {
+            'name': 'bench', 'description': '', 'content': 'Hello {name}'
+        })['template_id']
+
+        results = {
+            'collect_votes': (
+                measure(lambda: legacy_collect_vote(db_path, 'p1'), requests),
+                measure(lambda: collect_votes('p1', 'bench-user', 4), requests),
+            ),
+            'get_template': (
+                measure(lambda: legacy_get_template(db_path, template_id), requests),
+                measure(lambda: manage_templates('get', template_id=template_id), requests),
+            ),
+        }
+        db.configure(None)
+
+    print(f"{'operation':<16}{'before (req/s)':>16}{'after (req/s)':>16}{'speedup':>10}")
+    for name, (before, after) in results.items():
+        print(f"{name:<16}{before:>16.0f}{after:>16.0f}{after / before:>9.1f}x")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    run(args.requests)
@@ -0,0 +1,99 @@
+"""
+Prompt Leaderboard Benchmark
+Bulk-imports votes spread over prompts with Zipf-like popularity, then
+compares top-k and per-prompt score latency from the maintained
+prompt_scores aggregates with the GROUP BY over user_votes they replace.
+
+Usage: python benchmarks/bench_leaderboard.py [--votes N] [--prompts N] [--queries N]
+"""
+
+import argparse
+import io
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.main import initialize_database
+from src.skills.bulk_transfer import import_jsonl
+from src.skills.prompt_scores import get_prompt_score, score_row, top_prompts
+
+# What ranking prompts took before the aggregates: group every vote, score and sort
+GROUP_BY_QUERY = """
+    SELECT prompt_id, COUNT(*), SUM(score), SUM(score * score) FROM user_votes
+    GROUP BY prompt_id HAVING COUNT(*) >= ?
+"""
+PROMPT_QUERY = "SELECT COUNT(*), SUM(score), SUM(score * score) FROM user_votes WHERE prompt_id = ?"
+
+
+def votes(count, prompts, rng):
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(prompts)))
+    quality = [rng.uniform(1.5, 4.5) for _ in range(prompts)]
+    for i, rank in enumerate(rng.choices(range(prompts), cum_weights=cum_weights, k=count)):
+        score = min(5, max(1, round(rng.gauss(quality[rank], 1))))
+        yield {'prompt_id': f"prompt-{rank}", 'user_id': f"user{i}", 'score': score}
+
+
+def group_by_top(k, min_votes):
+    rows = db.get_connection().execute(GROUP_BY_QUERY, (min_votes,)).fetchall()
+    return sorted((score_row(*row) for row in rows), key=lambda row: (-row[4], row[0]))[:k]
+
+
+def latency(func, args):
+    samples = []
+    for arg in args:
+        start = time.perf_counter()
+        func(*arg)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def run(vote_count, prompts, queries):
+    rng = random.Random(17)
+    data = ''.join(json.dumps(vote) + '\n' for vote in votes(vote_count, prompts, rng)).encode()
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'bench.db'))
+        initialize_database()
+        try:
+            start = time.perf_counter()
+            import_jsonl('votes', io.BytesIO(data))
+            import_s = time.perf_counter() - start
+
+            top_args = [(rng.choice((10, 100)), rng.choice((1, 5, 50))) for _ in range(queries)]
+            prompt_args = [(f"prompt-{rng.randrange(prompts)}",) for _ in range(queries)]
+            assert [row['prompt_id'] for row in top_prompts(*top_args[0])] == \
+                [row[0] for row in group_by_top(*top_args[0])]
+            results = {
+                'top (aggregates)': latency(top_prompts, top_args),
+                'top (GROUP BY)': latency(group_by_top, top_args[:max(3, queries // 20)]),
+                'score (aggregates)': latency(get_prompt_score, prompt_args),
+                'score (user_votes)': latency(lambda p: db.get_connection().execute(PROMPT_QUERY, (p,)).fetchone(),
+                                              prompt_args),
+            }
+        finally:
+            db.configure(None)
+
+    print(f"Imported {vote_count} votes for {prompts} prompts in {import_s:.1f}s "
+          f"({vote_count / import_s:,.0f} votes/s including aggregates)")
+    print(f"{'query':<22}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, (p50, p99) in results.items():
+        print(f"{name:<22}{p50:>10.3f}{p99:>10.3f}")
+    results['import_s'] = import_s
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--votes', type=int, default=1000000)
+    parser.add_argument('--prompts', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+    run(args.votes, args.prompts, args.queries)
@@ -0,0 +1,65 @@
+"""
+Instrumentation Overhead Benchmark
+Measures the per-call cost of the metrics layer: an instrumented skill call
+against the bare function, and a statement on an instrumented connection
+against a plain one. The disabled (no-op) mode uses exactly the bare paths.
+
+Usage: python benchmarks/bench_metrics.py [--calls N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.main import initialize_database
+from src.skills.manage_templates import manage_templates
+
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run(calls):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        db.configure(db_path)
+        initialize_database()
+        template_id = manage_templates('create', {'name': 'bench', 'description': '', 'content': 'x'})['template_id']
+
+        bare = getattr(manage_templates, '__wrapped__', manage_templates)
+        plain = db.connect(db_path)
+        plain.__class__ = db.Connection  # same connection, uninstrumented methods
+        instrumented = db.connect(db_path)
+        instrumented.__class__ = db.InstrumentedConnection
+        sql = "SELECT id, name FROM templates WHERE id = ?"
+
+        results = {
+            'skill (bare)': per_call(lambda: bare('get', template_id=template_id), calls),
+            'skill (instrumented)': per_call(lambda: manage_templates('get', template_id=template_id), calls),
+            'statement (plain)': per_call(lambda: plain.execute(sql, (template_id,)).fetchone(), calls),
+            'statement (instrumented)': per_call(lambda: instrumented.execute(sql, (template_id,)).fetchone(), calls),
+        }
+        plain.close()
+        instrumented.close()
+        db.configure(None)
+
+    for name, micros in results.items():
+        print(f"{name:<28}{micros:>8.2f} us/call")
+    print(f"skill overhead:     {results['skill (instrumented)'] - results['skill (bare)']:.2f} us/call")
+    print(f"statement overhead: {results['statement (instrumented)'] - results['statement (plain)']:.2f} us/call")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+    run(args.calls)
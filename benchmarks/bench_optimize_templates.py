@@ -0,0 +1,61 @@
+"""
+optimize_templates Concurrency Benchmark
+Optimizes a batch of templates against the stub backend (artificial model
+latency) sequentially and at increasing concurrency limits.
+
+Usage: python benchmarks/bench_optimize_templates.py [--templates N] [--latency S]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.main import initialize_database
+from src.sdk.context_engine import ContextEngine
+from src.skills.optimizer_backends import StubBackend
+
+
+def run(templates, latency, concurrency_levels):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'bench.db'))
+        initialize_database()
+
+        engine = ContextEngine()
+        template_ids = [
+            engine.create_template(f"bench-{i}", '', f"Template {i} with {{variable}}")['template_id']
+            for i in range(templates)
+        ]
+        backend = StubBackend(latency=latency)
+
+        results = {}
+        for workers in concurrency_levels:
+            start = time.perf_counter()
+            # A distinct context per run keeps memoized results from earlier runs out of the way
+            outcome = engine.optimize_templates(
+                template_ids, context={'workers': workers}, max_workers=workers, backend=backend
+            )
+            elapsed = time.perf_counter() - start
+            assert all('optimization_result' in item for item in outcome)
+            results[workers] = elapsed
+        db.configure(None)
+
+    baseline = results[concurrency_levels[0]]
+    print(f"{templates} templates, {latency * 1000:.0f} ms backend latency")
+    print(f"{'workers':>8}{'seconds':>10}{'templates/s':>14}{'speedup':>10}")
+    for workers, elapsed in results.items():
+        print(f"{workers:>8}{elapsed:>10.2f}{templates / elapsed:>14.1f}{baseline / elapsed:>9.1f}x")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--templates', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    args = parser.parse_args()
+    run(args.templates, args.latency, args.concurrency)
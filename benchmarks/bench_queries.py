@@ -0,0 +1,140 @@
+"""
+Query Benchmark Suite
+Seeds a synthetic multi-million-row database and times representative hot
+queries before and after the index migration. Exits non-zero if any query
+still needs a full table scan once all migrations are applied.
+
+Usage: python benchmarks/bench_queries.py [--votes N] [--templates N] [--db PATH]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.migrations import migrate
+
+# Schema version before the hot-path index migration
+BASELINE_VERSION = 1
+
+QUERIES = [
+    ('votes_for_prompt',
+     "SELECT COUNT(*), AVG(score) FROM user_votes WHERE prompt_id = ?",
+     lambda s: (s['prompt_id'],)),
+    ('recent_votes',
+     "SELECT id, prompt_id, score FROM user_votes WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT 100",
+     lambda s: (s['recent'],)),
+    ('recent_optimizations',
+     "SELECT id, improvement_score FROM optimized_prompts ORDER BY created_at DESC LIMIT 50",
+     lambda s: ()),
+    ('template_versions',
+     "SELECT id, version FROM template_versions WHERE template_id = ?",
+     lambda s: (s['template_id'],)),
+    ('active_templates_page',
+     "SELECT id, name FROM templates WHERE is_active = 1 AND id > ? ORDER BY id LIMIT 100",
+     lambda s: (s['template_id'],)),
+]
+
+
+def seed(conn, votes, templates):
+    """Fill the database with synthetic rows and return sample query parameters"""
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    template_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(templates)]
+    prompt_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(max(1, votes // 100))]
+
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO templates (id, name, description, template_content, is_active) VALUES (?, ?, '', ?, ?)",
+        ((tid, f"template {i}", f"Content {i} with {{variable}}", i % 4 != 0) for i, tid in enumerate(template_ids))
+    )
+    conn.executemany(
+        "INSERT INTO template_versions (id, template_id, version, content) VALUES (?, ?, ?, '')",
+        ((str(uuid.uuid4()), template_ids[i % templates], str(i)) for i in range(templates * 3))
+    )
+    conn.executemany(
+        "INSERT INTO optimized_prompts (id, original_prompt_id, optimized_content, created_at, improvement_score) "
+        "VALUES (?, ?, 'OPTIMIZED', ?, ?)",
+        ((str(uuid.uuid4()), rng.choice(prompt_ids), start + timedelta(seconds=i * 7), rng.random())
+         for i in range(votes // 4))
+    )
+    conn.executemany(
+        "INSERT INTO user_votes (id, prompt_id, user_id, score, comment, timestamp) VALUES (?, ?, ?, ?, '', ?)",
+        ((str(uuid.uuid4()), rng.choice(prompt_ids), f"user{i % 10000}", rng.randint(1, 5),
+          start + timedelta(seconds=i)) for i in range(votes))
+    )
+    conn.commit()
+    return {
+        'prompt_id': prompt_ids[len(prompt_ids) // 2],
+        'recent': start + timedelta(seconds=votes - 1000),
+        'template_id': template_ids[len(template_ids) // 2],
+    }
+
+
+def time_query(conn, sql, params, repeat):
+    """Best-of-repeat wall time in milliseconds, plus the query plan"""
+    plan = ' | '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, plan
+
+
+def full_scan(plan):
+    return any(step.startswith('SCAN') and 'INDEX' not in step for step in plan.split(' | '))
+
+
+def run(votes, templates, db_path, repeat, output=None):
+    db.configure(db_path)
+    migrate(target=BASELINE_VERSION)
+    conn = db.get_connection()
+    print(f"Seeding {votes:,} votes and {templates:,} templates...")
+    samples = seed(conn, votes, templates)
+
+    results = {}
+    for phase in ('before', 'after'):
+        if phase == 'after':
+            migrate()
+        for name, sql, params in QUERIES:
+            elapsed, plan = time_query(conn, sql, params(samples), repeat)
+            results.setdefault(name, {})[phase] = {'ms': round(elapsed, 3), 'plan': plan}
+    db.configure(None)
+
+    regressions = [name for name, phases in results.items() if full_scan(phases['after']['plan'])]
+    print(f"{'query':<24}{'before (ms)':>12}{'after (ms)':>12}{'speedup':>10}  plan")
+    for name, phases in results.items():
+        before, after = phases['before']['ms'], phases['after']['ms']
+        flag = '  FULL SCAN' if name in regressions else ''
+        print(f"{name:<24}{before:>12.3f}{after:>12.3f}{before / max(after, 1e-6):>9.0f}x  {phases['after']['plan']}{flag}")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'votes': votes, 'templates': templates, 'queries': results}, f, indent=2)
+    return results, regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--votes', type=int, default=2000000)
+    parser.add_argument('--templates', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--db', help='new database file to build and keep (default: a temporary file)')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+    if args.db and os.path.exists(args.db):
+        parser.error(f"{args.db} already exists; the suite needs an empty database")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, 'bench_queries.db')
+        _, regressions = run(args.votes, args.templates, db_path, args.repeat, args.output)
+    sys.exit(1 if regressions else 0)
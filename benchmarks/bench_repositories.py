@@ -0,0 +1,79 @@
+"""
+Repository Benchmark
+Runs the same template, vote, A/B test and analytics workload through the
+skills on the SQLite and in-memory repositories and reports operations per
+second for each.
+
+Usage: python benchmarks/bench_repositories.py [--requests N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db, repositories
+from src.main import initialize_database
+from src.repositories.memory import MemoryRepository
+from src.repositories.sqlite import SQLiteRepository
+from src.skills.analytics_summary import read_summary
+from src.skills.collect_votes import collect_votes
+from src.skills.manage_templates import list_templates_page, manage_templates
+from src.skills.run_ab_test import get_ab_test_results, run_ab_test
+
+
+def measure(func, requests):
+    start = time.perf_counter()
+    for i in range(requests):
+        func(i)
+    return requests / (time.perf_counter() - start)
+
+
+def workload(requests):
+    template_ids = [
+        manage_templates('create', {'name': f"bench {i}", 'description': '', 'content': f"Hello {{name}} {i}"})['template_id']
+        for i in range(100)
+    ]
+    test_id = run_ab_test({'name': 'bench', 'sample_size': 10 ** 9, 'duration_days': 1},
+                          template_ids[0], template_ids[1])['test_id']
+    return {
+        'create template': measure(lambda i: manage_templates(
+            'create', {'name': f"new {i}", 'description': '', 'content': 'x'}), requests),
+        'get template': measure(lambda i: manage_templates('get', template_id=template_ids[i % 100]), requests),
+        'update template': measure(lambda i: manage_templates(
+            'update', {'content': f"v{i}"}, template_ids[i % 100]), requests),
+        'list page': measure(lambda i: list_templates_page(limit=50), requests),
+        'collect vote': measure(lambda i: collect_votes(template_ids[i % 2], f"user{i}", 1 + i % 5), requests),
+        'ab test results': measure(lambda i: get_ab_test_results(test_id), requests),
+        'read summary': measure(lambda i: read_summary(), requests),
+    }
+
+
+def run(requests):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'bench.db'))
+        initialize_database()
+        try:
+            for name, repository in (('sqlite', SQLiteRepository()), ('memory', MemoryRepository())):
+                repositories.configure(repository)
+                results[name] = workload(requests)
+        finally:
+            repositories.configure(None)
+            db.configure(None)
+
+    print(f"{'operation':<18}{'sqlite ops/s':>14}{'memory ops/s':>14}{'speedup':>9}")
+    for operation in results['sqlite']:
+        sqlite_rate, memory_rate = results['sqlite'][operation], results['memory'][operation]
+        print(f"{operation:<18}{sqlite_rate:>14.0f}{memory_rate:>14.0f}{memory_rate / sqlite_rate:>8.1f}x")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    run(args.requests)
@@ -0,0 +1,110 @@
+"""
+Template Search Benchmark
+Bulk-imports a synthetic template library with a Zipf vocabulary and
+reports search latency for common, frequent and rare terms, mixed and
+prefix queries, against the client-side alternative of streaming every
+template and filtering in Python.
+
+Usage: python benchmarks/bench_search.py [--templates N] [--queries N]
+"""
+
+import argparse
+import io
+import json
+import os
+import itertools
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.main import initialize_database
+from src.skills.bulk_transfer import import_jsonl
+from src.skills.manage_templates import iter_templates, search_templates
+
+SYLLABLES = 'ka lo mi ne ru ta shi po ve da ri zu fe gon tal mer vin sol'.split()
+
+# Search latency grows with the number of rows a query matches, so queries are
+# drawn from vocabulary ranks with very different document frequencies
+QUERY_RANKS = {'common': (0, 5), 'frequent': (20, 60), 'rare': (500, 3000)}
+
+
+def vocabulary(rng, size=5000):
+    words = []
+    while len(words) < size:
+        word = ''.join(rng.sample(SYLLABLES, rng.randint(2, 3)))
+        if word not in words:
+            words.append(word)
+    return words
+
+
+def library(count, words, rng):
+    # Zipf-distributed words, like natural-language prompts
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    for i in range(count):
+        text = lambda k: ' '.join(rng.choices(words, cum_weights=cum_weights, k=k))
+        yield {'name': f"tmpl{i} {text(3)}", 'description': text(8), 'content': text(60) + ' {input}'}
+
+
+def queries(words, rng, count):
+    lo, hi = QUERY_RANKS['frequent']
+    mixed = [f"{rng.choice(words[lo:hi])} {rng.choice(words[500:3000])}" for _ in range(count)]
+    prefixes = [f"tmpl{rng.randrange(1000, 9999)}*" for _ in range(count)]
+    by_class = {name: [rng.choice(words[lo:hi]) for _ in range(count)] for name, (lo, hi) in QUERY_RANKS.items()}
+    return dict(by_class, mixed=mixed, prefix=prefixes)
+
+
+def scan(query):
+    # What clients did before search: download everything and filter locally
+    terms = query.replace('*', '').split()
+    return [row['id'] for row in iter_templates(fields=['id', 'name', 'description', 'content'])
+            if all(term in f"{row['name']} {row['description']} {row['content']}" for term in terms)][:20]
+
+
+def latencies(func, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run(templates, count):
+    rng = random.Random(7)
+    words = vocabulary(rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'bench.db'))
+        initialize_database()
+        try:
+            data = ''.join(json.dumps(record) + '\n' for record in library(templates, words, rng)).encode()
+            start = time.perf_counter()
+            import_jsonl('templates', io.BytesIO(data))
+            print(f"Imported and indexed {templates} templates in {time.perf_counter() - start:.1f}s")
+
+            results = {}
+            for name, batch in queries(words, rng, count).items():
+                samples = sorted(latencies(search_templates, batch))
+                results[name] = (statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))])
+            scan_ms = statistics.median(latencies(scan, [words[500], words[1000], words[2000]]))
+        finally:
+            db.configure(None)
+
+    print(f"{'query':<10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, (p50, p99) in results.items():
+        print(f"{name:<10}{p50:>10.2f}{p99:>10.2f}")
+    print(f"Client-side scan of the whole library: {scan_ms:.0f} ms per query")
+    results['scan'] = scan_ms
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--templates', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=50, help='queries per class')
+    args = parser.parse_args()
+    run(args.templates, args.queries)
@@ -0,0 +1,138 @@
+"""
+Serving Mode Load Test
+Starts the API in Flask and ASGI mode against the same temporary database
+and drives both with concurrent clients: template reads, and optimizations
+through the stub backend to stand in for blocking model calls.
+
+Usage: python benchmarks/bench_serving.py [--clients N] [--requests N] [--latency S] [--workers N]
+Requires PyYAML (to point the servers at a temporary config) and, for the
+ASGI run, starlette and uvicorn.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, workers, config_path):
+    port = free_port()
+    env = dict(os.environ, PROMPTOPS_CONFIG=config_path)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'src.main', 'serve', '--mode', mode, '--host', '127.0.0.1',
+         '--port', str(port), '--workers', str(workers)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            request('127.0.0.1', port, 'GET', '/analytics')
+            return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+def request(host, port, method, path, body=None, conn=None):
+    own = conn is None
+    conn = conn or http.client.HTTPConnection(host, port, timeout=60)
+    payload = json.dumps(body) if body is not None else None
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    conn.request(method, path, payload, headers)
+    response = conn.getresponse()
+    data = response.read()
+    if own:
+        conn.close()
+    if response.status >= 400:
+        raise RuntimeError(f"{method} {path} returned {response.status}")
+    return json.loads(data) if data else None
+
+
+def load(port, clients, requests, make_request):
+    """Run requests spread over concurrent clients; returns (req/s, p50 ms, p99 ms)"""
+    def client(index):
+        latencies = []
+        for i in range(index, requests, clients):
+            method, path, body = make_request(i)
+            start = time.perf_counter()
+            request('127.0.0.1', port, method, path, body)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = [value for chunk in pool.map(client, range(clients)) for value in chunk]
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return requests / elapsed, statistics.median(latencies) * 1000, p99 * 1000
+
+
+def run(clients, requests, latency, workers, modes=('flask', 'asgi')):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, 'bench.config.yaml')
+        with open(config_path, 'w') as f:
+            yaml.safe_dump({
+                'database': {'path': os.path.join(tmp, 'bench.db'), 'schema_file': './static/schema.sql'},
+                'optimizer': {'backend': 'stub', 'stub_latency': latency},
+            }, f)
+
+        for mode in modes:
+            process, port = start_server(mode, workers, config_path)
+            try:
+                template_id = request('127.0.0.1', port, 'POST', '/templates', {
+                    'name': 'bench', 'content': 'Template with {variable}'
+                })['template_id']
+                # Unique prompts so every request reaches the (slow) backend
+                run_id = uuid.uuid4()
+                scenarios = {
+                    'get_template': lambda i: ('GET', f'/templates/{template_id}', None),
+                    'optimize': lambda i: ('POST', '/optimize', {'prompt': f'{mode}-{run_id}-{i}'}),
+                }
+                for scenario, make_request in scenarios.items():
+                    results[(mode, scenario)] = load(port, clients, requests, make_request)
+            finally:
+                process.terminate()
+                process.wait()
+
+    print(f"{clients} clients, {requests} requests per scenario, {workers} worker(s), "
+          f"{latency * 1000:.0f} ms backend latency")
+    print(f"{'mode':<8}{'scenario':<16}{'req/s':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for (mode, scenario), (throughput, p50, p99) in results.items():
+        print(f"{mode:<8}{scenario:<16}{throughput:>10.1f}{p50:>12.1f}{p99:>12.1f}")
+    if len(modes) == 2:
+        for scenario in ('get_template', 'optimize'):
+            gain = results[('asgi', scenario)][0] / results[('flask', scenario)][0]
+            print(f"asgi/flask throughput on {scenario}: {gain:.1f}x")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=640)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--modes', nargs='+', default=['flask', 'asgi'], choices=['flask', 'asgi'])
+    args = parser.parse_args()
+    run(args.clients, args.requests, args.latency, args.workers, tuple(args.modes))
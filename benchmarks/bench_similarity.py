@@ -0,0 +1,118 @@
+"""
+Template Similarity Benchmark
+Bulk-imports a synthetic template library in which a share of templates are
+lightly edited copies of others, then reports the cost of signing templates,
+similar-template lookup latency through the LSH index against comparing
+each template with the whole library, and how many planted copies are found.
+
+Usage: python benchmarks/bench_similarity.py [--templates N] [--duplicates FRACTION] [--queries N]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.main import initialize_database
+from src.repositories import get_repository
+from src.skills.bulk_transfer import import_jsonl
+from src.skills.manage_templates import iter_templates
+from src.skills.template_similarity import group_near_duplicates, minhash, similar_templates, similarity
+
+
+def library(count, duplicates, rng):
+    words = [f"w{n}" for n in range(5000)]
+    originals = []
+    for i in range(count):
+        if originals and rng.random() < duplicates:
+            # A copy with about one word in twenty-five replaced
+            source = rng.choice(originals)
+            content = ' '.join(word if rng.random() > 0.04 else rng.choice(words) for word in source[1].split())
+            yield {'name': f"copy {i}", 'content': content}, source[0]
+        else:
+            content = ' '.join(rng.choices(words, k=rng.randint(40, 120)))
+            originals.append((f"original {i}", content))
+            yield {'name': f"original {i}", 'content': content}, None
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def run(templates, duplicates, count):
+    rng = random.Random(11)
+    records, planted = [], {}
+    for record, source in library(templates, duplicates, rng):
+        records.append(record)
+        if source:
+            planted[record['name']] = source
+    data = ''.join(json.dumps(record) + '\n' for record in records).encode()
+
+    start = time.perf_counter()
+    for record in records[:2000]:
+        minhash(record['content'])
+    sign_us = (time.perf_counter() - start) / min(len(records), 2000) * 1e6
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'bench.db'))
+        initialize_database()
+        try:
+            start = time.perf_counter()
+            import_jsonl('templates', io.BytesIO(data))
+            import_s = time.perf_counter() - start
+
+            ids = {row['name']: row['id'] for row in iter_templates(fields=['id', 'name'])}
+            queries = rng.sample(sorted(planted), min(count, len(planted)))
+            lookups, found = [], 0
+            for name in queries:
+                start = time.perf_counter()
+                matches = similar_templates(ids[name], min_similarity=0.5)
+                lookups.append((time.perf_counter() - start) * 1000)
+                found += ids[planted[name]] in {match['template_id'] for match in matches}
+
+            # Without the index: compare the template with every stored signature
+            signatures = get_repository().get_signatures(list(ids.values()))
+            everything = list(signatures.values())
+            scans = []
+            for name in queries[:10]:
+                start = time.perf_counter()
+                scores = similarity(signatures[ids[name]], everything)
+                sorted(score for score in scores if score >= 0.5)
+                scans.append((time.perf_counter() - start) * 1000)
+
+            batch = list(ids.values())[:1000]
+            start = time.perf_counter()
+            groups = group_near_duplicates(batch)
+            group_ms = (time.perf_counter() - start) * 1000
+        finally:
+            db.configure(None)
+
+    lookup_p50, lookup_p99 = percentiles(lookups)
+    results = {
+        'sign_us': sign_us, 'import_s': import_s, 'lookup_p50_ms': lookup_p50, 'lookup_p99_ms': lookup_p99,
+        'scan_ms': statistics.median(scans), 'recall': found / len(queries), 'group_1000_ms': group_ms,
+    }
+    print(f"Signing one template: {sign_us:.0f} us; importing {templates} templates: {import_s:.1f}s")
+    print(f"Similar templates p50 {lookup_p50:.2f} ms, p99 {lookup_p99:.2f} ms; "
+          f"comparing against the whole library {results['scan_ms']:.1f} ms")
+    print(f"Planted copies found: {results['recall']:.1%} of {len(queries)}")
+    print(f"Grouping 1000 templates: {group_ms:.0f} ms ({len(set(groups.values()))} groups)")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--templates', type=int, default=100000)
+    parser.add_argument('--duplicates', type=float, default=0.1, help='share of templates that are edited copies')
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+    run(args.templates, args.duplicates, args.queries)
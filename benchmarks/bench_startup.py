@@ -0,0 +1,78 @@
+"""
+Startup Benchmark
+Times cold starts of fresh interpreters: importing each entry point of the
+platform and running the CLI, next to a bare interpreter for reference.
+With --breakdown, lists the slowest imports of one target by cumulative
+time (from python -X importtime).
+
+Usage: python benchmarks/bench_startup.py [--repeats N] [--breakdown 'import src.main']
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Name -> Python source run in a fresh interpreter from the repository root
+TARGETS = {
+    'python': 'pass',
+    'import src.sdk.context_engine': 'from src.sdk.context_engine import ContextEngine',
+    'import src.sdk.smart_rewriter': 'from src.sdk.smart_rewriter import SmartRewriter',
+    'import src.api.routes': 'from src.api.routes import create_app',
+    'import src.admin.views': 'from src.admin.views import create_admin_app',
+    'cli --help': 'import sys; sys.argv[1:] = ["--help"]; import runpy; runpy.run_module("src.main", run_name="__main__")',
+}
+
+
+def measure(source, repeats):
+    """Wall time of a fresh interpreter running source; statistics in microseconds"""
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', source], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        'iterations': repeats,
+        'p50_us': round(statistics.median(latencies) * 1e6, 2),
+        'min_us': round(latencies[0] * 1e6, 2),
+    }
+
+
+def run(repeats=10, log=print):
+    results = {}
+    for name, source in TARGETS.items():
+        results[name] = measure(source, repeats)
+        log(f"  startup {name:<36}{results[name]['p50_us'] / 1000:>10.1f} ms")
+    return results
+
+
+def breakdown(source, limit=15):
+    """The slowest imports of source as (cumulative_us, self_us, module)"""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', source], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line and 'self' not in line:
+            self_us, cumulative_us, module = line[len('import time:'):].split('|')
+            rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=10, help='fresh interpreters per target')
+    parser.add_argument('--breakdown', metavar='TARGET', choices=sorted(TARGETS),
+                        help='show the slowest imports of one target')
+    args = parser.parse_args()
+
+    if args.breakdown:
+        for cumulative_us, self_us, module in breakdown(TARGETS[args.breakdown]):
+            print(f"{cumulative_us / 1000:>8.1f} ms {self_us / 1000:>8.1f} ms  {module}")
+    else:
+        run(args.repeats)
@@ -0,0 +1,89 @@
+"""
+Single-Writer Benchmark
+Several worker processes submit single votes concurrently, either each
+writing to SQLite directly or all sending their writes to one writer
+service. Reports throughput, p50/p99 latency and "database is locked"
+errors for both.
+
+Usage: python benchmarks/bench_writer.py [--workers N] [--votes N] [--batch-window SECONDS]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.main import initialize_database
+from src.skills.collect_votes import _vote_row, insert_votes
+from src.writer import WriterClient, WriterService
+
+
+def worker(db_path, address, votes, worker_id):
+    db.configure(db_path)
+    client = WriterClient(address) if address else None
+    latencies, errors = [], 0
+    for i in range(votes):
+        rows = [_vote_row('bench', f"user{worker_id}-{i}", 4)]
+        start = time.perf_counter()
+        try:
+            if client:
+                client.call('collect_votes.insert_votes', (rows,))
+            else:
+                insert_votes(rows)
+        except sqlite3.OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+
+def measure(db_path, address, workers, votes):
+    with multiprocessing.get_context('fork').Pool(workers) as pool:
+        start = time.perf_counter()
+        results = pool.starmap(worker, [(db_path, address, votes, n) for n in range(workers)])
+        elapsed = time.perf_counter() - start
+    latencies = sorted(latency for result in results for latency in result[0])
+    errors = sum(result[1] for result in results)
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        'votes_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(0.50), 2),
+        'p99_ms': round(percentile(0.99), 2),
+        'locked_errors': errors
+    }
+
+
+def run(workers, votes, batch_window):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        db.configure(db_path)
+        initialize_database()
+        results['direct'] = measure(db_path, None, workers, votes)
+
+        service = WriterService(os.path.join(tmp, 'writer.sock'), batch_window=batch_window).start()
+        try:
+            results['writer'] = measure(db_path, service.address, workers, votes)
+            results['writer']['votes_per_batch'] = service.stats()['operations_per_batch']
+        finally:
+            service.stop()
+        db.configure(None)
+
+    for name, result in results.items():
+        print(f"{name:<8}" + '  '.join(f"{key}={value}" for key, value in result.items()))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--votes', type=int, default=200, help='votes per worker')
+    parser.add_argument('--batch-window', type=float, default=0.0)
+    args = parser.parse_args()
+    run(args.workers, args.votes, args.batch_window)
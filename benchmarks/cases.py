@@ -0,0 +1,408 @@
+"""
+Benchmark Cases
+Micro-benchmarks for every skill module and end-to-end cases for every API
+route. Each case takes the seeded sample ids and returns a callable run
+once per iteration with the iteration number.
+"""
+
+import json
+import random
+import uuid
+
+from src.skills import ab_statistics, analytics_summary, assign_variant, collect_votes, generate_optimization
+from src.skills import log_evaluations, manage_templates, optimization_cache, optimizer_backends, prompt_scores
+from src.skills import run_ab_test, template_similarity, template_versions
+
+SKILL_CASES = {}
+ROUTE_CASES = {}
+
+
+def skill(name):
+    def register(factory):
+        SKILL_CASES[name] = factory
+        return factory
+    return register
+
+
+def route(method, rule):
+    """Register a case for one (method, URL rule) of create_app()"""
+    def register(factory):
+        ROUTE_CASES[(method, rule)] = factory
+        return factory
+    return register
+
+
+def pick(ids, i):
+    return ids[(i * 7919) % len(ids)]
+
+
+def new_votes(sample, count):
+    return [{'prompt_id': pick(sample['prompt_ids'], j), 'user_id': f"bench{j}", 'score': 1 + j % 5}
+            for j in range(count)]
+
+
+def new_logs(sample, count):
+    return [{'version_id': pick(sample['version_ids'], j), 'response': 'r',
+             'metrics': {'accuracy': j / count, 'latency_ms': j}, 'human_score': 1 + j % 5}
+            for j in range(count)]
+
+
+# Skill micro-benchmarks
+@skill('manage_templates.create')
+def _(sample):
+    return lambda i: manage_templates.manage_templates(
+        'create', {'name': 'bench', 'description': '', 'content': f"Bench {i} with {{variable}}"})
+
+
+@skill('manage_templates.get')
+def _(sample):
+    return lambda i: manage_templates.manage_templates('get', template_id=pick(sample['template_ids'], i))
+
+
+@skill('manage_templates.update')
+def _(sample):
+    return lambda i: manage_templates.manage_templates(
+        'update', {'content': f"Updated {i} with {{variable}}"}, pick(sample['template_ids'], i))
+
+
+@skill('manage_templates.list_templates_page')
+def _(sample):
+    return lambda i: manage_templates.list_templates_page(limit=100, fields=['name'])
+
+
+@skill('manage_templates.iter_templates')
+def _(sample):
+    return lambda i: sum(1 for _ in manage_templates.iter_templates(fields=['name']))
+
+
+@skill('manage_templates.get_templates_bulk')
+def _(sample):
+    ids = sample['template_ids'][:100]
+    return lambda i: manage_templates.get_templates_bulk(ids)
+
+
+@skill('template_versions.rebuild_version')
+def _(sample):
+    return lambda i: template_versions.rebuild_version(pick(sample['template_ids'], i), 1 + i % 3)
+
+
+@skill('template_versions.diff_versions')
+def _(sample):
+    return lambda i: template_versions.diff_versions(pick(sample['template_ids'], i), 1, 2)
+
+
+@skill('template_versions.encode_delta')
+def _(sample):
+    base = '\n'.join(f"Line {n} of the template." for n in range(200))
+    changed = base.replace('Line 100 ', 'Edited line ')
+    return lambda i: template_versions.encode_delta(base, changed)
+
+
+
+@skill('template_similarity.minhash')
+def _(sample):
+    content = ' '.join(f"word{n % 97} step {n}" for n in range(100))
+    return lambda i: template_similarity.minhash(content)
+
+
+@skill('template_similarity.similar_templates')
+def _(sample):
+    return lambda i: template_similarity.similar_templates(pick(sample['template_ids'], i))
+
+@skill('collect_votes.collect_votes')
+def _(sample):
+    return lambda i: collect_votes.collect_votes(pick(sample['prompt_ids'], i), f"bench{i}", 1 + i % 5)
+
+
+@skill('collect_votes.collect_votes_batch')
+def _(sample):
+    votes = new_votes(sample, 100)
+    return lambda i: collect_votes.collect_votes_batch(votes)
+
+
+
+@skill('prompt_scores.top_prompts')
+def _(sample):
+    return lambda i: prompt_scores.top_prompts(k=10, min_votes=1 + i % 5)
+
+
+@skill('prompt_scores.get_prompt_score')
+def _(sample):
+    return lambda i: prompt_scores.get_prompt_score(pick(sample['prompt_ids'], i))
+
+@skill('log_evaluations.log_evaluations')
+def _(sample):
+    logs = new_logs(sample, 100)
+    return lambda i: log_evaluations.log_evaluations(logs)
+
+
+@skill('log_evaluations.get_evaluation_metrics')
+def _(sample):
+    return lambda i: log_evaluations.get_evaluation_metrics(version_id=pick(sample['version_ids'], i))
+
+
+@skill('log_evaluations.query_evaluations')
+def _(sample):
+    return lambda i: log_evaluations.query_evaluations('accuracy', min_value=0.99, limit=20)
+
+
+@skill('generate_optimization.miss')
+def _(sample):
+    run_id = uuid.uuid4()
+    return lambda i: generate_optimization.generate_optimization(f"Bench prompt {run_id} {i}")
+
+
+@skill('generate_optimization.hit')
+def _(sample):
+    generate_optimization.generate_optimization("Bench memoized prompt")
+    return lambda i: generate_optimization.generate_optimization("Bench memoized prompt")
+
+
+@skill('optimization_cache.cache_key')
+def _(sample):
+    context = {'purpose': 'bench', 'audience': 'developers'}
+    return lambda i: optimization_cache.cache_key("Bench prompt", context, None, 'local')
+
+
+@skill('optimizer_backends.local')
+def _(sample):
+    backend = optimizer_backends.LocalBackend()
+    return lambda i: backend.optimize("Bench prompt")
+
+
+@skill('run_ab_test.run_ab_test')
+def _(sample):
+    config = {'name': 'bench', 'sample_size': 10 ** 9, 'duration_days': 1}
+    return lambda i: run_ab_test.run_ab_test(config, f"bench-a-{i}", f"bench-b-{i}")
+
+
+@skill('run_ab_test.get_ab_test_results')
+def _(sample):
+    return lambda i: run_ab_test.get_ab_test_results(pick(sample['test_ids'], i))
+
+
+@skill('run_ab_test.recompute_ab_test')
+def _(sample):
+    return lambda i: run_ab_test.recompute_ab_test(pick(sample['test_ids'], i))
+
+
+@skill('assign_variant.assign_variant')
+def _(sample):
+    return lambda i: assign_variant.assign_variant(pick(sample['test_ids'], i), f"user{i}")
+
+
+@skill('ab_statistics.msprt_p_value')
+def _(sample):
+    return lambda i: ab_statistics.msprt_p_value(1000, 3.9, 1200.0, 1100, 4.0, 1250.0)
+
+
+@skill('ab_statistics.batch_moments')
+def _(sample):
+    rng = random.Random(0)
+    values = [rng.random() for _ in range(1000)]
+    return lambda i: ab_statistics.batch_moments(values)
+
+
+@skill('analytics_summary.read_summary')
+def _(sample):
+    return lambda i: analytics_summary.read_summary()
+
+
+@skill('analytics_summary.rebuild_summary')
+def _(sample):
+    return lambda i: analytics_summary.rebuild_summary()
+
+
+# End-to-end route benchmarks through the Flask test client
+@route('GET', '/templates')
+def _(sample, client):
+    return lambda i: client.get('/templates?limit=100&fields=name')
+
+
+@route('GET', '/templates/search')
+def _(sample, client):
+    queries = ('summarize', 'customer report', 'expl*', 'policy tone')
+    return lambda i: client.get(f"/templates/search?q={queries[i % len(queries)]}")
+
+
+@route('POST', '/templates')
+def _(sample, client):
+    return lambda i: client.post('/templates', json={'name': 'bench', 'content': f"Route {i} {{variable}}"})
+
+
+@route('GET', '/templates/<template_id>')
+def _(sample, client):
+    return lambda i: client.get(f"/templates/{pick(sample['template_ids'], i)}")
+
+
+@route('PUT', '/templates/<template_id>')
+def _(sample, client):
+    return lambda i: client.put(f"/templates/{pick(sample['template_ids'], i)}",
+                                json={'content': f"Route update {i} {{variable}}"})
+
+
+@route('DELETE', '/templates/<template_id>')
+def _(sample, client):
+    ids = [client.post('/templates', json={'name': 'bench', 'content': 'x'}).json['template_id']
+           for _ in range(200)]
+    return lambda i: client.delete(f"/templates/{ids[i % len(ids)]}")
+
+
+@route('POST', '/templates/<template_id>/render')
+def _(sample, client):
+    return lambda i: client.post(f"/templates/{pick(sample['template_ids'], i)}/render",
+                                 json={'variables': {'variable': i, 'audience': 'devs'}})
+
+
+@route('POST', '/templates/<template_id>/render/batch')
+def _(sample, client):
+    variable_sets = [{'variable': n, 'audience': 'devs'} for n in range(100)]
+    return lambda i: client.post(f"/templates/{pick(sample['template_ids'], i)}/render/batch",
+                                 json={'variable_sets': variable_sets})
+
+
+@route('GET', '/templates/<template_id>/versions')
+def _(sample, client):
+    return lambda i: client.get(f"/templates/{pick(sample['template_ids'], i)}/versions")
+
+
+@route('GET', '/templates/<template_id>/versions/<int:version>')
+def _(sample, client):
+    return lambda i: client.get(f"/templates/{pick(sample['template_ids'], i)}/versions/2")
+
+
+@route('GET', '/templates/<template_id>/diff')
+def _(sample, client):
+    return lambda i: client.get(f"/templates/{pick(sample['template_ids'], i)}/diff?from=1&to=2")
+
+
+
+@route('GET', '/templates/<template_id>/similar')
+def _(sample, client):
+    return lambda i: client.get(f"/templates/{pick(sample['template_ids'], i)}/similar")
+
+@route('POST', '/templates/<template_id>/rollback')
+def _(sample, client):
+    return lambda i: client.post(f"/templates/{pick(sample['template_ids'], i)}/rollback", json={'version': 1})
+
+
+@route('POST', '/ab-test')
+def _(sample, client):
+    config = {'name': 'bench', 'sample_size': 10 ** 9, 'duration_days': 1}
+    return lambda i: client.post('/ab-test', json={'config': config, 'variant_a': f"ra-{i}", 'variant_b': f"rb-{i}"})
+
+
+@route('GET', '/ab-test/<test_id>')
+def _(sample, client):
+    return lambda i: client.get(f"/ab-test/{pick(sample['test_ids'], i)}")
+
+
+@route('GET', '/ab-test/<test_id>/assign')
+def _(sample, client):
+    return lambda i: client.get(f"/ab-test/{pick(sample['test_ids'], i)}/assign?user_id=user{i}")
+
+
+@route('POST', '/ab-test/<test_id>/recompute')
+def _(sample, client):
+    return lambda i: client.post(f"/ab-test/{pick(sample['test_ids'], i)}/recompute")
+
+
+@route('POST', '/optimize')
+def _(sample, client):
+    run_id = uuid.uuid4()
+    return lambda i: client.post('/optimize', json={'prompt': f"Route prompt {run_id} {i}"})
+
+
+@route('GET', '/optimize/cache')
+def _(sample, client):
+    return lambda i: client.get('/optimize/cache')
+
+
+@route('POST', '/optimize-context')
+def _(sample, client):
+    ids = sample['template_ids'][:10]
+    run_id = uuid.uuid4()
+    return lambda i: client.post('/optimize-context', json={'template_ids': ids, 'context': {'run': f"{run_id}-{i}"}})
+
+
+@route('POST', '/votes')
+def _(sample, client):
+    return lambda i: client.post('/votes', json={'prompt_id': pick(sample['prompt_ids'], i),
+                                                 'user_id': f"route{i}", 'score': 1 + i % 5})
+
+
+@route('POST', '/votes/batch')
+def _(sample, client):
+    votes = new_votes(sample, 100)
+    return lambda i: client.post('/votes/batch', json={'votes': votes})
+
+
+
+@route('GET', '/prompts/top')
+def _(sample, client):
+    return lambda i: client.get(f"/prompts/top?k=10&min_votes={1 + i % 5}")
+
+
+@route('GET', '/prompts/<prompt_id>/score')
+def _(sample, client):
+    return lambda i: client.get(f"/prompts/{pick(sample['prompt_ids'], i)}/score")
+
+@route('POST', '/evaluations/batch')
+def _(sample, client):
+    logs = new_logs(sample, 100)
+    return lambda i: client.post('/evaluations/batch', json={'logs': logs})
+
+
+@route('GET', '/evaluations/metrics')
+def _(sample, client):
+    return lambda i: client.get(f"/evaluations/metrics?version_id={pick(sample['version_ids'], i)}")
+
+
+@route('GET', '/evaluations')
+def _(sample, client):
+    return lambda i: client.get('/evaluations?metric=accuracy&min=0.99&limit=20')
+
+
+@route('GET', '/metrics')
+def _(sample, client):
+    return lambda i: client.get('/metrics')
+
+
+@route('GET', '/profiling')
+def _(sample, client):
+    return lambda i: client.get('/profiling')
+
+
+@route('PUT', '/profiling')
+def _(sample, client):
+    # Keeps sampling off so the other cases are unaffected
+    return lambda i: client.put('/profiling', json={'sample_rate': 0.0})
+
+
+@route('GET', '/analytics')
+def _(sample, client):
+    return lambda i: client.get('/analytics')
+
+
+@route('GET', '/bulk/<kind>')
+def _(sample, client):
+    return lambda i: client.get('/bulk/templates').data
+
+
+@route('POST', '/bulk/<kind>')
+def _(sample, client):
+    def run(i):
+        body = ''.join(json.dumps(vote) + '\n' for vote in new_votes(sample, 100))
+        return client.post('/bulk/votes', data=body, content_type='application/x-ndjson')
+    return run
+
+
+# Weighted request mix replayed by the load generator
+LOAD_MIX = (
+    (50, ('GET', '/templates/<template_id>')),
+    (20, ('POST', '/templates/<template_id>/render')),
+    (15, ('POST', '/votes')),
+    (5, ('GET', '/ab-test/<test_id>/assign')),
+    (5, ('GET', '/analytics')),
+    (5, ('GET', '/evaluations/metrics')),
+)
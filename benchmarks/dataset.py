@@ -0,0 +1,153 @@
+"""
+Synthetic Dataset Generator
+Seeds a database with templates, version history, optimizations, votes,
+evaluation logs and A/B tests through the skills' own write paths, so
+derived state (summaries, rollups, accumulators) matches real traffic.
+
+Usage: python benchmarks/dataset.py --db PATH [--scale small|medium|large] [--votes N ...]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.db import transaction
+from src.main import initialize_database
+from src.skills.collect_votes import insert_votes, _vote_row
+from src.skills.generate_optimization import generate_optimization
+from src.skills.log_evaluations import log_evaluations
+from src.skills.manage_templates import manage_templates
+from src.skills.run_ab_test import run_ab_test
+
+# Row counts per scale; any of them can be overridden individually
+SCALES = {
+    'small': {'templates': 200, 'versions': 3, 'optimizations': 500, 'votes': 20000,
+              'evaluations': 5000, 'ab_tests': 5},
+    'medium': {'templates': 2000, 'versions': 5, 'optimizations': 5000, 'votes': 200000,
+               'evaluations': 50000, 'ab_tests': 20},
+    'large': {'templates': 20000, 'versions': 10, 'optimizations': 50000, 'votes': 2000000,
+              'evaluations': 500000, 'ab_tests': 100},
+}
+
+CHUNK_SIZE = 10000
+
+WORDS = ("summarize", "context", "customer", "report", "answer", "concise", "step", "explain",
+         "policy", "format", "tone", "example", "review", "detail", "question", "draft")
+
+
+def template_content(rng, lines):
+    body = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))) + '.' for _ in range(lines)]
+    body.insert(rng.randrange(len(body) + 1), "Use {variable} and {audience} when answering.")
+    return '\n'.join(body)
+
+
+def seed(sizes, rng_seed=42, log=print):
+    """Fill the current database and return ids that benchmarks can sample from"""
+    rng = random.Random(rng_seed)
+    sample = {}
+
+    start = time.perf_counter()
+    template_ids = []
+    with transaction():
+        for i in range(sizes['templates']):
+            content = template_content(rng, rng.randint(5, 40))
+            template_id = manage_templates('create', {
+                'name': f"template {i}", 'description': f"Synthetic template {i}", 'content': content
+            })['template_id']
+            for _ in range(sizes['versions'] - 1):
+                lines = content.split('\n')
+                lines[rng.randrange(len(lines))] = ' '.join(rng.choice(WORDS) for _ in range(8)) + '.'
+                content = '\n'.join(lines)
+                manage_templates('update', {'content': content}, template_id)
+            template_ids.append(template_id)
+    log(f"  {len(template_ids):,} templates x {sizes['versions']} versions ({time.perf_counter() - start:.1f}s)")
+
+    start = time.perf_counter()
+    prompt_ids = []
+    with transaction():
+        for i in range(sizes['optimizations']):
+            result = generate_optimization(f"Synthetic prompt {i}: {template_content(rng, 2)}")
+            prompt_ids.append(result['optimization_id'])
+    log(f"  {len(prompt_ids):,} optimizations ({time.perf_counter() - start:.1f}s)")
+    prompt_ids = prompt_ids or template_ids
+
+    # A/B tests compare pairs of prompts so incoming votes update their accumulators;
+    # alpha 0 keeps them running however lopsided the synthetic votes are
+    start = time.perf_counter()
+    test_ids = []
+    for i in range(min(sizes['ab_tests'], len(prompt_ids) // 2)):
+        result = run_ab_test(
+            {'name': f"test {i}", 'sample_size': 10 ** 9, 'duration_days': 14, 'metric': 'votes', 'alpha': 0.0},
+            prompt_ids[2 * i], prompt_ids[2 * i + 1]
+        )
+        test_ids.append(result['test_id'])
+    log(f"  {len(test_ids):,} A/B tests ({time.perf_counter() - start:.1f}s)")
+
+    # Votes follow a long tail: a few prompts collect most of the feedback
+    start = time.perf_counter()
+    remaining = sizes['votes']
+    while remaining > 0:
+        count = min(CHUNK_SIZE, remaining)
+        insert_votes([
+            _vote_row(
+                prompt_ids[min(int(rng.paretovariate(1.2)) - 1, len(prompt_ids) - 1)],
+                f"user{rng.randrange(50000)}",
+                rng.choices((1, 2, 3, 4, 5), (5, 8, 20, 37, 30))[0]
+            ) for _ in range(count)
+        ])
+        remaining -= count
+    log(f"  {sizes['votes']:,} votes ({time.perf_counter() - start:.1f}s)")
+
+    start = time.perf_counter()
+    version_ids = [f"version-{i}" for i in range(max(1, sizes['templates'] // 10))]
+    log_evaluations(
+        {
+            'version_id': rng.choice(version_ids),
+            'response': f"response {i}",
+            'metrics': {'accuracy': rng.random(), 'latency_ms': rng.randint(50, 2000), 'tokens': rng.randint(10, 800)},
+            'human_score': rng.randint(1, 5)
+        } for i in range(sizes['evaluations'])
+    )
+    log(f"  {sizes['evaluations']:,} evaluation logs ({time.perf_counter() - start:.1f}s)")
+
+    sample.update(template_ids=template_ids, prompt_ids=prompt_ids, test_ids=test_ids, version_ids=version_ids)
+    return sample
+
+
+def build(db_path, sizes, log=print):
+    """Create and seed a database file, leaving it configured as the active database"""
+    db.configure(db_path)
+    initialize_database()
+    log(f"Seeding {db_path}...")
+    return seed(sizes, log=log)
+
+
+def add_size_arguments(parser):
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    for name in SCALES['small']:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name,
+                            help=f"override the scale's {name} count")
+
+
+def sizes_from_args(args):
+    sizes = dict(SCALES[args.scale])
+    for name in sizes:
+        if getattr(args, name) is not None:
+            sizes[name] = getattr(args, name)
+    return sizes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', required=True, help='new database file to create')
+    add_size_arguments(parser)
+    args = parser.parse_args()
+    if os.path.exists(args.db):
+        parser.error(f"{args.db} already exists; seed into a new file")
+    build(args.db, sizes_from_args(args))
+    db.configure(None)
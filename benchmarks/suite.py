@@ -0,0 +1,269 @@
+"""
+Benchmark Suite
+Seeds a synthetic dataset into a temporary database, runs a micro-benchmark
+for every skill, an end-to-end benchmark for every API route through the
+Flask test client, a concurrent load test over a weighted request mix, and
+cold-start timings of fresh interpreters.
+Results are written as JSON and compared against a stored baseline; the
+exit status is non-zero when anything regressed beyond the threshold or a
+route has no benchmark case.
+
+Usage: python benchmarks/suite.py [--scale small|medium|large] [--only PATTERN]
+       [--output results.json] [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import db
+from src.config import load_config
+from src.api.routes import create_app
+
+import bench_startup
+import cases
+import dataset
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Differences below this are treated as timer noise, whatever the ratio
+NOISE_FLOOR_US = 20.0
+
+
+def measure(func, min_time=0.3, rounds=3, min_iterations=5, max_iterations=100000):
+    """Time func(i) repeatedly; returns latency statistics in microseconds
+
+    The case runs in several rounds of min_time and the round with the
+    lowest median is reported, which damps scheduler and I/O noise.
+    """
+    func(-1)  # warm caches and compiled statements
+    best, i = None, 0
+    for _ in range(rounds):
+        latencies = []
+        deadline = time.perf_counter() + min_time
+        while len(latencies) < max_iterations and (len(latencies) < min_iterations or time.perf_counter() < deadline):
+            start = time.perf_counter()
+            func(i)
+            latencies.append(time.perf_counter() - start)
+            i += 1
+        stats = summarize(latencies, sum(latencies))
+        if best is None or stats['p50_us'] < best['p50_us']:
+            best = stats
+    return best
+
+
+def calibrate():
+    """Time a fixed pure-Python workload, used to normalize for machine speed"""
+    def workload(i):
+        total = 0
+        for n in range(20000):
+            total += n * n % 7
+        return total
+    return measure(workload, min_time=0.1, rounds=5)['p50_us']
+
+
+def summarize(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'iterations': len(latencies),
+        'ops_per_sec': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'mean_us': round(statistics.fmean(latencies) * 1e6, 2),
+        'p50_us': round(latencies[len(latencies) // 2] * 1e6, 2),
+        'p95_us': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1e6, 2),
+    }
+
+
+def route_key(method, rule):
+    return f"{method} {rule}"
+
+
+def app_routes(app):
+    """Every (method, rule) served by the app"""
+    return {
+        (method, rule.rule)
+        for rule in app.url_map.iter_rules() if rule.endpoint != 'static'
+        for method in rule.methods - {'HEAD', 'OPTIONS'}
+    }
+
+
+def run_load(app, sample, clients, requests, rng_seed=7):
+    """Replay the weighted request mix from concurrent clients"""
+    weights, keys = zip(*cases.LOAD_MIX)
+    latencies, errors, lock = [], {}, threading.Lock()
+
+    def client_loop(index):
+        client = app.test_client()
+        calls = {key: cases.ROUTE_CASES[key](sample, client) for key in keys}
+        rng = random.Random(rng_seed + index)
+        local = []
+        for i in range(index, requests, clients):
+            key = rng.choices(keys, weights)[0]
+            start = time.perf_counter()
+            response = calls[key](i)
+            local.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                with lock:
+                    errors[route_key(*key)] = errors.get(route_key(*key), 0) + 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client_loop, args=(index,)) for index in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    result = summarize(latencies, elapsed)
+    result.update(clients=clients, errors=errors)
+    return result
+
+
+def compare(results, baseline, threshold):
+    """List (name, baseline, current, ratio) for every case slower than threshold allows
+
+    Baseline timings are first scaled by the ratio of the two calibration
+    runs, so a slower or busier machine does not read as a regression.
+    """
+    speed = results['meta']['calibration_us'] / baseline['meta'].get('calibration_us', results['meta']['calibration_us'])
+    regressions = []
+    for section in ('skills', 'routes', 'startup'):
+        for name, current in results[section].items():
+            before = baseline.get(section, {}).get(name)
+            if not before:
+                continue
+            expected = before['p50_us'] * speed
+            ratio = current['p50_us'] / expected
+            if ratio > 1 + threshold and current['p50_us'] - expected > NOISE_FLOOR_US:
+                regressions.append((f"{section}/{name}", expected, current['p50_us'], ratio))
+    load, before = results.get('load'), baseline.get('load')
+    if load and before:
+        expected = before['ops_per_sec'] / speed
+        ratio = expected / load['ops_per_sec']
+        if ratio > 1 + threshold:
+            regressions.append(('load/ops_per_sec', expected, load['ops_per_sec'], ratio))
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def run(sizes, scale, only=None, min_time=0.1, rounds=3, clients=8, requests=2000, startup_repeats=10, log=print):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Anything that falls back to the configured path, including the startup
+        # subprocesses, uses the throwaway database rather than promptops.db
+        previous = os.environ.get('PROMPTOPS_DB_PATH')
+        os.environ['PROMPTOPS_DB_PATH'] = os.path.join(tmp, 'suite.db')
+        # Time the /profiling routes themselves rather than their disabled 404
+        load_config()['profiling']['runtime_api'] = True
+        start = time.perf_counter()
+        sample = dataset.build(os.path.join(tmp, 'suite.db'), sizes, log=log)
+        log(f"Dataset ready in {time.perf_counter() - start:.1f}s")
+
+        results = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'scale': scale,
+                'sizes': sizes,
+                'calibration_us': calibrate(),
+            },
+            'skills': {},
+            'routes': {},
+        }
+
+        def selected(name):
+            return only is None or fnmatch.fnmatch(name, only)
+
+        for name, factory in cases.SKILL_CASES.items():
+            if selected(f"skills/{name}"):
+                results['skills'][name] = measure(factory(sample), min_time, rounds)
+                log(f"  skill {name:<44}{results['skills'][name]['p50_us']:>12.1f} us")
+
+        app = create_app()
+        client = app.test_client()
+        for key, factory in cases.ROUTE_CASES.items():
+            name = route_key(*key)
+            if selected(f"routes/{name}"):
+                results['routes'][name] = measure(factory(sample, client), min_time, rounds)
+                log(f"  route {name:<44}{results['routes'][name]['p50_us']:>12.1f} us")
+
+        if requests and selected('load'):
+            results['load'] = run_load(app, sample, clients, requests)
+            log(f"  load  {clients} clients: {results['load']['ops_per_sec']:.0f} req/s, "
+                f"p95 {results['load']['p95_us'] / 1000:.1f} ms, errors: {results['load']['errors'] or 'none'}")
+
+        if startup_repeats and selected('startup'):
+            results['startup'] = bench_startup.run(startup_repeats, log=log)
+
+        results['uncovered_routes'] = sorted(route_key(*key) for key in app_routes(app) - set(cases.ROUTE_CASES))
+        if previous is None:
+            del os.environ['PROMPTOPS_DB_PATH']
+        else:
+            os.environ['PROMPTOPS_DB_PATH'] = previous
+        load_config()
+        db.configure(None)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    dataset.add_size_arguments(parser)
+    parser.add_argument('--only', help="run cases matching a glob, e.g. 'skills/manage_templates.*' or 'routes/GET *'")
+    parser.add_argument('--min-time', type=float, default=0.1, help='seconds per timing round of each case')
+    parser.add_argument('--rounds', type=int, default=3, help='timing rounds per case; the best median is kept')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent clients in the load test')
+    parser.add_argument('--requests', type=int, default=2000, help='requests in the load test (0 to skip)')
+    parser.add_argument('--startup-repeats', type=int, default=10,
+                        help='fresh interpreters per startup target (0 to skip)')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='allowed slowdown before flagging, as a fraction (tighten on dedicated hardware)')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    args = parser.parse_args()
+
+    results = run(dataset.sizes_from_args(args), args.scale, args.only, args.min_time, args.rounds,
+                  args.clients, args.requests, args.startup_repeats)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    failed = False
+    if results['uncovered_routes']:
+        print(f"Routes without a benchmark case: {', '.join(results['uncovered_routes'])}")
+        failed = True
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['meta']['sizes'] != results['meta']['sizes']:
+            print("Warning: baseline was recorded with different dataset sizes")
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before:.1f} -> {after:.1f} ({ratio:.2f}x)")
+        print(f"{len(regressions)} regression(s) against {args.baseline}")
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,27 @@
+"""
+Test Configuration
+Points every test at a throwaway database instead of promptops.db in the working directory
+"""
+
+import os
+
+import pytest
+
+from src import db, repositories
+from src.config import load_config
+
+
+@pytest.fixture(autouse=True)
+def isolated_database(tmp_path):
+    previous = os.environ.get('PROMPTOPS_DB_PATH')
+    os.environ['PROMPTOPS_DB_PATH'] = str(tmp_path / 'promptops.db')
+    load_config()
+    db.configure(None)
+    yield
+    if previous is None:
+        del os.environ['PROMPTOPS_DB_PATH']
+    else:
+        os.environ['PROMPTOPS_DB_PATH'] = previous
+    load_config()
+    repositories.configure(None)
+    db.configure(None)
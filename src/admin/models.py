@@ -0,0 +1,68 @@
+"""
+Admin Models Module
+SQLAlchemy models over the promptops tables, used by the admin views
+"""
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, Numeric, String, Text
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+
+class Template(Base):
+    __tablename__ = 'templates'
+
+    id = Column(String, primary_key=True)
+    name = Column(String, nullable=False)
+    description = Column(Text)
+    template_content = Column(Text, nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    is_active = Column(Boolean)
+
+    def __str__(self):
+        return self.name
+
+
+class ABTest(Base):
+    __tablename__ = 'ab_tests'
+
+    id = Column(String, primary_key=True)
+    name = Column(String, nullable=False)
+    variant_a_id = Column(String)
+    variant_b_id = Column(String)
+    sample_size = Column(Integer)
+    duration_days = Column(Integer)
+    status = Column(String)
+    created_at = Column(DateTime)
+
+
+class Vote(Base):
+    __tablename__ = 'user_votes'
+
+    id = Column(String, primary_key=True)
+    prompt_id = Column(String)
+    user_id = Column(String)
+    score = Column(Integer)
+    comment = Column(Text)
+    timestamp = Column(DateTime)
+
+
+class OptimizedPrompt(Base):
+    __tablename__ = 'optimized_prompts'
+
+    id = Column(String, primary_key=True)
+    original_prompt_id = Column(String)
+    optimized_content = Column(Text, nullable=False)
+    created_at = Column(DateTime)
+    improvement_score = Column(Float)
+
+
+class AnalyticsSummary(Base):
+    __tablename__ = 'analytics_summary'
+
+    metric = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
+    total = Column(Numeric, nullable=False)
+    min_value = Column(Numeric)
+    max_value = Column(Numeric)
@@ -3,59 +3,224 @@ Admin Views Module
 Flask-Admin templates for managing the promptops platform
 """
 
+from collections import OrderedDict
+import threading
+import time
+
 from flask import Flask
 from flask_admin import Admin
-from flask_admin.contrib.sqla import ModelView
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-import sqlite3
-import os
-
-# Initialize Flask app
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'promptops-admin-secret-key'
-
-# Setup database connection
-DATABASE_PATH = os.path.abspath('promptops.db')
-engine = create_engine(f'sqlite:///{DATABASE_PATH}')
-Session = sessionmaker(bind=engine)
-session = Session()
-
-# Create admin interface
-admin = Admin(app, name='PromptOps Admin', template_mode='bootstrap3')
-
-# Define model views for different entities
-class TemplateView(ModelView):
+from flask_admin.contrib.sqla import ModelView, tools
+from flask_admin.contrib.sqla.filters import (BooleanEqualFilter, DateTimeBetweenFilter, DateTimeGreaterFilter,
+                                              DateTimeSmallerFilter, FilterEqual)
+from sqlalchemy import create_engine, func, literal, tuple_
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from src import db
+from src.admin.models import ABTest, AnalyticsSummary, OptimizedPrompt, Template, Vote
+from src.config import get_setting
+from src.sdk.context_engine import create_template, delete_template, update_template
+
+# Page bookmarks and filtered row counts remembered per view, across sorts and filters
+BOOKMARK_LIMIT = 1024
+COUNT_LIMIT = 256
+
+
+class KeysetModelView(ModelView):
+    """ModelView that pages by keyset and avoids exact counts on large tables
+
+    Rows are ordered by the sort column and then the primary key, and each
+    page's last key is kept as a bookmark: the next page is read with
+    WHERE (sort, id) < bookmark from an index instead of an OFFSET scan.
+    Pages reached without a bookmark (jumping ahead) fall back to OFFSET.
+    Sortable and filterable columns should be limited to indexed ones, and
+    filters to the equality and range operations an index can serve.
+
+    Row counts are cached for count_ttl seconds. An unfiltered view whose
+    table has an analytics_summary row (count_metric) reads its count from
+    there; any other count stops at count_limit rows, and a view with more
+    rows than that is paged without a total (next/previous only).
+    """
+
+    can_set_page_size = False
+    count_metric = None
+
+    def __init__(self, model, session, **kwargs):
+        self.page_size = get_setting('admin', 'page_size', 50)
+        self.count_ttl = get_setting('admin', 'count_ttl', 30.0)
+        self.count_limit = get_setting('admin', 'count_limit', 10000)
+        self._counts = OrderedDict()
+        self._counts_lock = threading.Lock()
+        self._bookmarks = OrderedDict()
+        self._bookmarks_lock = threading.Lock()
+        super().__init__(model, session, **kwargs)
+
+    def get_list(self, page, sort_column, sort_desc, search, filters, execute=True, page_size=None):
+        query = self.get_query()
+        if filters and self._filters:
+            query, _, _, _ = self._apply_filters(query, None, {}, {}, filters)
+        filter_key = tuple(tuple(flt) for flt in filters or ())
+        count = self._count(query, filter_key)
+
+        if sort_column is not None and sort_column in self._sortable_columns:
+            sort_field = self._sortable_columns[sort_column]
+        else:
+            sort_column, sort_desc = self.column_default_sort
+            sort_field, _ = tools.get_field_with_path(self.model, sort_column)
+        key_columns = (sort_field, getattr(self.model, self._primary_key))
+        query = query.order_by(*(column.desc() if sort_desc else column.asc() for column in key_columns))
+
+        if page_size is None:
+            page_size = self.page_size
+        state = (sort_column, bool(sort_desc), filter_key, page_size)
+        bookmark = self._get_bookmark(state, page - 1) if page else None
+        if bookmark is not None:
+            position = tuple_(*key_columns)
+            query = query.filter(position < bookmark if sort_desc else position > bookmark)
+        elif page and page_size:
+            query = query.offset(page * page_size)
+        if page_size:
+            query = query.limit(page_size)
+
+        if not execute:
+            return count, query
+        rows = query.all()
+        if rows and page_size:
+            last = rows[-1]
+            self._set_bookmark(state, page or 0, tuple(getattr(last, column.key) for column in key_columns))
+        return count, rows
+
+    def _get_bookmark(self, state, page):
+        with self._bookmarks_lock:
+            key = self._bookmarks.get((state, page))
+            if key is not None:
+                self._bookmarks.move_to_end((state, page))
+        # Keysets cannot step over NULL sort values
+        return key if key is not None and None not in key else None
+
+    def _set_bookmark(self, state, page, key):
+        with self._bookmarks_lock:
+            self._bookmarks[(state, page)] = key
+            self._bookmarks.move_to_end((state, page))
+            while len(self._bookmarks) > BOOKMARK_LIMIT:
+                self._bookmarks.popitem(last=False)
+
+    def _count(self, query, filter_key):
+        now = time.monotonic()
+        with self._counts_lock:
+            cached = self._counts.get(filter_key)
+            if cached is not None and cached[0] > now:
+                self._counts.move_to_end(filter_key)
+                return cached[1]
+
+        count = None
+        if not filter_key and self.count_metric:
+            count = self.session.query(AnalyticsSummary.count).filter_by(metric=self.count_metric).scalar()
+        if count is None:
+            # Count the filtered rows, but never more than count_limit of them
+            capped = query.with_entities(literal(1)).limit(self.count_limit).subquery()
+            count = self.session.query(func.count()).select_from(capped).scalar()
+            if count >= self.count_limit:
+                count = None  # unknown total: Flask-Admin shows its simple pager
+        with self._counts_lock:
+            self._counts[filter_key] = (now + self.count_ttl, count)
+            self._counts.move_to_end(filter_key)
+            while len(self._counts) > COUNT_LIMIT:
+                self._counts.popitem(last=False)
+        return count
+
+
+def range_filters(column, name):
+    """Index-friendly filters on a datetime column (no negations or emptiness checks)"""
+    return [DateTimeGreaterFilter(column, name), DateTimeSmallerFilter(column, name),
+            DateTimeBetweenFilter(column, name)]
+
+
+class TemplateView(KeysetModelView):
+    """Templates; writes go through the context engine so versions and caches stay in step"""
+
     column_list = ('id', 'name', 'description', 'created_at', 'is_active')
-    column_filters = ['name', 'is_active', 'created_at']
+    column_sortable_list = ('created_at',)
+    column_default_sort = ('created_at', True)
+    column_filters = [BooleanEqualFilter(Template.is_active, 'Active')] + range_filters(Template.created_at, 'Created')
     form_columns = ['name', 'description', 'template_content', 'is_active']
 
-class ABTestView(ModelView):
+    def create_model(self, form):
+        result = create_template(form.name.data, form.description.data or '', form.template_content.data)
+        if not form.is_active.data:
+            update_template(result['template_id'], is_active=False)
+        return self.session.get(Template, result['template_id'])
+
+    def update_model(self, form, model):
+        update_template(model.id, form.name.data, form.description.data, form.template_content.data,
+                        form.is_active.data)
+        self.session.expire(model)
+        return True
+
+    def delete_model(self, model):
+        delete_template(model.id)
+        return True
+
+
+class ABTestView(KeysetModelView):
+    # Test state and snapshots are maintained by run_ab_test, so the admin only reads
+    can_create = can_edit = can_delete = False
     column_list = ('id', 'name', 'status', 'created_at', 'duration_days')
-    column_filters = ['name', 'status', 'created_at']
-    form_columns = ['name', 'variant_a_id', 'variant_b_id', 'sample_size', 'duration_days', 'status']
+    column_sortable_list = ('created_at',)
+    column_default_sort = ('created_at', True)
+    column_filters = [FilterEqual(ABTest.status, 'Status')]
 
-class VoteView(ModelView):
+
+class VoteView(KeysetModelView):
+    # Votes feed the analytics summary and A/B statistics, so they are read-only here
+    can_create = can_edit = can_delete = False
     column_list = ('id', 'prompt_id', 'user_id', 'score', 'timestamp')
-    column_filters = ['user_id', 'score', 'timestamp']
-    form_columns = ['prompt_id', 'user_id', 'score', 'comment']
+    column_sortable_list = ('timestamp',)
+    column_default_sort = ('timestamp', True)
+    column_filters = [FilterEqual(Vote.prompt_id, 'Prompt ID')] + range_filters(Vote.timestamp, 'Timestamp')
+    count_metric = 'votes'
+
 
-class OptimizedPromptView(ModelView):
+class OptimizedPromptView(KeysetModelView):
+    can_create = can_edit = can_delete = False
     column_list = ('id', 'original_prompt_id', 'improvement_score', 'created_at')
-    column_filters = ['improvement_score', 'created_at']
-    form_columns = ['original_prompt_id', 'optimized_content', 'improvement_score']
+    column_sortable_list = ('created_at',)
+    column_default_sort = ('created_at', True)
+    column_filters = range_filters(OptimizedPrompt.created_at, 'Created')
+    count_metric = 'optimizations'
+
+
+def create_session(db_path=None):
+    """Scoped session factory over the tuned connections from src.db"""
+    db_path = db_path or db.get_db_path()
+    engine = create_engine(f'sqlite:///{db_path}', creator=lambda: db.connect(db_path))
+    return scoped_session(sessionmaker(bind=engine))
+
+
+def create_admin_app(db_path=None):
+    """Create the admin app with one SQLAlchemy session per request"""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'promptops-admin-secret-key'
+    session = create_session(db_path)
 
+    @app.teardown_appcontext
+    def remove_session(exc):
+        session.remove()
 
-def init_admin_views():
-    """Initialize admin views"""
-    # We'll add views dynamically based on available models
-    print("Admin views initialized")
+    admin = Admin(app, name='PromptOps Admin', template_mode='bootstrap3')
+    admin.add_view(TemplateView(Template, session, name='Templates'))
+    admin.add_view(ABTestView(ABTest, session, name='A/B Tests'))
+    admin.add_view(VoteView(Vote, session, name='Votes'))
+    admin.add_view(OptimizedPromptView(OptimizedPrompt, session, name='Optimized Prompts'))
+    return app
 
 
-def run_admin_server():
+def run_admin_server(host=None, port=None):
     """Start the admin server"""
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    create_admin_app().run(
+        host=host or get_setting('admin', 'host', '0.0.0.0'),
+        port=port or get_setting('admin', 'port', 5001)
+    )
 
 
 if __name__ == '__main__':
-    run_admin_server()
\ No newline at end of file
+    run_admin_server()
@@ -0,0 +1,402 @@
+"""
+ASGI API Module
+The REST API on Starlette, running skills off the event loop
+"""
+
+import json
+import tempfile
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from src import metrics
+from src.api.routes import parse_bool, register_cache_metrics
+from src.sdk.aio import AsyncContextEngine, AsyncSmartRewriter, run_sync
+from src.sdk.context_engine import template_etag, TemplateRenderError
+from src.skills.collect_votes import IdempotencyConflictError
+
+
+class APIResponse(JSONResponse):
+    """JSON response that serializes timestamps and other values as strings"""
+
+    def render(self, content):
+        return json.dumps(content, default=str, separators=(',', ':')).encode('utf-8')
+
+
+# Rows per keyset page when exporting, and request bytes kept in memory before spooling to disk
+EXPORT_PAGE_SIZE = 1000
+IMPORT_SPOOL_SIZE = 8 << 20
+
+
+def error(message, status_code):
+    return APIResponse({'error': message}, status_code=status_code)
+
+
+def query_int(request, name, default=None):
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def query_float(request, name):
+    value = request.query_params.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def create_asgi_app():
+    engine = AsyncContextEngine()
+    rewriter = AsyncSmartRewriter()
+    if metrics.enabled():
+        register_cache_metrics()
+
+    # Context Engine API routes
+    async def get_templates(request):
+        """List context templates (same query parameters as the Flask API)"""
+        args = request.query_params
+        fields = args.get('fields')
+        fields = fields.split(',') if fields else None
+        is_active = parse_bool(args.get('is_active'))
+        try:
+            if args.get('format') == 'ndjson' or request.headers.get('accept') == 'application/x-ndjson':
+                # Validate up front so bad fields return 400 instead of a broken stream
+                first = await engine.list_templates_page(None, 1, fields, is_active)
+
+                async def lines():
+                    if first['templates']:
+                        async for row in engine.iter_template_pages(fields, is_active):
+                            yield json.dumps(row, default=str) + '\n'
+
+                return StreamingResponse(lines(), media_type='application/x-ndjson')
+            if 'after' in args or 'limit' in args:
+                page = await engine.list_templates_page(
+                    args.get('after'), query_int(request, 'limit', 100), fields, is_active
+                )
+                return APIResponse(page)
+            if fields or is_active is not None:
+                return APIResponse([row async for row in engine.iter_template_pages(fields, is_active)])
+        except ValueError as e:
+            return error(str(e), 400)
+        return APIResponse(await engine.list_templates())
+
+    async def create_new_template(request):
+        """Create a new context template"""
+        data = await request.json()
+        result = await engine.create_template(data['name'], data.get('description', ''), data['content'])
+        return APIResponse(result)
+
+    async def search_template_library(request):
+        """Full-text search over templates (same query parameters as the Flask API)"""
+        try:
+            result = await engine.search_templates(
+                request.query_params.get('q'), query_int(request, 'limit'), query_int(request, 'offset', 0)
+            )
+        except ValueError as e:
+            return error(str(e), 400)
+        return APIResponse(result)
+
+    async def get_single_template(request):
+        """Get a specific template"""
+        template = await engine.get_template(request.path_params['template_id'])
+        if template is None:
+            return error('Template not found', 404)
+        etag = f'"{template_etag(template)}"'
+        if_none_match = request.headers.get('if-none-match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            return Response(status_code=304, headers={'ETag': etag})
+        return APIResponse(template, headers={'ETag': etag})
+
+    async def update_existing_template(request):
+        """Update an existing template"""
+        data = await request.json()
+        result = await engine.update_template(
+            request.path_params['template_id'],
+            name=data.get('name'),
+            description=data.get('description'),
+            content=data.get('content')
+        )
+        return APIResponse(result)
+
+    async def delete_existing_template(request):
+        """Delete a template"""
+        return APIResponse(await engine.delete_template(request.path_params['template_id']))
+
+    async def render_single_template(request):
+        """Render a template with a set of variables"""
+        template_id = request.path_params['template_id']
+        data = await request.json()
+        try:
+            output = await engine.render_template(template_id, data.get('variables', {}), data.get('strict', False))
+        except TemplateRenderError as e:
+            return error(str(e), 400)
+        if output is None:
+            return error('Template not found', 404)
+        return APIResponse({'template_id': template_id, 'output': output})
+
+    async def render_template_variable_sets(request):
+        """Render a template against many variable sets in one call"""
+        data = await request.json()
+        try:
+            result = await engine.render_template_batch(
+                request.path_params['template_id'], data['variable_sets'], data.get('strict', False)
+            )
+        except TemplateRenderError as e:
+            return error(str(e), 400)
+        if result is None:
+            return error('Template not found', 404)
+        return APIResponse(result)
+
+    async def get_similar_templates(request):
+        """List near-duplicates of a template, most similar first"""
+        result = await engine.find_similar_templates(
+            request.path_params['template_id'], query_float(request, 'min_similarity'), query_int(request, 'limit')
+        )
+        if result is None:
+            return error('Template not found', 404)
+        return APIResponse(result)
+
+    async def get_template_versions(request):
+        """List a template's version history"""
+        return APIResponse(await engine.list_template_versions(request.path_params['template_id']))
+
+    async def get_single_template_version(request):
+        """Get the content of one template version"""
+        result = await engine.get_template_version(request.path_params['template_id'], request.path_params['version'])
+        if result is None:
+            return error('Template version not found', 404)
+        return APIResponse(result)
+
+    async def diff_template(request):
+        """Get a unified diff between two template versions"""
+        template_id = request.path_params['template_id']
+        from_version = query_int(request, 'from')
+        to_version = query_int(request, 'to')
+        if from_version is None or to_version is None:
+            return error('from and to versions are required', 400)
+        diff = await engine.diff_template_versions(template_id, from_version, to_version)
+        if diff is None:
+            return error('Template version not found', 404)
+        return APIResponse({'template_id': template_id, 'from': from_version, 'to': to_version, 'diff': diff})
+
+    async def rollback_template_version(request):
+        """Restore an earlier version of a template as its newest version"""
+        version = (await request.json()).get('version')
+        if not isinstance(version, int):
+            return error('version must be an integer', 400)
+        result = await engine.rollback_template(request.path_params['template_id'], version)
+        if result is None:
+            return error('Template version not found', 404)
+        return APIResponse(result)
+
+    async def run_ab_test(request):
+        """Run an A/B test on context strategies"""
+        data = await request.json()
+        try:
+            result = await engine.run_ab_test(data['config'], data['variant_a'], data['variant_b'])
+        except ValueError as e:
+            return error(str(e), 400)
+        return APIResponse(result)
+
+    async def get_ab_test_result(request):
+        """Get the current results of an A/B test"""
+        result = await engine.get_ab_test(request.path_params['test_id'])
+        if result:
+            return APIResponse(result)
+        return error('A/B test not found', 404)
+
+    async def assign_ab_test(request):
+        """Get the variant a user should be served in a running A/B test"""
+        user_id = request.query_params.get('user_id')
+        if not user_id:
+            return error('user_id is required', 400)
+        # Assignment reads the in-memory snapshot, so it runs on the event loop
+        assignment = engine.sync.assign_variant(request.path_params['test_id'], user_id)
+        if assignment:
+            return APIResponse(assignment)
+        return error('A/B test not found or not running', 404)
+
+    async def recompute_ab_test_result(request):
+        """Rebuild an A/B test's statistics from the raw logs"""
+        result = await engine.recompute_ab_test(request.path_params['test_id'])
+        if result:
+            return APIResponse(result)
+        return error('A/B test not found', 404)
+
+    # Smart Rewriter API routes
+    async def optimize_prompt(request):
+        """Optimize a prompt"""
+        data = await request.json()
+        result = await rewriter.generate_optimization(data['prompt'], data.get('context'), data.get('performance_data'))
+        return APIResponse(result)
+
+    async def optimization_cache_stats(request):
+        """Get hit/miss statistics for memoized optimizations"""
+        return APIResponse(await rewriter.get_optimization_cache_stats())
+
+    async def optimize_context_processing(request):
+        """Optimize context processing"""
+        data = await request.json()
+        try:
+            result = await engine.optimize_templates(
+                data.get('template_ids'),
+                data.get('context'),
+                max_workers=data.get('max_workers'),
+                timeout=data.get('timeout'),
+                dedupe=data.get('dedupe')
+            )
+        except ValueError as e:
+            return error(str(e), 400)
+        return APIResponse(result)
+
+    async def submit_vote(request):
+        """Submit a vote on a prompt"""
+        data = await request.json()
+        try:
+            result = await rewriter.collect_votes(data['prompt_id'], data['user_id'], data['score'], data.get('comment', ''))
+        except ValueError as e:
+            return error(str(e), 400)
+        return APIResponse(result)
+
+    async def submit_votes_batch(request):
+        """Submit many votes in one request"""
+        data = await request.json()
+        idempotency_key = request.headers.get('idempotency-key') or data.get('idempotency_key')
+        try:
+            result = await rewriter.collect_votes_batch(data['votes'], idempotency_key)
+        except IdempotencyConflictError as e:
+            return error(str(e), 409)
+        except ValueError as e:
+            return error(str(e), 400)
+        return APIResponse(result)
+
+    async def get_top_prompts(request):
+        """List the best-rated prompts from the maintained vote aggregates"""
+        try:
+            result = await rewriter.top_prompts(
+                query_int(request, 'k'), query_int(request, 'min_votes'), request.query_params.get('by', 'bayesian')
+            )
+        except ValueError as e:
+            return error(str(e), 400)
+        return APIResponse(result)
+
+    async def get_prompt_score_data(request):
+        """Get a prompt's vote aggregates and scores"""
+        result = await rewriter.get_prompt_score(request.path_params['prompt_id'])
+        if result is None:
+            return error('No votes for this prompt', 404)
+        return APIResponse(result)
+
+    async def submit_evaluations_batch(request):
+        """Bulk-append evaluation logs"""
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        if not isinstance(data, dict) or not isinstance(data.get('logs'), list):
+            return error('Request body must be a JSON object with a logs list', 400)
+        try:
+            result = await rewriter.log_evaluations(data['logs'])
+        except ValueError as e:
+            return error(str(e), 400)
+        return APIResponse(result)
+
+    async def get_evaluation_metrics_data(request):
+        """Aggregate evaluation metrics by version and metric name"""
+        args = request.query_params
+        return APIResponse(await rewriter.get_evaluation_metrics(args.get('version_id'), args.get('metric')))
+
+    async def search_evaluations(request):
+        """Find evaluation logs by metric value"""
+        metric = request.query_params.get('metric')
+        if not metric:
+            return error('metric is required', 400)
+        return APIResponse(await rewriter.query_evaluations(
+            metric,
+            version_id=request.query_params.get('version_id'),
+            min_value=query_float(request, 'min'),
+            max_value=query_float(request, 'max'),
+            limit=min(query_int(request, 'limit', 100), 1000)
+        ))
+
+    async def get_analytics_data(request):
+        """Get optimization analytics and performance metrics"""
+        return APIResponse(await rewriter.get_analytics())
+
+    async def get_metrics(request):
+        """Expose latency histograms, counters and cache hit ratios in Prometheus text format"""
+        if not metrics.enabled():
+            return error('Metrics are disabled', 404)
+        return PlainTextResponse(metrics.REGISTRY.exposition(), media_type='text/plain; version=0.0.4')
+
+    # Bulk transfer routes
+    bulk_transfers = {
+        'templates': (engine.sync.import_templates, engine.sync.export_templates),
+        'votes': (rewriter.sync.import_votes, rewriter.sync.export_votes),
+    }
+
+    async def export_records(request):
+        """Stream all templates or votes as JSONL; gzip=true compresses the stream"""
+        kind = request.path_params['kind']
+        if kind not in bulk_transfers:
+            return error(f"Unknown bulk transfer kind: {kind}", 404)
+        compress = bool(parse_bool(request.query_params.get('gzip')))
+        # Keyset pages, since Starlette resumes the generator on any worker thread
+        chunks = bulk_transfers[kind][1](compress, EXPORT_PAGE_SIZE)
+        return StreamingResponse(chunks, media_type='application/gzip' if compress else 'application/x-ndjson')
+
+    async def import_records(request):
+        """Import templates or votes from a JSONL request body, gzip-compressed or not"""
+        kind = request.path_params['kind']
+        if kind not in bulk_transfers:
+            return error(f"Unknown bulk transfer kind: {kind}", 404)
+        with tempfile.SpooledTemporaryFile(IMPORT_SPOOL_SIZE) as body:
+            async for chunk in request.stream():
+                body.write(chunk)
+            body.seek(0)
+            try:
+                result = await run_sync(bulk_transfers[kind][0], body, query_int(request, 'batch_size'))
+            except ValueError as e:
+                return error(str(e), 400)
+        return APIResponse(result)
+
+    routes = [
+        Route('/templates', get_templates, methods=['GET']),
+        Route('/templates', create_new_template, methods=['POST']),
+        Route('/templates/search', search_template_library, methods=['GET']),
+        Route('/templates/{template_id}', get_single_template, methods=['GET']),
+        Route('/templates/{template_id}', update_existing_template, methods=['PUT']),
+        Route('/templates/{template_id}', delete_existing_template, methods=['DELETE']),
+        Route('/templates/{template_id}/render', render_single_template, methods=['POST']),
+        Route('/templates/{template_id}/render/batch', render_template_variable_sets, methods=['POST']),
+        Route('/templates/{template_id}/similar', get_similar_templates, methods=['GET']),
+        Route('/templates/{template_id}/versions', get_template_versions, methods=['GET']),
+        Route('/templates/{template_id}/versions/{version:int}', get_single_template_version, methods=['GET']),
+        Route('/templates/{template_id}/diff', diff_template, methods=['GET']),
+        Route('/templates/{template_id}/rollback', rollback_template_version, methods=['POST']),
+        Route('/ab-test', run_ab_test, methods=['POST']),
+        Route('/ab-test/{test_id}', get_ab_test_result, methods=['GET']),
+        Route('/ab-test/{test_id}/assign', assign_ab_test, methods=['GET']),
+        Route('/ab-test/{test_id}/recompute', recompute_ab_test_result, methods=['POST']),
+        Route('/optimize', optimize_prompt, methods=['POST']),
+        Route('/optimize/cache', optimization_cache_stats, methods=['GET']),
+        Route('/optimize-context', optimize_context_processing, methods=['POST']),
+        Route('/votes', submit_vote, methods=['POST']),
+        Route('/votes/batch', submit_votes_batch, methods=['POST']),
+        Route('/prompts/top', get_top_prompts, methods=['GET']),
+        Route('/prompts/{prompt_id}/score', get_prompt_score_data, methods=['GET']),
+        Route('/evaluations/batch', submit_evaluations_batch, methods=['POST']),
+        Route('/evaluations/metrics', get_evaluation_metrics_data, methods=['GET']),
+        Route('/evaluations', search_evaluations, methods=['GET']),
+        Route('/metrics', get_metrics, methods=['GET']),
+        Route('/analytics', get_analytics_data, methods=['GET']),
+        Route('/bulk/{kind}', export_records, methods=['GET']),
+        Route('/bulk/{kind}', import_records, methods=['POST']),
+    ]
+    return Starlette(routes=routes)
@@ -3,18 +3,124 @@ API Routes Module
 REST API endpoints for the promptops platform
 """
 
-from flask import Flask, request, jsonify
-from src.sdk.context_engine import ContextEngine, list_templates, create_template, get_template, update_template, delete_template, execute_ab_test, optimize_templates
-from src.sdk.smart_rewriter import SmartRewriter, generate_optimization, collect_votes, get_analytics
+from flask import Flask, Response, g, request, jsonify
+import json
+import os
+import time
+from src import metrics, profiling
+from src.config import get_setting
+from src.sdk.context_engine import ContextEngine, get_template_cache, get_template_renderer, template_etag, list_templates, list_templates_page, iter_templates, search_templates, create_template, get_template, update_template, delete_template, render_template, render_template_batch, list_template_versions, get_template_version, diff_template_versions, rollback_template, find_similar_templates, import_templates, export_templates, TemplateRenderError, execute_ab_test, get_ab_test, assign_ab_test_variant, optimize_templates
+from src.sdk.smart_rewriter import SmartRewriter, generate_optimization, get_optimization_cache_stats, collect_votes, collect_votes_batch, import_votes, export_votes, top_prompts, get_prompt_score, log_evaluations, get_evaluation_metrics, query_evaluations, get_analytics
+from src.skills.collect_votes import IdempotencyConflictError
+
+# kind -> (import from a binary stream, export as JSONL chunks)
+BULK_TRANSFERS = {
+    'templates': (import_templates, export_templates),
+    'votes': (import_votes, export_votes),
+}
+
+
+def parse_bool(value):
+    """Parse a boolean query parameter, returning None when absent"""
+    if value is None:
+        return None
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def register_cache_metrics():
+    """Export hit ratios of the shared template, renderer and optimization caches"""
+    metrics.register_cache('templates', get_template_cache().stats)
+    metrics.register_cache('compiled_templates', get_template_renderer().stats)
+    metrics.register_cache('optimizations', get_optimization_cache_stats)
+
+
+def instrument_app(app):
+    """Record the latency of every request by method, route rule and status"""
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_latency(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            rule = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.HTTP_LATENCY.observe(time.perf_counter() - started, request.method, rule, str(response.status_code))
+        return response
+
+    @app.teardown_request
+    def record_failed_request(exc):
+        # after_request is skipped when a view raises
+        started = g.pop('request_started', None)
+        if started is not None:
+            rule = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.HTTP_LATENCY.observe(time.perf_counter() - started, request.method, rule, '500')
+
+
+def profile_app(app, profiler):
+    """Profile requests selected by the profiler (trigger header or sample rate)
+
+    Unselected requests only pay for one header lookup; selected ones get
+    an X-Profile-Id response header naming the files written.
+    """
+    @app.before_request
+    def start_profile():
+        mode = profiler.select(request.headers, request.url_rule.rule if request.url_rule else None)
+        if mode is not None:
+            g.profile_session = profiler.start(f"{request.method} {request.path}", mode)
+
+    @app.after_request
+    def finish_profile(response):
+        session = g.pop('profile_session', None)
+        if session is not None:
+            paths = profiler.finish(session)
+            if paths:
+                response.headers['X-Profile-Id'] = os.path.splitext(os.path.basename(paths[0]))[0]
+        return response
+
+    @app.teardown_request
+    def finish_failed_profile(exc):
+        session = g.pop('profile_session', None)
+        if session is not None:
+            profiler.finish(session)
 
 
 def create_app():
     app = Flask(__name__)
+    if metrics.enabled():
+        instrument_app(app)
+        register_cache_metrics()
+    profiler = profiling.get_profiler()
+    profile_app(app, profiler)
     
     # Context Engine API routes
     @app.route('/templates', methods=['GET'])
     def get_templates():
-        """List all context templates"""
+        """List context templates
+
+        Query parameters: after/limit for keyset pages, fields for a comma
+        separated projection, is_active to filter, format=ndjson to stream.
+        """
+        fields = request.args.get('fields')
+        fields = fields.split(',') if fields else None
+        is_active = parse_bool(request.args.get('is_active'))
+        try:
+            if request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson':
+                rows = iter_templates(fields=fields, is_active=is_active)
+                lines = (json.dumps(row, default=str) + '\n' for row in rows)
+                return Response(lines, mimetype='application/x-ndjson')
+            if 'after' in request.args or 'limit' in request.args:
+                page = list_templates_page(
+                    after=request.args.get('after'),
+                    limit=request.args.get('limit', 100, type=int),
+                    fields=fields,
+                    is_active=is_active
+                )
+                return jsonify(page)
+            if fields or is_active is not None:
+                return jsonify(list(iter_templates(fields=fields, is_active=is_active)))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         templates = list_templates()
         return jsonify(templates)
 
@@ -29,12 +135,32 @@ def create_app():
         )
         return jsonify(result)
 
+    @app.route('/templates/search', methods=['GET'])
+    def search_template_library():
+        """Full-text search over templates; q supports prefix* terms, limit/offset page the ranking"""
+        try:
+            result = search_templates(
+                request.args.get('q'),
+                limit=request.args.get('limit', type=int),
+                offset=request.args.get('offset', 0, type=int)
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(result)
+
     @app.route('/templates/<template_id>', methods=['GET'])
     def get_single_template(template_id):
         """Get a specific template"""
         template = get_template(template_id)
         if template:
-            return jsonify(template)
+            # Let clients revalidate with If-None-Match and skip the payload
+            etag = template_etag(template)
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = jsonify(template)
+            response.set_etag(etag)
+            return response
         return jsonify({'error': 'Template not found'}), 404
 
     @app.route('/templates/<template_id>', methods=['PUT'])
@@ -55,17 +181,119 @@ def create_app():
         result = delete_template(template_id)
         return jsonify(result)
 
+    @app.route('/templates/<template_id>/render', methods=['POST'])
+    def render_single_template(template_id):
+        """Render a template with a set of variables"""
+        data = request.json
+        try:
+            output = render_template(template_id, data.get('variables', {}), strict=data.get('strict', False))
+        except TemplateRenderError as e:
+            return jsonify({'error': str(e)}), 400
+        if output is None:
+            return jsonify({'error': 'Template not found'}), 404
+        return jsonify({'template_id': template_id, 'output': output})
+
+    @app.route('/templates/<template_id>/render/batch', methods=['POST'])
+    def render_template_variable_sets(template_id):
+        """Render a template against many variable sets in one call"""
+        data = request.json
+        try:
+            result = render_template_batch(template_id, data['variable_sets'], strict=data.get('strict', False))
+        except TemplateRenderError as e:
+            return jsonify({'error': str(e)}), 400
+        if result is None:
+            return jsonify({'error': 'Template not found'}), 404
+        return jsonify(result)
+
+    @app.route('/templates/<template_id>/similar', methods=['GET'])
+    def get_similar_templates(template_id):
+        """List near-duplicates of a template, most similar first"""
+        result = find_similar_templates(
+            template_id,
+            min_similarity=request.args.get('min_similarity', type=float),
+            limit=request.args.get('limit', type=int)
+        )
+        if result is None:
+            return jsonify({'error': 'Template not found'}), 404
+        return jsonify(result)
+
+    @app.route('/templates/<template_id>/versions', methods=['GET'])
+    def get_template_versions(template_id):
+        """List a template's version history"""
+        return jsonify(list_template_versions(template_id))
+
+    @app.route('/templates/<template_id>/versions/<int:version>', methods=['GET'])
+    def get_single_template_version(template_id, version):
+        """Get the content of one template version"""
+        result = get_template_version(template_id, version)
+        if result is None:
+            return jsonify({'error': 'Template version not found'}), 404
+        return jsonify(result)
+
+    @app.route('/templates/<template_id>/diff', methods=['GET'])
+    def diff_template(template_id):
+        """Get a unified diff between two template versions"""
+        from_version = request.args.get('from', type=int)
+        to_version = request.args.get('to', type=int)
+        if from_version is None or to_version is None:
+            return jsonify({'error': 'from and to versions are required'}), 400
+        diff = diff_template_versions(template_id, from_version, to_version)
+        if diff is None:
+            return jsonify({'error': 'Template version not found'}), 404
+        return jsonify({'template_id': template_id, 'from': from_version, 'to': to_version, 'diff': diff})
+
+    @app.route('/templates/<template_id>/rollback', methods=['POST'])
+    def rollback_template_version(template_id):
+        """Restore an earlier version of a template as its newest version"""
+        version = request.json.get('version')
+        if not isinstance(version, int):
+            return jsonify({'error': 'version must be an integer'}), 400
+        result = rollback_template(template_id, version)
+        if result is None:
+            return jsonify({'error': 'Template version not found'}), 404
+        return jsonify(result)
+
     @app.route('/ab-test', methods=['POST'])
     def run_ab_test():
         """Run an A/B test on context strategies"""
         data = request.json
-        result = execute_ab_test(
-            config=data['config'],
-            variant_a=data['variant_a'],
-            variant_b=data['variant_b']
-        )
+        try:
+            result = execute_ab_test(
+                config=data['config'],
+                variant_a=data['variant_a'],
+                variant_b=data['variant_b']
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         return jsonify(result)
 
+    @app.route('/ab-test/<test_id>', methods=['GET'])
+    def get_ab_test_result(test_id):
+        """Get the current results of an A/B test"""
+        result = get_ab_test(test_id)
+        if result:
+            return jsonify(result)
+        return jsonify({'error': 'A/B test not found'}), 404
+
+    @app.route('/ab-test/<test_id>/assign', methods=['GET'])
+    def assign_ab_test(test_id):
+        """Get the variant a user should be served in a running A/B test"""
+        user_id = request.args.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+        assignment = assign_ab_test_variant(test_id, user_id)
+        if assignment:
+            return jsonify(assignment)
+        return jsonify({'error': 'A/B test not found or not running'}), 404
+
+    @app.route('/ab-test/<test_id>/recompute', methods=['POST'])
+    def recompute_ab_test_result(test_id):
+        """Rebuild an A/B test's statistics from the raw logs"""
+        result = ContextEngine().recompute_ab_test(test_id)
+        if result:
+            return jsonify(result)
+        return jsonify({'error': 'A/B test not found'}), 404
+
     @app.route('/optimize', methods=['POST'])
     def optimize_prompt():
         """Optimize a prompt"""
@@ -77,33 +305,170 @@ def create_app():
         )
         return jsonify(result)
 
+    @app.route('/optimize/cache', methods=['GET'])
+    def optimization_cache_stats():
+        """Get hit/miss statistics for memoized optimizations"""
+        return jsonify(get_optimization_cache_stats())
+
     @app.route('/optimize-context', methods=['POST'])
     def optimize_context_processing():
         """Optimize context processing"""
         data = request.json
         template_ids = data.get('template_ids')
         context = data.get('context')
-        result = optimize_templates(template_ids=template_ids, context=context)
+        try:
+            result = optimize_templates(
+                template_ids=template_ids,
+                context=context,
+                max_workers=data.get('max_workers'),
+                timeout=data.get('timeout'),
+                dedupe=data.get('dedupe')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         return jsonify(result)
 
     @app.route('/votes', methods=['POST'])
     def submit_vote():
         """Submit a vote on a prompt"""
         data = request.json
-        result = collect_votes(
-            prompt_id=data['prompt_id'],
-            user_id=data['user_id'],
-            score=data['score'],
-            comment=data.get('comment', '')
-        )
+        try:
+            result = collect_votes(
+                prompt_id=data['prompt_id'],
+                user_id=data['user_id'],
+                score=data['score'],
+                comment=data.get('comment', '')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         return jsonify(result)
 
+    @app.route('/votes/batch', methods=['POST'])
+    def submit_votes_batch():
+        """Submit many votes in one request"""
+        data = request.json
+        idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+        try:
+            result = collect_votes_batch(data['votes'], idempotency_key=idempotency_key)
+        except IdempotencyConflictError as e:
+            return jsonify({'error': str(e)}), 409
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(result)
+
+    @app.route('/prompts/top', methods=['GET'])
+    def get_top_prompts():
+        """List the best-rated prompts from the maintained vote aggregates"""
+        try:
+            result = top_prompts(
+                k=request.args.get('k', type=int),
+                min_votes=request.args.get('min_votes', type=int),
+                by=request.args.get('by', 'bayesian')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(result)
+
+    @app.route('/prompts/<prompt_id>/score', methods=['GET'])
+    def get_prompt_score_data(prompt_id):
+        """Get a prompt's vote aggregates and scores"""
+        result = get_prompt_score(prompt_id)
+        if result is None:
+            return jsonify({'error': 'No votes for this prompt'}), 404
+        return jsonify(result)
+
+    @app.route('/evaluations/batch', methods=['POST'])
+    def submit_evaluations_batch():
+        """Bulk-append evaluation logs"""
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('logs'), list):
+            return jsonify({'error': 'Request body must be a JSON object with a logs list'}), 400
+        try:
+            result = log_evaluations(data['logs'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(result)
+
+    @app.route('/evaluations/metrics', methods=['GET'])
+    def get_evaluation_metrics_data():
+        """Aggregate evaluation metrics by version and metric name"""
+        return jsonify(get_evaluation_metrics(
+            version_id=request.args.get('version_id'),
+            metric=request.args.get('metric')
+        ))
+
+    @app.route('/evaluations', methods=['GET'])
+    def search_evaluations():
+        """Find evaluation logs by metric value"""
+        metric = request.args.get('metric')
+        if not metric:
+            return jsonify({'error': 'metric is required'}), 400
+        return jsonify(query_evaluations(
+            metric,
+            version_id=request.args.get('version_id'),
+            min_value=request.args.get('min', type=float),
+            max_value=request.args.get('max', type=float),
+            limit=min(request.args.get('limit', 100, type=int), 1000)
+        ))
+
+    @app.route('/metrics', methods=['GET'])
+    def get_metrics():
+        """Expose latency histograms, counters and cache hit ratios in Prometheus text format"""
+        if not metrics.enabled():
+            return jsonify({'error': 'Metrics are disabled'}), 404
+        return Response(metrics.REGISTRY.exposition(), mimetype='text/plain; version=0.0.4')
+
+    @app.route('/profiling', methods=['GET'])
+    def get_profiling_settings():
+        """Get the request profiler settings and the newest profile files"""
+        if not get_setting('profiling', 'runtime_api', False):
+            return jsonify({'error': 'The profiling API is disabled'}), 404
+        settings = profiler.settings()
+        settings['recent'] = profiler.recent(request.args.get('limit', 50, type=int))
+        return jsonify(settings)
+
+    @app.route('/profiling', methods=['PUT'])
+    def update_profiling_settings():
+        """Change the profiling sample rate, route filter or mode at runtime"""
+        if not get_setting('profiling', 'runtime_api', False):
+            return jsonify({'error': 'The profiling API is disabled'}), 404
+        data = request.get_json() or {}
+        try:
+            return jsonify(profiler.configure(
+                mode=data.get('mode'),
+                sample_rate=data.get('sample_rate'),
+                routes=data.get('routes')
+            ))
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+
     @app.route('/analytics', methods=['GET'])
     def get_analytics_data():
         """Get optimization analytics and performance metrics"""
         analytics = get_analytics()
         return jsonify(analytics)
 
+    # Bulk transfer routes
+    @app.route('/bulk/<kind>', methods=['GET'])
+    def export_records(kind):
+        """Stream all templates or votes as JSONL; gzip=true compresses the stream"""
+        if kind not in BULK_TRANSFERS:
+            return jsonify({'error': f"Unknown bulk transfer kind: {kind}"}), 404
+        compress = bool(parse_bool(request.args.get('gzip')))
+        chunks = BULK_TRANSFERS[kind][1](compress)
+        return Response(chunks, mimetype='application/gzip' if compress else 'application/x-ndjson')
+
+    @app.route('/bulk/<kind>', methods=['POST'])
+    def import_records(kind):
+        """Import templates or votes from a JSONL request body, gzip-compressed or not"""
+        if kind not in BULK_TRANSFERS:
+            return jsonify({'error': f"Unknown bulk transfer kind: {kind}"}), 404
+        try:
+            result = BULK_TRANSFERS[kind][0](request.stream, request.args.get('batch_size', type=int))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(result)
+
     return app
 
 
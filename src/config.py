@@ -0,0 +1,152 @@
+"""
+Configuration Module
+Loads runtime settings from qoder.config.yaml with environment overrides
+"""
+
+import copy
+import os
+
+import yaml
+
+
+CONFIG_PATH = 'qoder.config.yaml'
+
+DEFAULTS = {
+    'database': {
+        'type': 'sqlite',
+        'path': 'promptops.db',
+        'schema_file': './static/schema.sql'
+    },
+    'templates': {
+        'cache_size': 1024,
+        'cache_ttl': 60.0
+    },
+    'optimizer': {
+        'backend': 'local',
+        'stub_latency': 0.1,
+        'concurrency': 8,
+        'item_timeout': None,
+        'cache_enabled': True,
+        'cache_ttl': 86400,
+        'cache_max_entries': 100000
+    },
+    'ab_testing': {
+        'snapshot_refresh_interval': 1.0
+    },
+    'evaluations': {
+        'batch_size': 10000,
+        'promoted_metrics': ['accuracy', 'latency_ms']
+    },
+    'votes': {
+        'buffered': False,
+        'batch_size': 500,
+        'flush_interval': 0.5
+    },
+    'leaderboard': {
+        'k': 10,
+        'max_k': 100,
+        'min_votes': 1,
+        'prior_mean': 3.0,
+        'prior_weight': 5,
+        'z': 1.96
+    },
+    'server': {
+        'mode': 'asgi',
+        'host': '0.0.0.0',
+        'port': 5000,
+        'workers': 1,
+        'threads': 32
+    },
+    'metrics': {
+        'enabled': True
+    },
+    'profiling': {
+        'sample_rate': 0.0,
+        'routes': None,
+        'mode': 'sample',
+        'interval': 0.005,
+        'header': '',
+        'runtime_api': False,
+        'output_dir': 'profiles',
+        'max_files': 200
+    },
+    'admin': {
+        'host': '0.0.0.0',
+        'port': 5001,
+        'page_size': 50,
+        'count_ttl': 30.0,
+        'count_limit': 10000
+    },
+    'bulk': {
+        'batch_size': 5000
+    },
+    'search': {
+        'limit': 20,
+        'max_limit': 100,
+        'snippet_tokens': 16,
+        'max_candidates': 0
+    },
+    'similarity': {
+        'shingle_size': 3,
+        'bands': 32,
+        'rows': 4,
+        'threshold': 0.8
+    },
+    'writer': {
+        'enabled': False,
+        'address': 'promptops-writer.sock',
+        'authkey': None,
+        'batch_size': 256,
+        'batch_window': 0.0,
+        'timeout': 30.0
+    }
+}
+
+# Environment variables that override individual settings
+ENV_OVERRIDES = {
+    'PROMPTOPS_DB_PATH': ('database', 'path'),
+    'PROMPTOPS_DB_TYPE': ('database', 'type'),
+}
+
+_config = None
+
+
+def _merge(base, override):
+    """Recursively merge override into base"""
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def load_config(path=None):
+    """Load configuration from the YAML file, applying defaults and env overrides"""
+    global _config
+    config = copy.deepcopy(DEFAULTS)
+
+    path = path or os.environ.get('PROMPTOPS_CONFIG', CONFIG_PATH)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            # The libyaml loader, when available, parses several times faster
+            _merge(config, yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader)) or {})
+
+    for env_var, (section, key) in ENV_OVERRIDES.items():
+        if env_var in os.environ:
+            config.setdefault(section, {})[key] = os.environ[env_var]
+
+    _config = config
+    return config
+
+
+def get_config():
+    """Get the loaded configuration, loading it on first use"""
+    if _config is None:
+        return load_config()
+    return _config
+
+
+def get_setting(section, key, default=None):
+    """Get a single setting from a configuration section"""
+    return get_config().get(section, {}).get(key, default)
@@ -0,0 +1,184 @@
+"""
+Database Access Module
+Shared SQLite connection layer used by every skill
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from src import metrics
+from src.config import get_setting
+
+
+# Applied to every new connection
+PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('temp_store', 'MEMORY'),
+    ('cache_size', -65536),      # 64 MiB page cache
+    ('mmap_size', 268435456),    # 256 MiB memory-mapped I/O
+    ('busy_timeout', 5000),
+)
+
+# Prepared statements kept per connection, keyed by SQL text
+STATEMENT_CACHE_SIZE = 512
+
+# SQLite's default limit on bound parameters per statement
+MAX_QUERY_PARAMS = 999
+
+_local = threading.local()
+_lock = threading.Lock()
+_db_path = None
+_generation = 0
+_connections = weakref.WeakSet()
+# Connections a forked child inherited; kept open because closing one
+# whose SQLite mutex another parent thread held at fork time would hang
+_inherited = []
+
+
+class Connection(sqlite3.Connection):
+    """SQLite connection managed by the shared connection layer"""
+
+
+class InstrumentedConnection(Connection):
+    """Connection that records latency, rows written and errors per statement"""
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            cursor = super().execute(sql, parameters)
+        except Exception:
+            metrics.observe_sql(sql, started, failed=True)
+            raise
+        metrics.observe_sql(sql, started, cursor)
+        return cursor
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            cursor = super().executemany(sql, seq_of_parameters)
+        except Exception:
+            metrics.observe_sql(sql, started, failed=True)
+            raise
+        metrics.observe_sql(sql, started, cursor)
+        return cursor
+
+    def commit(self):
+        started = time.perf_counter()
+        super().commit()
+        metrics.observe_sql('COMMIT', started)
+
+
+def get_db_path():
+    """Get the configured database path"""
+    if _db_path is None:
+        return get_setting('database', 'path', 'promptops.db')
+    return _db_path
+
+
+def configure(db_path=None):
+    """Point the connection layer at a different database file
+
+    Open connections are closed; each thread reconnects on next use.
+    Passing None restores the path from configuration.
+    """
+    global _db_path
+    close_all()
+    _db_path = db_path
+
+
+def connect(db_path=None):
+    """Open a new tuned connection outside of the thread-local pool"""
+    conn = sqlite3.connect(
+        db_path or get_db_path(),
+        # The no-op metrics mode keeps the plain connection and its C-level methods
+        factory=InstrumentedConnection if metrics.enabled() else Connection,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE
+    )
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+def get_connection():
+    """Get the connection owned by the current thread"""
+    conn = getattr(_local, 'conn', None)
+    db_path = get_db_path()
+    if conn is not None and _local.db_path == db_path and _local.generation == _generation:
+        return conn
+
+    if conn is not None:
+        conn.close()
+    conn = connect(db_path)
+    _local.conn = conn
+    _local.db_path = db_path
+    _local.generation = _generation
+    with _lock:
+        _connections.add(conn)
+    return conn
+
+
+def in_transaction():
+    """Whether the current thread's connection has a transaction open"""
+    conn = getattr(_local, 'conn', None)
+    return conn is not None and conn.in_transaction
+
+
+@contextmanager
+def transaction():
+    """Run a block of writes in a single transaction on this thread's connection
+
+    Nested calls join the outermost transaction. BEGIN IMMEDIATE takes the
+    write lock up front so busy_timeout applies instead of failing on upgrade.
+    """
+    conn = get_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def close_connection():
+    """Close the current thread's connection"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+def close_all():
+    """Close every connection opened by the pool"""
+    global _generation
+    with _lock:
+        _generation += 1
+        connections = list(_connections)
+        _connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.ProgrammingError:
+            pass
+
+
+def _after_fork_in_child():
+    global _lock, _generation
+    _lock = threading.Lock()
+    _inherited.extend(_connections)
+    _connections.clear()
+    _generation += 1
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
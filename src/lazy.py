@@ -0,0 +1,26 @@
+"""
+Lazy Import Module
+Defers importing subsystems until they are first used
+"""
+
+import importlib
+
+
+def lazy_function(module, name):
+    """Stand-in for `from module import name` that imports module on the first call
+
+    Keeps modules (and their dependencies) that a caller may never touch
+    out of import time. After the first call the only cost is one extra
+    function call.
+    """
+    target = None
+
+    def call(*args, **kwargs):
+        nonlocal target
+        if target is None:
+            target = getattr(importlib.import_module(module), name)
+        return target(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    call.__module__ = module
+    return call
@@ -3,38 +3,78 @@ Main Application Entry Point
 Initializes the PromptOps platform with all modules
 """
 
+import argparse
+import contextlib
 import os
-import sqlite3
-from src.sdk.context_engine import ContextEngine
-from src.sdk.smart_rewriter import SmartRewriter
-from src.api.routes import create_app as create_api_app
-from src.admin.views import run_admin_server
+import sys
+from src.config import get_setting
+from src.migrations import current_version, migrate
+from src.repositories import get_repository
+from src.skills.analytics_summary import ensure_summary
+from src.skills.prompt_scores import ensure_prompt_scores
+
+# The SDK, API and admin modules are imported by the commands that use them,
+# so short-lived commands don't pay for Flask, SQLAlchemy and Flask-Admin
 
 def initialize_database():
-    """Initialize the database with required tables"""
-    db_path = 'promptops.db'
-    
-    # Connect to database
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Read schema from SQL file
-    schema_file = 'static/schema.sql'
-    if os.path.exists(schema_file):
-        with open(schema_file, 'r') as f:
-            schema_sql = f.read()
-        
-        # Execute schema
-        cursor.executescript(schema_sql)
+    """Initialize the database by applying any pending schema migrations"""
+    # The SQLite schema only matters when the repository stores data there
+    if get_repository().persistent:
+        schema_file = get_setting('database', 'schema_file', 'static/schema.sql')
+        if not os.path.exists(schema_file):
+            print(f"Schema file {schema_file} not found")
+            return
+
+        applied = migrate()
+        for version, name in applied:
+            print(f"Applied migration {version:04d}_{name}")
         print("Database schema applied successfully")
+    ensure_summary()
+    ensure_prompt_scores()
+
+def run_migrations():
+    """Apply pending migrations and report the schema version"""
+    initialize_database()
+    if get_repository().persistent:
+        print(f"Schema version: {current_version()}")
     else:
-        print(f"Schema file {schema_file} not found")
-    
-    conn.commit()
-    conn.close()
+        print("The in-memory database has no schema migrations")
 
-def main():
-    """Main entry point for the application"""
+def rebuild_analytics():
+    """Recompute the analytics summary from scratch"""
+    from src.sdk.smart_rewriter import SmartRewriter
+    initialize_database()
+    analytics = SmartRewriter().rebuild_analytics()
+    print("Analytics summary rebuilt")
+    print(f"- Optimizations: {analytics['optimization_metrics']['total_optimizations']}")
+    print(f"- Votes: {analytics['vote_metrics']['total_votes']}")
+    print(f"- Prompts: {analytics['prompt_metrics']['total_prompts']}")
+
+def rebuild_scores():
+    """Recompute the per-prompt vote leaderboard from the stored votes"""
+    from src.sdk.smart_rewriter import SmartRewriter
+    initialize_database()
+    count = SmartRewriter().rebuild_prompt_scores()
+    print(f"Prompt scores rebuilt for {count} prompts")
+
+def rebuild_search():
+    """Re-index every template for full-text search"""
+    from src.sdk.context_engine import ContextEngine
+    initialize_database()
+    ContextEngine().rebuild_search_index()
+    print("Template search index rebuilt")
+
+def rebuild_similarity():
+    """Recompute the MinHash signatures used to find near-duplicate templates"""
+    from src.sdk.context_engine import ContextEngine
+    initialize_database()
+    count = ContextEngine().rebuild_similarity_index()
+    print(f"Similarity index rebuilt for {count} templates")
+
+def start():
+    """Initialize the platform and show the available functionality"""
+    from src.sdk.context_engine import ContextEngine
+    from src.sdk.smart_rewriter import SmartRewriter
     print("Initializing PromptOps Platform...")
     
     # Initialize database
@@ -52,8 +92,135 @@ def main():
     print("\nPromptOps Platform ready!")
     print("- Context Engine: Template management and A/B testing")
     print("- Smart Rewriter: Prompt optimization and feedback collection")
-    print("- API Server: Available at http://localhost:5000")
-    print("- Admin Interface: Available at http://localhost:5001")
+    print("- API Server: Run 'python -m src.main serve' (http://localhost:5000)")
+    print("- Admin Interface: Run 'python -m src.main admin' (http://localhost:5001/admin)")
+
+def admin():
+    """Initialize the database and run the admin interface"""
+    from src.admin.views import run_admin_server
+    initialize_database()
+    run_admin_server()
+
+def writer():
+    """Initialize the database and run the single-writer service for API workers"""
+    from src.writer import create_service
+    try:
+        service = create_service()
+    except ValueError as e:
+        sys.exit(f"Writer not started: {e}")
+    initialize_database()
+    service.start()
+    print(f"Writer service listening on {service.address}")
+    service.serve_forever()
+
+def import_data(kind, path, batch_size=None):
+    """Bulk-import templates or votes from a JSONL file (gzip detected automatically, - for stdin)"""
+    from src.skills.bulk_transfer import import_jsonl
+    initialize_database()
+
+    def progress(stats):
+        print(f"\rImported {stats['imported']} {kind}, skipped {stats['skipped']} ({stats['batches']} batches)",
+              end='', file=sys.stderr, flush=True)
+
+    stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+    try:
+        stats = import_jsonl(kind, stream, batch_size, progress)
+    except ValueError as e:
+        sys.exit(f"\nImport stopped: {e}")
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+    print(file=sys.stderr)
+    print(f"Read {stats['read']} {kind}: {stats['imported']} imported, {stats['skipped']} already present")
+
+def export_data(kind, path, compress=None):
+    """Stream all templates or votes to a JSONL file (gzip for .gz paths, - for stdout)"""
+    from src.skills.bulk_transfer import export_jsonl
+    # Keep stdout for the data when exporting to it
+    with contextlib.redirect_stdout(sys.stderr):
+        initialize_database()
+    if compress is None:
+        compress = path.endswith('.gz')
+    stream = sys.stdout.buffer if path == '-' else open(path, 'wb')
+    try:
+        for chunk in export_jsonl(kind, compress):
+            stream.write(chunk)
+    finally:
+        if stream is sys.stdout.buffer:
+            stream.flush()
+        else:
+            stream.close()
+
+def serve(mode=None, host=None, port=None, workers=None):
+    """Initialize the database and run the API server in the configured mode"""
+    initialize_database()
+    mode = mode or get_setting('server', 'mode', 'asgi')
+    host = host or get_setting('server', 'host', '0.0.0.0')
+    port = port or get_setting('server', 'port', 5000)
+    workers = workers or get_setting('server', 'workers', 1)
+
+    if mode == 'flask':
+        # Each process handles one request at a time
+        from src.api.routes import create_app as create_api_app
+        print(f"Serving Flask API on http://{host}:{port} with {workers} process(es)")
+        create_api_app().run(host=host, port=port, threaded=False, processes=workers)
+        return
+
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("ASGI mode needs the uvicorn and starlette packages from requirements.txt; install them or use --mode flask")
+    print(f"Serving ASGI API on http://{host}:{port} with {workers} worker(s)")
+    uvicorn.run('src.api.asgi:create_asgi_app', factory=True, host=host, port=port,
+                workers=workers, log_level='warning')
+
+COMMANDS = {
+    'start': start,
+    'migrate': run_migrations,
+    'rebuild-analytics': rebuild_analytics,
+    'rebuild-scores': rebuild_scores,
+    'rebuild-search': rebuild_search,
+    'rebuild-similarity': rebuild_similarity,
+    'admin': admin,
+    'writer': writer,
+}
+
+def main(argv=None):
+    """Main entry point for the application"""
+    parser = argparse.ArgumentParser(prog='python -m src.main', description='PromptOps platform')
+    parser.set_defaults(command='start')
+    commands = parser.add_subparsers(title='commands')
+    for name, func in COMMANDS.items():
+        commands.add_parser(name, help=func.__doc__).set_defaults(command=name)
+
+    serve_parser = commands.add_parser('serve', help=serve.__doc__)
+    serve_parser.set_defaults(command='serve')
+    serve_parser.add_argument('--mode', choices=['asgi', 'flask'])
+    serve_parser.add_argument('--host')
+    serve_parser.add_argument('--port', type=int)
+    serve_parser.add_argument('--workers', type=int)
+
+    import_parser = commands.add_parser('import', help=import_data.__doc__)
+    import_parser.set_defaults(command='import')
+    import_parser.add_argument('kind', choices=['templates', 'votes'])
+    import_parser.add_argument('path')
+    import_parser.add_argument('--batch-size', type=int)
+
+    export_parser = commands.add_parser('export', help=export_data.__doc__)
+    export_parser.set_defaults(command='export')
+    export_parser.add_argument('kind', choices=['templates', 'votes'])
+    export_parser.add_argument('path')
+    export_parser.add_argument('--gzip', action='store_true', default=None, help='compress even without a .gz suffix')
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        serve(args.mode, args.host, args.port, args.workers)
+    elif args.command == 'import':
+        import_data(args.kind, args.path, args.batch_size)
+    elif args.command == 'export':
+        export_data(args.kind, args.path, args.gzip)
+    else:
+        COMMANDS[args.command]()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
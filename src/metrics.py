@@ -0,0 +1,254 @@
+"""
+Metrics Module
+Latency histograms, counters and cache gauges exported in Prometheus text format
+"""
+
+import bisect
+import functools
+import re
+import threading
+import time
+
+from src.config import get_setting
+
+
+# Latency bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Distinct SQL texts whose labels are remembered before falling back to parsing each time
+STATEMENT_LABEL_CACHE_SIZE = 4096
+
+_STATEMENT_KEYWORD = re.compile(
+    r'\b(SELECT|INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER|BEGIN|COMMIT|ROLLBACK|PRAGMA)\b', re.IGNORECASE)
+_STATEMENT_TABLE = re.compile(
+    r'\b(?:FROM|INTO|TABLE|INDEX|TRIGGER)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?([\w.]+)', re.IGNORECASE)
+_UPDATE_TABLE = re.compile(r'\bUPDATE\s+(?:OR\s+\w+\s+)?([\w.]+)', re.IGNORECASE)
+
+
+def enabled():
+    """Whether instrumentation is active; when off, nothing is wrapped at all"""
+    return bool(get_setting('metrics', 'enabled', True))
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in sorted(items):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Histogram:
+    """Bucketed observations per label set, plus their sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), then sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *label_values):
+        series = self._series.get(label_values)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(label_values, list(series)) for label_values, series in self._series.items()]
+        for label_values, series in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), series):
+                cumulative += bucket_count
+                yield (f"{self.name}_bucket{_format_labels(self.labels, label_values, ('le', _format_value(bound)))}"
+                       f" {cumulative}")
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(series[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)} {cumulative}"
+
+
+class CallbackGauge:
+    """Values read at scrape time from a callback returning {label_values: value}"""
+
+    def __init__(self, name, help, labels, callback, kind='gauge'):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.callback, self.kind = callback, kind
+
+    def samples(self):
+        for label_values, value in sorted(self.callback().items()):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help, labels=()):
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def callback(self, name, help, labels, callback, kind='gauge'):
+        """Register (or replace) a metric whose values are computed at scrape time"""
+        with self._lock:
+            self._metrics[name] = CallbackGauge(name, help, labels, callback, kind)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def exposition(self):
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# Cache name -> stats() callable, exported by register_cache
+_caches = {}
+
+_statement_labels = {}
+
+SKILL_LATENCY = REGISTRY.histogram(
+    'promptops_skill_duration_seconds', 'Skill call latency', ('skill',))
+SKILL_ERRORS = REGISTRY.counter(
+    'promptops_skill_errors_total', 'Skill calls that raised', ('skill', 'error'))
+SQL_LATENCY = REGISTRY.histogram(
+    'promptops_sql_duration_seconds', 'SQL statement execution latency', ('statement',))
+SQL_ROWS = REGISTRY.counter(
+    'promptops_sql_rows_written_total', 'Rows changed by write statements', ('statement',))
+SQL_ERRORS = REGISTRY.counter(
+    'promptops_sql_errors_total', 'SQL statements that raised', ('statement',))
+HTTP_LATENCY = REGISTRY.histogram(
+    'promptops_http_request_duration_seconds', 'API request latency', ('method', 'route', 'status'))
+
+
+def statement_label(sql):
+    """Low-cardinality label for a SQL text, e.g. 'SELECT templates'"""
+    label = _statement_labels.get(sql)
+    if label is None:
+        # The first statement keyword outside a leading WITH clause names the operation
+        keyword = _STATEMENT_KEYWORD.search(sql)
+        if keyword is None:
+            label = 'OTHER'
+        else:
+            operation = keyword.group(1).upper()
+            table = (_UPDATE_TABLE if operation == 'UPDATE' else _STATEMENT_TABLE).search(sql, keyword.start())
+            label = f"{operation} {table.group(1)}" if table else operation
+        if len(_statement_labels) < STATEMENT_LABEL_CACHE_SIZE:
+            _statement_labels[sql] = label
+    return label
+
+
+def timed_skill(name, key=None):
+    """Decorator recording a skill's latency and errors
+
+    key, if given, maps the call's arguments to a more specific label
+    (e.g. the action of manage_templates). With metrics disabled the
+    function is returned unwrapped, so the no-op mode costs nothing.
+    """
+    def decorate(func):
+        if not enabled():
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            label = key(*args, **kwargs) if key else name
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                SKILL_ERRORS.inc(label, type(e).__name__)
+                raise
+            finally:
+                SKILL_LATENCY.observe(time.perf_counter() - start, label)
+        return wrapper
+    return decorate
+
+
+def observe_sql(sql, started, cursor=None, failed=False):
+    label = statement_label(sql)
+    SQL_LATENCY.observe(time.perf_counter() - started, label)
+    if failed:
+        SQL_ERRORS.inc(label)
+    elif cursor is not None and cursor.rowcount > 0:
+        SQL_ROWS.inc(label, amount=cursor.rowcount)
+
+
+def register_cache(name, stats):
+    """Export a cache's hit/miss counters and hit ratio, read from stats() at scrape time"""
+    _caches[name] = stats
+
+    def counts(field):
+        return lambda: {(cache,): read().get(field, 0) for cache, read in _caches.items()}
+
+    def ratios():
+        values = {}
+        for cache, read in _caches.items():
+            current = read()
+            lookups = current.get('hits', 0) + current.get('misses', 0)
+            ratio = current.get('hit_ratio', current.get('hits', 0) / lookups if lookups else 0.0)
+            values[(cache,)] = round(ratio, 4)
+        return values
+
+    REGISTRY.callback('promptops_cache_hits_total', 'Cache hits', ('cache',), counts('hits'), 'counter')
+    REGISTRY.callback('promptops_cache_misses_total', 'Cache misses', ('cache',), counts('misses'), 'counter')
+    REGISTRY.callback('promptops_cache_hit_ratio', 'Cache hits over lookups', ('cache',), ratios)
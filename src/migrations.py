@@ -0,0 +1,106 @@
+"""
+Schema Migrations Module
+Applies versioned SQL migrations and records which ones have run
+"""
+
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+from src.config import get_setting
+from src.db import get_connection
+
+# Migration files are named NNNN_description.sql
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+
+def migrations_dir():
+    """Directory holding the numbered migrations: migrations/ next to the schema file"""
+    schema_file = get_setting('database', 'schema_file', 'static/schema.sql')
+    return os.path.join(os.path.dirname(os.path.abspath(schema_file)), 'migrations')
+
+
+def discover_migrations():
+    """List (version, name, path) for every migration, in order
+
+    Version 1 is the baseline schema file; later versions live in the
+    migrations directory beside it. The baseline must not change once released.
+    """
+    migrations = [(1, 'baseline', get_setting('database', 'schema_file', 'static/schema.sql'))]
+    directory = migrations_dir()
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"Migrations directory {directory} not found")
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    return migrations
+
+
+def split_statements(sql):
+    """Split a SQL script into complete statements, keeping trigger bodies intact"""
+    statements, buffer = [], ''
+    for line in sql.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ''
+    if buffer.strip() and not all(
+        line.strip().startswith('--') or not line.strip() for line in buffer.splitlines()
+    ):
+        raise ValueError(f"Incomplete SQL statement: {buffer.strip()[:80]}")
+    return statements
+
+
+def _ensure_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def current_version(conn=None):
+    """Get the highest applied migration version, or 0 for an empty database"""
+    conn = conn or get_connection()
+    _ensure_table(conn)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations").fetchone()[0]
+
+
+def migrate(target=None):
+    """Apply pending migrations up to target (default: latest), returning those applied"""
+    conn = get_connection()
+    _ensure_table(conn)
+    done = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+    applied = []
+    for version, name, path in discover_migrations():
+        if target is not None and version > target:
+            break
+        if version in done:
+            continue
+        with open(path, 'r') as f:
+            statements = split_statements(f.read())
+
+        # Each migration runs in its own transaction; the version check happens
+        # under the write lock so concurrent starters apply it only once
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,)).fetchone():
+                conn.rollback()
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+                (version, name, datetime.now())
+            )
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        applied.append((version, name))
+    return applied
@@ -0,0 +1,261 @@
+"""
+Profiling Module
+On-demand request profiling with stack sampling or cProfile, written to local files
+(hooked into the Flask API only)
+"""
+
+import collections
+import functools
+import io
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from src.config import get_setting
+
+
+MODES = ('sample', 'cprofile')
+
+_local = threading.local()
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def current_session():
+    """Get the profile session active on this thread, if any"""
+    return getattr(_local, 'session', None)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame):
+    """Render a frame's stack root-first in collapsed (folded) format"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class ProfileSession:
+    """Profiles one request on its own thread and on worker threads it hands work to
+
+    In sample mode a background thread records the stacks of every
+    attached thread each interval; in cprofile mode each attached thread
+    runs its own deterministic profiler and the results are merged.
+    """
+
+    def __init__(self, label, mode='sample', interval=0.005):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.label = label
+        self.mode = mode
+        self.interval = interval
+        self.samples = collections.Counter()
+        self.profiles = []
+        self.started_at = None
+        self.duration = None
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        if self.mode == 'sample':
+            self._sampler = threading.Thread(target=self._sample_loop, name='profile-sampler', daemon=True)
+            self._sampler.start()
+        self.attach()
+
+    def attach(self):
+        """Include the calling thread until detach()"""
+        _local.session = self
+        ident = threading.get_ident()
+        profile = None
+        if self.mode == 'cprofile':
+            import cProfile  # only needed once a cprofile session runs
+            profile = cProfile.Profile()
+            profile.enable()
+        with self._lock:
+            self._threads[ident] = profile
+
+    def detach(self):
+        _local.session = None
+        with self._lock:
+            profile = self._threads.pop(threading.get_ident(), None)
+            if profile is not None:
+                profile.disable()
+                if not self._stopped.is_set():
+                    self.profiles.append(profile)
+
+    def stop(self):
+        self.detach()
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _sample_loop(self):
+        sampler = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                idents = [ident for ident in self._threads if ident != sampler]
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.samples[_collapse(frame)] += 1
+
+    def write(self, directory):
+        """Write the captured profile and return the paths written"""
+        os.makedirs(directory, exist_ok=True)
+        stem = f"{datetime.now():%Y%m%d-%H%M%S}-{re.sub(r'[^A-Za-z0-9]+', '_', self.label).strip('_')}-{uuid.uuid4().hex[:8]}"
+        paths = []
+        if self.mode == 'sample':
+            path = os.path.join(directory, f"{stem}.folded")
+            with open(path, 'w') as f:
+                for stack, count in self.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+            paths.append(path)
+        elif self.profiles:
+            import pstats
+            stats = pstats.Stats(self.profiles[0])
+            for profile in self.profiles[1:]:
+                stats.add(profile)
+            path = os.path.join(directory, f"{stem}.prof")
+            stats.dump_stats(path)
+            paths.append(path)
+
+            summary = io.StringIO()
+            pstats.Stats(path, stream=summary).sort_stats('cumulative').print_stats(40)
+            path = os.path.join(directory, f"{stem}.txt")
+            with open(path, 'w') as f:
+                f.write(f"{self.label} took {self.duration * 1000:.1f} ms\n")
+                f.write(summary.getvalue())
+            paths.append(path)
+        return paths
+
+
+def propagate(func):
+    """Wrap func so a worker thread running it joins the caller's profile session
+
+    Returns func itself when nothing is being profiled.
+    """
+    session = current_session()
+    if session is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if current_session() is session:
+            return func(*args, **kwargs)
+        session.attach()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            session.detach()
+    return wrapper
+
+
+class Profiler:
+    """Decides which requests to profile and keeps the output directory bounded
+
+    A request is profiled when it carries the trigger header (whose value
+    may name the mode), or when it is drawn at sample_rate and matches the
+    route filter. Both can be changed at runtime through configure().
+    """
+
+    def __init__(self, output_dir='profiles', mode='sample', sample_rate=0.0, routes=None,
+                 header='', interval=0.005, max_files=200):
+        self.output_dir = output_dir
+        self.header = header
+        self.interval = interval
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self.configure(mode=mode, sample_rate=sample_rate, routes=routes or [])
+
+    def configure(self, mode=None, sample_rate=None, routes=None):
+        """Change the sampling mode, rate and route filter at runtime"""
+        with self._lock:
+            if mode is not None:
+                if mode not in MODES:
+                    raise ValueError(f"Unknown profiling mode: {mode}")
+                self.mode = mode
+            if sample_rate is not None:
+                if not 0.0 <= float(sample_rate) <= 1.0:
+                    raise ValueError("sample_rate must be between 0 and 1")
+                self.sample_rate = float(sample_rate)
+            if routes is not None:
+                self.routes = frozenset(routes)
+        return self.settings()
+
+    def settings(self):
+        return {
+            'mode': self.mode,
+            'sample_rate': self.sample_rate,
+            'routes': sorted(self.routes),
+            'header': self.header,
+            'output_dir': self.output_dir
+        }
+
+    def select(self, headers, route):
+        """Return the mode to profile this request with, or None"""
+        requested = headers.get(self.header) if self.header else None
+        if requested:
+            return requested if requested in MODES else self.mode
+        if self.sample_rate and (not self.routes or route in self.routes) and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+    def start(self, label, mode):
+        session = ProfileSession(label, mode, self.interval)
+        session.start()
+        return session
+
+    def finish(self, session):
+        """Stop a session, write its files and prune the oldest beyond max_files"""
+        session.stop()
+        paths = session.write(self.output_dir)
+        self._prune()
+        return paths
+
+    def recent(self, limit=50):
+        """List the newest profile files"""
+        if not os.path.isdir(self.output_dir):
+            return []
+        names = sorted(os.listdir(self.output_dir), reverse=True)
+        return names[:limit]
+
+    def _prune(self):
+        names = sorted(os.listdir(self.output_dir))
+        for name in names[:max(0, len(names) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.output_dir, name))
+            except OSError:
+                pass
+
+
+def get_profiler():
+    """Get the process-wide request profiler"""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = Profiler(
+                    output_dir=get_setting('profiling', 'output_dir', 'profiles'),
+                    mode=get_setting('profiling', 'mode', 'sample'),
+                    sample_rate=get_setting('profiling', 'sample_rate', 0.0),
+                    routes=get_setting('profiling', 'routes') or [],
+                    header=get_setting('profiling', 'header', ''),
+                    interval=get_setting('profiling', 'interval', 0.005),
+                    max_files=get_setting('profiling', 'max_files', 200)
+                )
+    return _profiler
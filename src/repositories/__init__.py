@@ -0,0 +1,266 @@
+"""
+Repositories Module
+Storage interface behind the template, vote, optimization, A/B test and analytics skills
+"""
+
+import importlib
+import threading
+
+from src.config import get_setting
+
+# database.type -> repository class
+BACKENDS = {
+    'sqlite': 'src.repositories.sqlite.SQLiteRepository',
+    'memory': 'src.repositories.memory.MemoryRepository',
+}
+
+# Columns of a vote row as built by collect_votes._vote_row
+VOTE_FIELDS = ('id', 'prompt_id', 'user_id', 'score', 'comment', 'timestamp')
+
+# Public template fields, in the order rows are returned
+TEMPLATE_FIELDS = ('id', 'name', 'description', 'content', 'created_at', 'updated_at', 'is_active')
+
+# Wrapped around matched terms in search snippets
+SNIPPET_MARKS = ('<mark>', '</mark>')
+
+# bm25 weights of the name, description and content columns when ranking search results
+SEARCH_WEIGHTS = (10.0, 4.0, 1.0)
+
+# Columns of an evaluation log row as built by log_evaluations (the id is assigned on insert)
+EVALUATION_FIELDS = ('version_id', 'response', 'metrics_json', 'human_score', 'timestamp')
+
+# Columns of a prompt leaderboard row, and the scores top_prompts can rank by
+PROMPT_SCORE_FIELDS = ('prompt_id', 'votes', 'total', 'total_squares', 'bayesian_score', 'wilson_score')
+PROMPT_RANKINGS = ('bayesian', 'wilson')
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def new_items(items, known_ids, key):
+    """Items whose key(item) is not in known_ids, keeping only the first of ids repeated within items"""
+    seen, new = set(), []
+    for item in items:
+        item_id = key(item)
+        if item_id not in known_ids and item_id not in seen:
+            seen.add(item_id)
+            new.append(item)
+    return new
+
+
+class Repository:
+    """Storage operations the skills are written against
+
+    Templates are dicts keyed by TEMPLATE_FIELDS and votes are tuples in
+    VOTE_FIELDS order. An A/B test is the dict returned by load_ab_test:
+    status, sample_size, metric, config, p_value, winner and, per arm,
+    variant_id with its running n/mean/m2 moments. Writes made inside
+    transaction() are committed together; every write method also joins
+    an enclosing transaction.
+
+    The analytics summary ({metric: (count, total, min, max)}) is kept up
+    to date by add_votes and add_optimization, and add_votes also folds
+    each vote into its prompt's leaderboard row (PROMPT_SCORE_FIELDS). Template writes also keep
+    the search index and the MinHash signatures (template_similarity) in
+    step with the content.
+    """
+
+    # Whether data outlives the process; the optimization memo is only kept when it does
+    persistent = True
+
+    def transaction(self):
+        """Context manager grouping writes into one atomic unit"""
+        raise NotImplementedError
+
+    # Templates
+
+    def create_template(self, name, description, content):
+        """Store a new active template with its first version and return its id"""
+        raise NotImplementedError
+
+    def get_template(self, template_id):
+        raise NotImplementedError
+
+    def update_template(self, template_id, name=None, description=None, content=None, is_active=None):
+        """Change the given fields, versioning content changes; False if the template is missing"""
+        raise NotImplementedError
+
+    def delete_template(self, template_id):
+        """Remove a template and its version history"""
+        raise NotImplementedError
+
+    def select_templates(self, fields, is_active=None, after=None, limit=None):
+        """Iterate templates ordered by id, projected to fields, with id greater than after"""
+        raise NotImplementedError
+
+    def add_templates(self, templates):
+        """Store complete template dicts (TEMPLATE_FIELDS) as version 1, skipping ids already stored
+
+        An id repeated within templates is stored once, from its first
+        occurrence. Returns the templates stored.
+        """
+        raise NotImplementedError
+
+    def get_templates(self, template_ids, fields):
+        """Fetch templates by id as {id: template}, skipping unknown ids"""
+        raise NotImplementedError
+
+    def list_versions(self, template_id):
+        """Version metadata (version, content_hash, encoding, size, created_at), oldest first"""
+        raise NotImplementedError
+
+    def get_version(self, template_id, version):
+        """Content of one version, or None if it does not exist"""
+        raise NotImplementedError
+
+    def latest_version(self, template_id):
+        raise NotImplementedError
+
+    def search_templates(self, match, limit, offset=0, snippet_tokens=16, max_candidates=None):
+        """Best matches first for an FTS5 MATCH expression
+
+        Returns a page of dicts of id, name, description, snippet (the best
+        matching fragment with matches wrapped in SNIPPET_MARKS) and score,
+        where higher scores rank first, and whether the ranking was
+        truncated: with max_candidates only that many matches, the oldest,
+        are ranked.
+        """
+        raise NotImplementedError
+
+    def rebuild_search_index(self):
+        """Re-index every template for search"""
+        raise NotImplementedError
+
+    def get_signatures(self, template_ids):
+        """Stored MinHash signatures as {id: bytes}, skipping templates without one"""
+        raise NotImplementedError
+
+    def bucket_members(self, buckets):
+        """{bucket: set of template ids} for the given LSH bucket keys, skipping empty buckets"""
+        raise NotImplementedError
+
+    def rebuild_similarity_index(self):
+        """Recompute every template's signature and buckets; returns how many were indexed"""
+        raise NotImplementedError
+
+    # Votes and optimizations
+
+    def add_votes(self, rows, deduplicate=False):
+        """Store vote rows and return the ones stored
+
+        With deduplicate, rows whose id is already stored or appeared
+        earlier in rows are skipped.
+        """
+        raise NotImplementedError
+
+    def select_votes(self, after=None, limit=None):
+        """Iterate vote rows ordered by id, with id greater than after"""
+        raise NotImplementedError
+
+    def claim_idempotency_key(self, key, fingerprint):
+        """Store fingerprint under key unless the key is already used; returns the fingerprint stored for it"""
+        raise NotImplementedError
+
+    def add_optimization(self, optimization_id, optimized_content, improvement_score):
+        raise NotImplementedError
+
+    def top_prompts(self, k, min_votes, by):
+        """The k leaderboard rows with at least min_votes votes, best by the PROMPT_RANKINGS score first"""
+        raise NotImplementedError
+
+    def get_prompt_score(self, prompt_id):
+        """A prompt's leaderboard row, or None if it has no votes"""
+        raise NotImplementedError
+
+    def rebuild_prompt_scores(self):
+        """Recompute the leaderboard from the stored votes; returns how many prompts it holds"""
+        raise NotImplementedError
+
+    def prompt_scores_missing(self):
+        """Whether votes are stored but the leaderboard is empty, as in databases from before it existed"""
+        raise NotImplementedError
+
+    # Evaluations
+
+    def add_evaluations(self, rows, promoted):
+        """Store evaluation log rows (EVALUATION_FIELDS order) under consecutive new ids, returning the first
+
+        promoted holds each row's (name, value) metrics, which are indexed
+        and folded into the per-version rollups.
+        """
+        raise NotImplementedError
+
+    def evaluation_rollups(self, version_id=None, metric=None):
+        """(version_id, name, count, total, min, max) per promoted metric, with '' for logs without a version"""
+        raise NotImplementedError
+
+    def query_evaluations(self, metric, version_id=None, min_value=None, max_value=None, limit=100):
+        """(log_id, version_id, value) for logs by a promoted metric's value range, highest value first"""
+        raise NotImplementedError
+
+    # A/B tests
+
+    def create_ab_test(self, test_id, config, metric, variant_ids):
+        """Store a running test with empty accumulators for both arms"""
+        raise NotImplementedError
+
+    def load_ab_test(self, test_id):
+        raise NotImplementedError
+
+    def save_ab_test(self, test_id, test):
+        """Write back a loaded test's status, p_value and winner (arms change through update_arm)"""
+        raise NotImplementedError
+
+    def running_arms(self, metric, variant_ids):
+        """(test_id, arm, variant_id, n, mean, m2) for running tests on these variants"""
+        raise NotImplementedError
+
+    def update_arm(self, test_id, arm, n, mean, m2):
+        raise NotImplementedError
+
+    def running_ab_tests(self):
+        """(test_id, variant_a_id, variant_b_id, config) for every running test"""
+        raise NotImplementedError
+
+    def observation_chunks(self, metric, variant_ids, chunk_size):
+        """Iterate the raw (variant_id, value) observations for a metric in lists of chunk_size"""
+        raise NotImplementedError
+
+    # Analytics
+
+    def read_summary(self):
+        raise NotImplementedError
+
+    def rebuild_summary(self):
+        """Recompute the analytics summary from the stored rows"""
+        raise NotImplementedError
+
+    def summary_missing(self):
+        """Whether some SUMMARY_SOURCES row is absent, as in databases from before the summary existed"""
+        raise NotImplementedError
+
+
+def create_repository(backend=None):
+    """Build the repository for a database.type"""
+    backend = backend or get_setting('database', 'type', 'sqlite')
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown database type: {backend}")
+    module, _, name = BACKENDS[backend].rpartition('.')
+    return getattr(importlib.import_module(module), name)()
+
+
+def get_repository():
+    """Get the process-wide repository selected by database.type"""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = create_repository()
+    return _repository
+
+
+def configure(repository=None):
+    """Use a specific repository in this process; None goes back to the configured one"""
+    global _repository
+    with _repository_lock:
+        _repository = repository
@@ -0,0 +1,572 @@
+"""
+Memory Repository Module
+Process-local repository on indexed dicts of compact records, for tests, benchmarks and edge deployments
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime
+import hashlib
+import itertools
+import sqlite3
+import threading
+import uuid
+
+from src.repositories import PROMPT_RANKINGS, PROMPT_SCORE_FIELDS, SEARCH_WEIGHTS, SNIPPET_MARKS, TEMPLATE_FIELDS, Repository, new_items
+from src.skills import prompt_scores, template_similarity
+from src.skills.analytics_summary import SUMMARY_SOURCES
+
+ARMS = ('variant_a', 'variant_b')
+
+# Votes added one id at a time to the sorted index up to this batch size, merged above it
+VOTE_INSORT_LIMIT = 16
+
+# Votes copied out under the lock per page of select_votes
+VOTE_PAGE_SIZE = 500
+
+# Same tokenizer as the templates_fts migration, holding its own copy of the text
+SEARCH_TABLE = """
+    CREATE VIRTUAL TABLE templates_fts USING fts5(
+        name, description, template_content,
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+"""
+
+
+class TemplateRecord:
+    __slots__ = ('id', 'name', 'description', 'content', 'created_at', 'updated_at', 'is_active', 'versions',
+                 'search_rowid', 'signature', 'buckets')
+
+    def __init__(self, id, name, description, content, created_at):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.content = content
+        self.created_at = created_at
+        self.updated_at = created_at
+        self.is_active = 1
+        self.versions = []
+        self.search_rowid = None
+        self.signature = None
+        self.buckets = ()
+
+    def project(self, fields):
+        return {field: getattr(self, field) for field in fields}
+
+
+class VersionRecord:
+    __slots__ = ('content', 'content_hash', 'created_at')
+
+    def __init__(self, content):
+        self.content = content
+        self.content_hash = hashlib.sha256(content.encode()).hexdigest()
+        self.created_at = str(datetime.now())
+
+
+class VoteRecord:
+    __slots__ = ('id', 'prompt_id', 'user_id', 'score', 'comment', 'timestamp')
+
+    def __init__(self, id, prompt_id, user_id, score, comment, timestamp):
+        self.id = id
+        self.prompt_id = prompt_id
+        self.user_id = user_id
+        self.score = score
+        self.comment = comment
+        self.timestamp = timestamp
+
+
+class OptimizationRecord:
+    __slots__ = ('id', 'optimized_content', 'improvement_score', 'created_at')
+
+    def __init__(self, id, optimized_content, improvement_score):
+        self.id = id
+        self.optimized_content = optimized_content
+        self.improvement_score = improvement_score
+        self.created_at = str(datetime.now())
+
+
+class ArmRecord:
+    __slots__ = ('variant_id', 'n', 'mean', 'm2')
+
+    def __init__(self, variant_id):
+        self.variant_id = variant_id
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+
+class ABTestRecord:
+    __slots__ = ('id', 'name', 'sample_size', 'duration_days', 'status', 'created_at',
+                 'metric', 'config', 'p_value', 'winner', 'arms')
+
+    def __init__(self, id, config, metric, variant_ids):
+        self.id = id
+        self.name = config['name']
+        self.sample_size = config['sample_size']
+        self.duration_days = config['duration_days']
+        self.status = 'running'
+        self.created_at = str(datetime.now())
+        self.metric = metric
+        self.config = dict(config)
+        self.p_value = 1.0
+        self.winner = None
+        self.arms = {arm: ArmRecord(variant_id) for arm, variant_id in zip(ARMS, variant_ids)}
+
+
+class MemoryRepository(Repository):
+    """Everything is held in this process and lost when it exits
+
+    Templates are kept in a dict plus a sorted id list for keyset paging,
+    votes are indexed by id and by prompt, and A/B arms by (metric,
+    variant_id), mirroring the SQLite indexes. Values read back match the
+    SQLite repository (timestamps as strings, is_active as 1). Writes are
+    serialized by one re-entrant lock; there is no rollback, so a failing
+    write keeps whatever it changed before the error. Search runs on an
+    FTS5 table in a private in-memory SQLite database. Every version is
+    stored in full. Promoted evaluation metrics are kept per name sorted
+    by value, like the SQLite (name, value) index.
+    """
+
+    persistent = False
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._templates = {}
+        self._template_ids = []
+        self._votes = {}
+        self._vote_ids = []
+        self._votes_by_prompt = defaultdict(list)
+        self._idempotency_keys = {}
+        self._optimizations = {}
+        self._ab_tests = {}
+        self._arms_by_variant = defaultdict(list)
+        self._summary = {}
+        self._reset_summary()
+        self._search = sqlite3.connect(':memory:', check_same_thread=False, isolation_level=None)
+        self._search.execute(SEARCH_TABLE)
+        self._search_rowids = itertools.count(1)
+        self._search_ids = {}
+        self._buckets = defaultdict(set)
+        # prompt_id -> leaderboard row, plus (-score, prompt_id) kept sorted per ranking
+        self._prompt_scores = {}
+        self._rankings = {by: [] for by in PROMPT_RANKINGS}
+        self._evaluations = {}
+        self._evaluations_by_version = defaultdict(list)
+        self._evaluation_ids = itertools.count(1)
+        # metric name -> sorted (value, log_id, version_id), and (version_id, name) -> [count, total, min, max]
+        self._evaluation_metrics = defaultdict(list)
+        self._evaluation_rollups = {}
+
+    def transaction(self):
+        return self._lock
+
+    def create_template(self, name, description, content):
+        template = TemplateRecord(str(uuid.uuid4()), name, description, content, str(datetime.now()))
+        template.versions.append(VersionRecord(content))
+        with self._lock:
+            self._templates[template.id] = template
+            insort(self._template_ids, template.id)
+            self._index_templates([template])
+            self._sign_template(template)
+        return template.id
+
+    def get_template(self, template_id):
+        template = self._templates.get(template_id)
+        return template.project(TEMPLATE_FIELDS) if template else None
+
+    def update_template(self, template_id, name=None, description=None, content=None, is_active=None):
+        with self._lock:
+            template = self._templates.get(template_id)
+            if template is None:
+                return False
+            if content is not None:
+                version = VersionRecord(content)
+                if version.content_hash != template.versions[-1].content_hash:
+                    template.versions.append(version)
+                if content != template.content:
+                    template.content = content
+                    self._sign_template(template)
+            if name is not None:
+                template.name = name
+            if description is not None:
+                template.description = description
+            if is_active is not None:
+                template.is_active = int(bool(is_active))
+            template.updated_at = str(datetime.now())
+            self._search.execute(
+                "UPDATE templates_fts SET name = ?, description = ?, template_content = ? WHERE rowid = ?",
+                (template.name, template.description, template.content, template.search_rowid)
+            )
+        return True
+
+    def delete_template(self, template_id):
+        with self._lock:
+            template = self._templates.pop(template_id, None)
+            if template is None:
+                return False
+            del self._template_ids[bisect_right(self._template_ids, template_id) - 1]
+            self._search.execute("DELETE FROM templates_fts WHERE rowid = ?", (template.search_rowid,))
+            del self._search_ids[template.search_rowid]
+            self._unsign_template(template)
+        return True
+
+    def select_templates(self, fields, is_active=None, after=None, limit=None):
+        with self._lock:
+            start = bisect_right(self._template_ids, after) if after is not None else 0
+            ids = self._template_ids[start:] if is_active is not None or limit is None \
+                else self._template_ids[start:start + limit]
+            templates = [self._templates[template_id] for template_id in ids]
+        if is_active is not None:
+            templates = [template for template in templates if bool(template.is_active) == bool(is_active)]
+            if limit is not None:
+                templates = templates[:limit]
+        return iter([template.project(fields) for template in templates])
+
+    def add_templates(self, templates):
+        with self._lock:
+            templates = new_items(templates, self._templates, lambda template: template['id'])
+            for template in templates:
+                record = TemplateRecord(template['id'], template['name'], template['description'],
+                                        template['content'], str(template['created_at']))
+                record.updated_at = str(template['updated_at'])
+                record.is_active = int(bool(template['is_active']))
+                record.versions.append(VersionRecord(template['content']))
+                self._templates[record.id] = record
+                insort(self._template_ids, record.id)
+            records = [self._templates[template['id']] for template in templates]
+            self._index_templates(records)
+            for record in records:
+                self._sign_template(record)
+        return templates
+
+    def get_templates(self, template_ids, fields):
+        templates = {}
+        for template_id in template_ids:
+            template = self._templates.get(template_id)
+            if template is not None:
+                templates[template_id] = template.project(fields)
+        return templates
+
+    def list_versions(self, template_id):
+        template = self._templates.get(template_id)
+        if template is None:
+            return []
+        return [
+            {
+                "version": seq,
+                "content_hash": version.content_hash,
+                "encoding": "full",
+                "size": len(version.content),
+                "created_at": version.created_at
+            } for seq, version in enumerate(template.versions, 1)
+        ]
+
+    def get_version(self, template_id, version):
+        template = self._templates.get(template_id)
+        if template is None or not 1 <= version <= len(template.versions):
+            return None
+        return template.versions[version - 1].content
+
+    def latest_version(self, template_id):
+        template = self._templates.get(template_id)
+        return len(template.versions) if template else None
+
+    def search_templates(self, match, limit, offset=0, snippet_tokens=16, max_candidates=None):
+        with self._lock:
+            # Same statement as the SQLite repository, minus the join to templates
+            rows = self._search.execute("""
+                WITH candidates AS (
+                    SELECT rowid, bm25(templates_fts, ?, ?, ?) AS score FROM templates_fts
+                    WHERE templates_fts MATCH ? LIMIT ?
+                ),
+                ranked AS (
+                    SELECT rowid, score, (SELECT COUNT(*) FROM candidates) AS matched
+                    FROM (SELECT rowid, score FROM candidates LIMIT ?)
+                    ORDER BY score, rowid LIMIT ? OFFSET ?
+                )
+                SELECT ranked.rowid, snippet(templates_fts, -1, ?, ?, '…', ?), ranked.score, ranked.matched
+                FROM ranked JOIN templates_fts ON templates_fts.rowid = ranked.rowid
+                WHERE templates_fts MATCH ?
+                ORDER BY ranked.score, ranked.rowid
+            """, (*SEARCH_WEIGHTS, match, max_candidates + 1 if max_candidates else -1, max_candidates or -1,
+                  limit, offset, *SNIPPET_MARKS, snippet_tokens, match)).fetchall()
+            results = []
+            for rowid, snippet, score, _ in rows:
+                template = self._templates[self._search_ids[rowid]]
+                results.append({'id': template.id, 'name': template.name, 'description': template.description,
+                                 'snippet': snippet, 'score': -score})
+        return results, bool(max_candidates and rows and rows[0][3] > max_candidates)
+
+    def rebuild_search_index(self):
+        with self._lock:
+            self._search.execute("DELETE FROM templates_fts")
+            self._search_ids.clear()
+            self._index_templates(self._templates.values())
+
+    def get_signatures(self, template_ids):
+        signatures = {}
+        for template_id in template_ids:
+            template = self._templates.get(template_id)
+            if template is not None and template.signature is not None:
+                signatures[template_id] = template.signature
+        return signatures
+
+    def bucket_members(self, buckets):
+        with self._lock:
+            return {key: set(self._buckets[key]) for key in buckets if key in self._buckets}
+
+    def rebuild_similarity_index(self):
+        with self._lock:
+            self._buckets.clear()
+            for template in self._templates.values():
+                template.buckets = ()
+                self._sign_template(template)
+            return len(self._templates)
+
+    def add_votes(self, rows, deduplicate=False):
+        with self._lock:
+            if deduplicate:
+                rows = new_items(rows, self._votes, lambda row: row[0])
+            elif len(new_items(rows, self._votes, lambda row: row[0])) < len(rows):
+                raise ValueError("Vote id already stored or repeated in the batch")
+            for row in rows:
+                vote = VoteRecord(row[0], row[1], row[2], row[3], row[4], str(row[5]))
+                self._votes[vote.id] = vote
+                self._votes_by_prompt[vote.prompt_id].append(vote)
+            if len(rows) > VOTE_INSORT_LIMIT:
+                # One merge of the new ids instead of a list shift per vote
+                self._vote_ids.extend(row[0] for row in rows)
+                self._vote_ids.sort()
+            else:
+                for row in rows:
+                    insort(self._vote_ids, row[0])
+            self._record_values('votes', [row[3] for row in rows])
+            current = {prompt_id: self._prompt_scores[prompt_id][1:4]
+                       for prompt_id in {row[1] for row in rows} if prompt_id in self._prompt_scores}
+            for score in prompt_scores.fold_votes(current, [(row[1], row[3]) for row in rows]):
+                self._store_prompt_score(score)
+        return rows
+
+    def select_votes(self, after=None, limit=None):
+        # Read in pages from the sorted id index, holding the lock only while copying one page
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = VOTE_PAGE_SIZE if remaining is None else min(VOTE_PAGE_SIZE, remaining)
+            with self._lock:
+                start = bisect_right(self._vote_ids, after) if after is not None else 0
+                votes = [self._votes[vote_id] for vote_id in self._vote_ids[start:start + size]]
+            if not votes:
+                return
+            for vote in votes:
+                yield (vote.id, vote.prompt_id, vote.user_id, vote.score, vote.comment, vote.timestamp)
+            after = votes[-1].id
+            if remaining is not None:
+                remaining -= len(votes)
+
+    def claim_idempotency_key(self, key, fingerprint):
+        with self._lock:
+            return self._idempotency_keys.setdefault(key, fingerprint)
+
+    def top_prompts(self, k, min_votes, by):
+        votes = PROMPT_SCORE_FIELDS.index('votes')
+        with self._lock:
+            ranked = (self._prompt_scores[prompt_id] for _, prompt_id in self._rankings[by])
+            return list(itertools.islice((row for row in ranked if row[votes] >= min_votes), k))
+
+    def get_prompt_score(self, prompt_id):
+        with self._lock:
+            return self._prompt_scores.get(prompt_id)
+
+    def rebuild_prompt_scores(self):
+        with self._lock:
+            self._prompt_scores.clear()
+            for ranking in self._rankings.values():
+                ranking.clear()
+            sums = []
+            for prompt_id, votes in self._votes_by_prompt.items():
+                scores = [vote.score for vote in votes]
+                sums.append((prompt_id, len(scores), sum(scores), sum(score * score for score in scores)))
+            for row in prompt_scores.score_rows(sums):
+                self._store_prompt_score(row)
+            return len(self._prompt_scores)
+
+    def prompt_scores_missing(self):
+        with self._lock:
+            return bool(self._votes) and not self._prompt_scores
+
+    def add_optimization(self, optimization_id, optimized_content, improvement_score):
+        with self._lock:
+            self._optimizations[optimization_id] = OptimizationRecord(
+                optimization_id, optimized_content, improvement_score
+            )
+            self._record_values('optimizations', [improvement_score])
+
+    def add_evaluations(self, rows, promoted):
+        first_id = None
+        with self._lock:
+            for row, metrics in zip(rows, promoted):
+                log_id = next(self._evaluation_ids)
+                first_id = first_id or log_id
+                self._evaluations[log_id] = (log_id, *row[:4], str(row[4]))
+                self._evaluations_by_version[row[0]].append(log_id)
+                version_id = row[0] or ''
+                for name, value in metrics:
+                    insort(self._evaluation_metrics[name], (value, log_id, version_id))
+                    rollup = self._evaluation_rollups.setdefault((version_id, name), [0, 0.0, value, value])
+                    rollup[0] += 1
+                    rollup[1] += value
+                    rollup[2], rollup[3] = min(rollup[2], value), max(rollup[3], value)
+        return first_id
+
+    def evaluation_rollups(self, version_id=None, metric=None):
+        with self._lock:
+            return [
+                (key[0], key[1], *values) for key, values in self._evaluation_rollups.items()
+                if (version_id is None or key[0] == version_id) and (metric is None or key[1] == metric)
+            ]
+
+    def query_evaluations(self, metric, version_id=None, min_value=None, max_value=None, limit=100):
+        value = lambda entry: entry[0]
+        rows = []
+        with self._lock:
+            entries = self._evaluation_metrics.get(metric, [])
+            low = bisect_left(entries, min_value, key=value) if min_value is not None else 0
+            high = bisect_right(entries, max_value, key=value) if max_value is not None else len(entries)
+            for index in range(high - 1, low - 1, -1):
+                if len(rows) >= limit:
+                    break
+                entry = entries[index]
+                if version_id is None or entry[2] == version_id:
+                    rows.append((entry[1], entry[2], entry[0]))
+        return rows
+
+    def create_ab_test(self, test_id, config, metric, variant_ids):
+        test = ABTestRecord(test_id, config, metric, variant_ids)
+        with self._lock:
+            self._ab_tests[test_id] = test
+            for arm, stats in test.arms.items():
+                self._arms_by_variant[(metric, stats.variant_id)].append((test_id, arm))
+
+    def load_ab_test(self, test_id):
+        test = self._ab_tests.get(test_id)
+        if test is None:
+            return None
+        return {
+            'status': test.status,
+            'sample_size': test.sample_size,
+            'metric': test.metric,
+            'config': dict(test.config),
+            'p_value': test.p_value,
+            'winner': test.winner,
+            'arms': {
+                arm: {'variant_id': stats.variant_id, 'n': stats.n, 'mean': stats.mean, 'm2': stats.m2}
+                for arm, stats in test.arms.items()
+            }
+        }
+
+    def save_ab_test(self, test_id, test):
+        with self._lock:
+            record = self._ab_tests[test_id]
+            record.status, record.p_value, record.winner = test['status'], test['p_value'], test['winner']
+
+    def running_arms(self, metric, variant_ids):
+        rows = []
+        with self._lock:
+            for variant_id in variant_ids:
+                for test_id, arm in self._arms_by_variant.get((metric, variant_id), ()):
+                    test = self._ab_tests[test_id]
+                    if test.status == 'running':
+                        stats = test.arms[arm]
+                        rows.append((test_id, arm, variant_id, stats.n, stats.mean, stats.m2))
+        return rows
+
+    def update_arm(self, test_id, arm, n, mean, m2):
+        with self._lock:
+            stats = self._ab_tests[test_id].arms[arm]
+            stats.n, stats.mean, stats.m2 = n, mean, m2
+
+    def running_ab_tests(self):
+        with self._lock:
+            return [
+                (test.id, test.arms['variant_a'].variant_id, test.arms['variant_b'].variant_id, dict(test.config))
+                for test in self._ab_tests.values() if test.status == 'running'
+            ]
+
+    def observation_chunks(self, metric, variant_ids, chunk_size):
+        with self._lock:
+            if metric == 'votes':
+                rows = [
+                    (vote.prompt_id, vote.score)
+                    for variant_id in variant_ids
+                    for vote in self._votes_by_prompt.get(variant_id, ())
+                    if vote.score is not None
+                ]
+            else:
+                logs = (self._evaluations[log_id] for variant_id in variant_ids
+                        for log_id in self._evaluations_by_version.get(variant_id, ()))
+                rows = [(log[1], log[4]) for log in logs if log[4] is not None]
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+    def read_summary(self):
+        with self._lock:
+            return {metric: tuple(values) for metric, values in self._summary.items()}
+
+    def summary_missing(self):
+        with self._lock:
+            return any(metric not in self._summary for metric in SUMMARY_SOURCES)
+
+    def rebuild_summary(self):
+        with self._lock:
+            self._reset_summary()
+            self._record_values('votes', [vote.score for vote in self._votes.values()])
+            self._record_values('optimizations', [
+                optimization.improvement_score for optimization in self._optimizations.values()
+            ])
+
+    def _store_prompt_score(self, row):
+        previous = self._prompt_scores.get(row[0])
+        self._prompt_scores[row[0]] = row
+        for by, ranking in self._rankings.items():
+            column = PROMPT_SCORE_FIELDS.index(f"{by}_score")
+            if previous is not None:
+                del ranking[bisect_left(ranking, (-previous[column], row[0]))]
+            insort(ranking, (-row[column], row[0]))
+
+    def _index_templates(self, templates):
+        rows = []
+        for template in templates:
+            template.search_rowid = next(self._search_rowids)
+            self._search_ids[template.search_rowid] = template.id
+            rows.append((template.search_rowid, template.name, template.description, template.content))
+        self._search.executemany(
+            "INSERT INTO templates_fts (rowid, name, description, template_content) VALUES (?, ?, ?, ?)", rows
+        )
+
+    def _sign_template(self, template):
+        self._unsign_template(template)
+        template.signature, buckets = template_similarity.signature_record(template.content)
+        template.buckets = tuple(buckets)
+        for key in template.buckets:
+            self._buckets[key].add(template.id)
+
+    def _unsign_template(self, template):
+        for key in template.buckets:
+            members = self._buckets[key]
+            members.discard(template.id)
+            if not members:
+                del self._buckets[key]
+
+    def _reset_summary(self):
+        # Same rows as a rebuilt SQLite summary; there is no prompts table here
+        self._summary = {metric: [0, 0, None, None] for metric in SUMMARY_SOURCES}
+
+    def _record_values(self, metric, values):
+        if not values:
+            return
+        row = self._summary[metric]
+        row[0] += len(values)
+        row[1] += sum(values)
+        low, high = min(values), max(values)
+        row[2] = low if row[2] is None else min(row[2], low)
+        row[3] = high if row[3] is None else max(row[3], high)
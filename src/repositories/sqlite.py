@@ -0,0 +1,573 @@
+"""
+SQLite Repository Module
+Repository over the shared SQLite connection layer
+"""
+
+from datetime import datetime
+import itertools
+import json
+import uuid
+
+from src.db import MAX_QUERY_PARAMS, get_connection, transaction
+from src.repositories import SEARCH_WEIGHTS, SNIPPET_MARKS, Repository, new_items
+from src.skills import prompt_scores, template_similarity, template_versions
+from src.skills.analytics_summary import SUMMARY_SOURCES, record_values
+
+# Public template field -> column
+TEMPLATE_COLUMNS = {
+    'id': 'id',
+    'name': 'name',
+    'description': 'description',
+    'content': 'template_content',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'is_active': 'is_active'
+}
+
+# Where each A/B metric's observations are read from
+OBSERVATION_QUERIES = {
+    'votes': "SELECT prompt_id, score FROM user_votes WHERE prompt_id IN ({}) AND score IS NOT NULL",
+    'evaluations': ("SELECT version_id, human_score FROM evaluation_logs "
+                    "WHERE version_id IN ({}) AND human_score IS NOT NULL"),
+}
+
+ARMS = ('variant_a', 'variant_b')
+
+# top_prompts ranking -> prompt_scores column (each has a descending index)
+RANKING_COLUMNS = {'bayesian': 'bayesian_score', 'wilson': 'wilson_score'}
+
+PROMPT_SCORE_COLUMNS = 'prompt_id, vote_count, score_sum, score_sum_squares, bayesian_score, wilson_score'
+
+# Rows of the external-content search index are read from templates by rowid
+SEARCH_COLUMNS = 'name, description, template_content'
+
+
+def _chunks(values, size=MAX_QUERY_PARAMS):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _iter_rows(fields, cursor, batch_size=500):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            yield dict(zip(fields, row))
+
+
+class SQLiteRepository(Repository):
+    """Rows live in the configured SQLite database, one connection per thread"""
+
+    def transaction(self):
+        return transaction()
+
+    def create_template(self, name, description, content):
+        template_id = str(uuid.uuid4())
+        now = datetime.now()
+        with transaction() as conn:
+            conn.execute("""
+                INSERT INTO templates (id, name, description, template_content, created_at, updated_at, is_active)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (template_id, name, description, content, now, now, True))
+            template_versions.record_version(conn, template_id, content)
+            self._index_templates(conn, [template_id])
+            self._sign_templates(conn, [(template_id, content)])
+        return template_id
+
+    def get_template(self, template_id):
+        columns = ', '.join(TEMPLATE_COLUMNS.values())
+        row = get_connection().execute(f"SELECT {columns} FROM templates WHERE id = ?", (template_id,)).fetchone()
+        return dict(zip(TEMPLATE_COLUMNS, row)) if row else None
+
+    def update_template(self, template_id, name=None, description=None, content=None, is_active=None):
+        # Fields left as None keep their stored value; only content changes are versioned
+        with transaction() as conn:
+            row = conn.execute(
+                f"SELECT rowid, {SEARCH_COLUMNS} FROM templates WHERE id=?", (template_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            self._unindex(conn, row)
+            if content is not None:
+                template_versions.record_version(conn, template_id, content, previous_content=row[3])
+                if content != row[3]:
+                    self._unsign_template(conn, template_id)
+                    self._sign_templates(conn, [(template_id, content)])
+            conn.execute("""
+                UPDATE templates
+                SET name=COALESCE(?, name), description=COALESCE(?, description),
+                    template_content=COALESCE(?, template_content), is_active=COALESCE(?, is_active), updated_at=?
+                WHERE id=?
+            """, (name, description, content, None if is_active is None else bool(is_active), datetime.now(),
+                  template_id))
+            self._index_templates(conn, [template_id])
+        return True
+
+    def delete_template(self, template_id):
+        with transaction() as conn:
+            row = conn.execute(
+                f"SELECT rowid, {SEARCH_COLUMNS} FROM templates WHERE id=?", (template_id,)
+            ).fetchone()
+            if row is not None:
+                self._unindex(conn, row)
+            self._unsign_template(conn, template_id)
+            conn.execute("DELETE FROM template_versions WHERE template_id=?", (template_id,))
+            cursor = conn.execute("DELETE FROM templates WHERE id=?", (template_id,))
+        return cursor.rowcount > 0
+
+    def select_templates(self, fields, is_active=None, after=None, limit=None):
+        conditions, params = [], []
+        if is_active is not None:
+            conditions.append("is_active = ?")
+            params.append(bool(is_active))
+        if after is not None:
+            conditions.append("id > ?")
+            params.append(after)
+
+        sql = f"SELECT {', '.join(TEMPLATE_COLUMNS[field] for field in fields)} FROM templates"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        # Executed now so errors surface before iteration; rows are then streamed
+        return _iter_rows(fields, get_connection().execute(sql, params))
+
+    def add_templates(self, templates):
+        with transaction() as conn:
+            existing = self._existing_ids(conn, 'templates', [template['id'] for template in templates])
+            templates = new_items(templates, existing, lambda template: template['id'])
+            conn.executemany("""
+                INSERT INTO templates (id, name, description, template_content, created_at, updated_at, is_active)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [tuple(template[field] for field in TEMPLATE_COLUMNS) for template in templates])
+            template_versions.record_initial_versions(conn, [
+                (template['id'], template['content'], template['created_at']) for template in templates
+            ])
+            self._index_templates(conn, [template['id'] for template in templates])
+            self._sign_templates(conn, [(template['id'], template['content']) for template in templates])
+        return templates
+
+    def get_templates(self, template_ids, fields):
+        columns = ', '.join(TEMPLATE_COLUMNS[field] for field in fields)
+        templates = {}
+        conn = get_connection()
+        for chunk in _chunks(template_ids):
+            placeholders = ','.join('?' * len(chunk))
+            cursor = conn.execute(f"SELECT {columns} FROM templates WHERE id IN ({placeholders})", chunk)
+            for row in cursor:
+                template = dict(zip(fields, row))
+                templates[template['id']] = template
+        return templates
+
+    def list_versions(self, template_id):
+        return template_versions.list_versions(template_id)
+
+    def get_version(self, template_id, version):
+        return template_versions.rebuild_version(template_id, version)
+
+    def latest_version(self, template_id):
+        return template_versions.latest_version(template_id)
+
+    def search_templates(self, match, limit, offset=0, snippet_tokens=16, max_candidates=None):
+        # SQLite keeps only the best limit + offset scores while ranking, and
+        # snippets are built in the same statement for the returned page only.
+        # One candidate past max_candidates tells whether the ranking was cut short.
+        rows = get_connection().execute("""
+            WITH candidates AS (
+                SELECT rowid, bm25(templates_fts, ?, ?, ?) AS score FROM templates_fts
+                WHERE templates_fts MATCH ? LIMIT ?
+            ),
+            ranked AS (
+                SELECT rowid, score, (SELECT COUNT(*) FROM candidates) AS matched
+                FROM (SELECT rowid, score FROM candidates LIMIT ?)
+                ORDER BY score, rowid LIMIT ? OFFSET ?
+            )
+            SELECT t.id, t.name, t.description, snippet(templates_fts, -1, ?, ?, '…', ?), ranked.score, ranked.matched
+            FROM ranked
+            JOIN templates_fts ON templates_fts.rowid = ranked.rowid
+            JOIN templates t ON t.rowid = ranked.rowid
+            WHERE templates_fts MATCH ?
+            ORDER BY ranked.score, ranked.rowid
+        """, (*SEARCH_WEIGHTS, match, max_candidates + 1 if max_candidates else -1, max_candidates or -1, limit, offset,
+              *SNIPPET_MARKS, snippet_tokens, match)).fetchall()
+        results = [{'id': row[0], 'name': row[1], 'description': row[2], 'snippet': row[3], 'score': -row[4]}
+                   for row in rows]
+        return results, bool(max_candidates and rows and rows[0][5] > max_candidates)
+
+    def rebuild_search_index(self):
+        with transaction() as conn:
+            conn.execute("INSERT INTO templates_fts (templates_fts) VALUES ('rebuild')")
+
+    def get_signatures(self, template_ids):
+        signatures = {}
+        conn = get_connection()
+        for chunk in _chunks(template_ids):
+            placeholders = ','.join('?' * len(chunk))
+            signatures.update(conn.execute(
+                f"SELECT template_id, signature FROM template_signatures WHERE template_id IN ({placeholders})", chunk
+            ))
+        return signatures
+
+    def bucket_members(self, buckets):
+        members = {}
+        conn = get_connection()
+        for chunk in _chunks(list(set(buckets))):
+            placeholders = ','.join('?' * len(chunk))
+            cursor = conn.execute(
+                f"SELECT bucket, template_id FROM template_lsh_buckets WHERE bucket IN ({placeholders})", chunk
+            )
+            for bucket, template_id in cursor:
+                members.setdefault(bucket, set()).add(template_id)
+        return members
+
+    def rebuild_similarity_index(self):
+        with transaction() as conn:
+            conn.execute("DELETE FROM template_lsh_buckets")
+            conn.execute("DELETE FROM template_signatures")
+            count, after = 0, None
+            while True:
+                page = list(self.select_templates(['id', 'content'], after=after, limit=1000))
+                if not page:
+                    return count
+                self._sign_templates(conn, [(template['id'], template['content']) for template in page])
+                count += len(page)
+                after = page[-1]['id']
+
+    def add_votes(self, rows, deduplicate=False):
+        with transaction() as conn:
+            if deduplicate:
+                existing = self._existing_ids(conn, 'user_votes', [row[0] for row in rows])
+                rows = new_items(rows, existing, lambda row: row[0])
+            conn.executemany("""
+                INSERT INTO user_votes (id, prompt_id, user_id, score, comment, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+            record_values(conn, 'votes', [row[3] for row in rows])
+            self._fold_prompt_scores(conn, rows)
+        return rows
+
+    def select_votes(self, after=None, limit=None):
+        sql = "SELECT id, prompt_id, user_id, score, comment, timestamp FROM user_votes"
+        params = []
+        if after is not None:
+            sql += " WHERE id > ?"
+            params.append(after)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        cursor = get_connection().execute(sql, params)
+        return (row for rows in iter(lambda: cursor.fetchmany(500), []) for row in rows)
+
+    def claim_idempotency_key(self, key, fingerprint):
+        with transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO idempotency_keys (key, fingerprint) VALUES (?, ?)", (key, fingerprint))
+            return conn.execute("SELECT fingerprint FROM idempotency_keys WHERE key = ?", (key,)).fetchone()[0]
+
+    def top_prompts(self, k, min_votes, by):
+        cursor = get_connection().execute(f"""
+            SELECT {PROMPT_SCORE_COLUMNS} FROM prompt_scores
+            WHERE vote_count >= ?
+            ORDER BY {RANKING_COLUMNS[by]} DESC, prompt_id
+            LIMIT ?
+        """, (min_votes, k))
+        return cursor.fetchall()
+
+    def get_prompt_score(self, prompt_id):
+        return get_connection().execute(
+            f"SELECT {PROMPT_SCORE_COLUMNS} FROM prompt_scores WHERE prompt_id = ?", (prompt_id,)
+        ).fetchone()
+
+    def rebuild_prompt_scores(self):
+        with transaction() as conn:
+            conn.execute("DELETE FROM prompt_scores")
+            cursor = conn.execute("""
+                SELECT prompt_id, COUNT(*), SUM(score), SUM(score * score) FROM user_votes
+                WHERE score IS NOT NULL GROUP BY prompt_id
+            """)
+            count = 0
+            for sums in iter(lambda: cursor.fetchmany(1000), []):
+                conn.executemany(
+                    f"INSERT INTO prompt_scores ({PROMPT_SCORE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                    prompt_scores.score_rows(sums)
+                )
+                count += len(sums)
+        return count
+
+    def prompt_scores_missing(self):
+        return bool(get_connection().execute("""
+            SELECT NOT EXISTS (SELECT 1 FROM prompt_scores) AND EXISTS (SELECT 1 FROM user_votes)
+        """).fetchone()[0])
+
+    def add_optimization(self, optimization_id, optimized_content, improvement_score):
+        with transaction() as conn:
+            conn.execute("""
+                INSERT INTO optimized_prompts (id, original_prompt_id, optimized_content, created_at, improvement_score)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                optimization_id,
+                str(uuid.uuid4()),  # original_prompt_id
+                optimized_content,
+                datetime.now(),
+                improvement_score
+            ))
+            record_values(conn, 'optimizations', [improvement_score])
+
+    def add_evaluations(self, rows, promoted):
+        with transaction() as conn:
+            # Ids are assigned here so promoted metric rows can reference their log
+            next_id = self._next_evaluation_id(conn)
+            metric_rows, rollups = [], {}
+            for log_id, row, metrics in zip(itertools.count(next_id), rows, promoted):
+                version_id = row[0] or ''
+                for name, value in metrics:
+                    metric_rows.append((name, version_id, value, log_id))
+                    count, total, low, high = rollups.get((version_id, name), (0, 0.0, value, value))
+                    rollups[(version_id, name)] = (count + 1, total + value, min(low, value), max(high, value))
+            conn.executemany("""
+                INSERT INTO evaluation_logs (id, version_id, response, metrics_json, human_score, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [(log_id, *row) for log_id, row in zip(itertools.count(next_id), rows)])
+            conn.executemany(
+                "INSERT INTO evaluation_metrics (name, version_id, value, log_id) VALUES (?, ?, ?, ?)",
+                metric_rows
+            )
+            conn.executemany("""
+                INSERT INTO evaluation_metric_rollups (version_id, name, count, total, min_value, max_value)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (version_id, name) DO UPDATE SET
+                    count = count + excluded.count,
+                    total = total + excluded.total,
+                    min_value = MIN(min_value, excluded.min_value),
+                    max_value = MAX(max_value, excluded.max_value)
+            """, [key + value for key, value in rollups.items()])
+        return next_id
+
+    def evaluation_rollups(self, version_id=None, metric=None):
+        conditions, params = [], []
+        if version_id is not None:
+            conditions.append("version_id = ?")
+            params.append(version_id)
+        if metric is not None:
+            conditions.append("name = ?")
+            params.append(metric)
+        sql = "SELECT version_id, name, count, total, min_value, max_value FROM evaluation_metric_rollups"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return get_connection().execute(sql, params).fetchall()
+
+    def query_evaluations(self, metric, version_id=None, min_value=None, max_value=None, limit=100):
+        conditions, params = ["name = ?"], [metric]
+        if version_id is not None:
+            conditions.append("version_id = ?")
+            params.append(version_id)
+        if min_value is not None:
+            conditions.append("value >= ?")
+            params.append(min_value)
+        if max_value is not None:
+            conditions.append("value <= ?")
+            params.append(max_value)
+        params.append(limit)
+        return get_connection().execute(f"""
+            SELECT log_id, version_id, value FROM evaluation_metrics
+            WHERE {' AND '.join(conditions)}
+            ORDER BY value DESC LIMIT ?
+        """, params).fetchall()
+
+    def create_ab_test(self, test_id, config, metric, variant_ids):
+        with transaction() as conn:
+            conn.execute("""
+                INSERT INTO ab_tests (id, name, variant_a_id, variant_b_id, sample_size, duration_days, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                test_id,
+                config['name'],
+                variant_ids[0],
+                variant_ids[1],
+                config['sample_size'],
+                config['duration_days'],
+                'running',
+                datetime.now()
+            ))
+            conn.execute("""
+                INSERT INTO ab_test_state (test_id, metric, config_json, p_value, updated_at)
+                VALUES (?, ?, ?, 1.0, ?)
+            """, (test_id, metric, json.dumps(config), datetime.now()))
+            conn.executemany("""
+                INSERT INTO ab_test_stats (test_id, arm, variant_id, metric) VALUES (?, ?, ?, ?)
+            """, [(test_id, arm, variant_id, metric) for arm, variant_id in zip(ARMS, variant_ids)])
+
+    def load_ab_test(self, test_id):
+        conn = get_connection()
+        row = conn.execute("""
+            SELECT t.status, t.sample_size, s.metric, s.config_json, s.p_value, s.winner
+            FROM ab_tests t JOIN ab_test_state s ON s.test_id = t.id
+            WHERE t.id = ?
+        """, (test_id,)).fetchone()
+        if row is None:
+            return None
+        status, sample_size, metric, config_json, p_value, winner = row
+        arms = {
+            arm: {'variant_id': variant_id, 'n': n, 'mean': mean, 'm2': m2}
+            for arm, variant_id, n, mean, m2 in conn.execute(
+                "SELECT arm, variant_id, n, mean, m2 FROM ab_test_stats WHERE test_id = ?", (test_id,)
+            )
+        }
+        return {
+            'status': status,
+            'sample_size': sample_size,
+            'metric': metric,
+            'config': json.loads(config_json),
+            'p_value': p_value,
+            'winner': winner,
+            'arms': arms
+        }
+
+    def save_ab_test(self, test_id, test):
+        with transaction() as conn:
+            conn.execute(
+                "UPDATE ab_test_state SET p_value = ?, winner = ?, updated_at = ? WHERE test_id = ?",
+                (test['p_value'], test['winner'], datetime.now(), test_id)
+            )
+            conn.execute("UPDATE ab_tests SET status = ? WHERE id = ? AND status != ?",
+                         (test['status'], test_id, test['status']))
+
+    def running_arms(self, metric, variant_ids):
+        rows = []
+        conn = get_connection()
+        for chunk in _chunks(list(variant_ids), MAX_QUERY_PARAMS - 1):
+            placeholders = ','.join('?' * len(chunk))
+            rows.extend(conn.execute(f"""
+                SELECT s.test_id, s.arm, s.variant_id, s.n, s.mean, s.m2
+                FROM ab_test_stats s JOIN ab_tests t ON t.id = s.test_id
+                WHERE s.metric = ? AND s.variant_id IN ({placeholders}) AND t.status = 'running'
+            """, [metric] + chunk))
+        return rows
+
+    def update_arm(self, test_id, arm, n, mean, m2):
+        with transaction() as conn:
+            conn.execute(
+                "UPDATE ab_test_stats SET n = ?, mean = ?, m2 = ? WHERE test_id = ? AND arm = ?",
+                (n, mean, m2, test_id, arm)
+            )
+
+    def running_ab_tests(self):
+        cursor = get_connection().execute("""
+            SELECT t.id, t.variant_a_id, t.variant_b_id, s.config_json
+            FROM ab_tests t JOIN ab_test_state s ON s.test_id = t.id
+            WHERE t.status = 'running'
+        """)
+        return [
+            (test_id, variant_a_id, variant_b_id, json.loads(config_json) if config_json else {})
+            for test_id, variant_a_id, variant_b_id, config_json in cursor
+        ]
+
+    def observation_chunks(self, metric, variant_ids, chunk_size):
+        variant_ids = list(variant_ids)
+        cursor = get_connection().execute(
+            OBSERVATION_QUERIES[metric].format(','.join('?' * len(variant_ids))), variant_ids
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+
+    def _index_templates(self, conn, template_ids):
+        for chunk in _chunks(template_ids):
+            conn.execute(f"""
+                INSERT INTO templates_fts (rowid, {SEARCH_COLUMNS})
+                SELECT rowid, {SEARCH_COLUMNS} FROM templates WHERE id IN ({','.join('?' * len(chunk))})
+            """, chunk)
+
+    def _unindex(self, conn, row):
+        # External-content rows are removed by passing back the (rowid, *SEARCH_COLUMNS) they were indexed with
+        conn.execute(
+            f"INSERT INTO templates_fts (templates_fts, rowid, {SEARCH_COLUMNS}) VALUES ('delete', ?, ?, ?, ?)", row
+        )
+
+    def _sign_templates(self, conn, templates):
+        signatures, buckets = [], []
+        for template_id, content in templates:
+            signature, template_buckets = template_similarity.signature_record(content)
+            signatures.append((template_id, signature))
+            buckets.extend((bucket, template_id) for bucket in template_buckets)
+        conn.executemany("INSERT INTO template_signatures (template_id, signature) VALUES (?, ?)", signatures)
+        conn.executemany("INSERT INTO template_lsh_buckets (bucket, template_id) VALUES (?, ?)", buckets)
+
+    def _unsign_template(self, conn, template_id):
+        row = conn.execute("SELECT signature FROM template_signatures WHERE template_id = ?", (template_id,)).fetchone()
+        if row is None:
+            return
+        conn.executemany(
+            "DELETE FROM template_lsh_buckets WHERE bucket = ? AND template_id = ?",
+            [(bucket, template_id) for bucket in template_similarity.band_buckets(row[0])]
+        )
+        conn.execute("DELETE FROM template_signatures WHERE template_id = ?", (template_id,))
+
+    def _fold_prompt_scores(self, conn, rows):
+        # Read the touched prompts' sums and write them back with the new votes added
+        prompt_ids = list({row[1] for row in rows})
+        current = {}
+        for chunk in _chunks(prompt_ids):
+            placeholders = ','.join('?' * len(chunk))
+            cursor = conn.execute(f"""
+                SELECT prompt_id, vote_count, score_sum, score_sum_squares FROM prompt_scores
+                WHERE prompt_id IN ({placeholders})
+            """, chunk)
+            current.update((row[0], row[1:]) for row in cursor)
+        conn.executemany(f"""
+            INSERT INTO prompt_scores ({PROMPT_SCORE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (prompt_id) DO UPDATE SET
+                vote_count = excluded.vote_count,
+                score_sum = excluded.score_sum,
+                score_sum_squares = excluded.score_sum_squares,
+                bayesian_score = excluded.bayesian_score,
+                wilson_score = excluded.wilson_score
+        """, prompt_scores.fold_votes(current, [(row[1], row[3]) for row in rows]))
+
+    def _next_evaluation_id(self, conn):
+        # AUTOINCREMENT never reuses ids, so start after both the sequence and the current max
+        row = conn.execute("""
+            SELECT MAX(
+                COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'evaluation_logs'), 0),
+                COALESCE((SELECT MAX(id) FROM evaluation_logs), 0)
+            )
+        """).fetchone()
+        return row[0] + 1
+
+    def _existing_ids(self, conn, table, ids):
+        existing = set()
+        for chunk in _chunks(ids):
+            placeholders = ','.join('?' * len(chunk))
+            existing.update(row[0] for row in conn.execute(f"SELECT id FROM {table} WHERE id IN ({placeholders})", chunk))
+        return existing
+
+    def read_summary(self):
+        cursor = get_connection().execute(
+            "SELECT metric, count, total, min_value, max_value FROM analytics_summary"
+        )
+        return {row[0]: row[1:] for row in cursor}
+
+    def rebuild_summary(self):
+        with transaction() as conn:
+            conn.execute("DELETE FROM analytics_summary")
+            for metric, (table, column) in SUMMARY_SOURCES.items():
+                if column is None:
+                    conn.execute(f"""
+                        INSERT INTO analytics_summary (metric, count)
+                        SELECT ?, COUNT(*) FROM {table}
+                    """, (metric,))
+                else:
+                    conn.execute(f"""
+                        INSERT INTO analytics_summary (metric, count, total, min_value, max_value)
+                        SELECT ?, COUNT(*), COALESCE(SUM({column}), 0), MIN({column}), MAX({column})
+                        FROM {table}
+                    """, (metric,))
+
+    def summary_missing(self):
+        count = get_connection().execute("SELECT COUNT(*) FROM analytics_summary").fetchone()[0]
+        return count < len(SUMMARY_SOURCES)
@@ -0,0 +1,84 @@
+"""
+Async SDK Module
+Awaitable variants of the Context Engine and Smart Rewriter for async servers
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import get_setting
+from src.sdk.context_engine import ContextEngine
+from src.sdk.smart_rewriter import SmartRewriter
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Get the process-wide pool that runs blocking skill calls
+
+    Each pool thread keeps its own SQLite connection, so up to
+    server.threads queries run while the event loop stays free.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_setting('server', 'threads', 32),
+                    thread_name_prefix='promptops-db'
+                )
+    return _executor
+
+
+async def run_sync(func, *args, **kwargs):
+    """Run a blocking function in the skill pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+class _AsyncWrapper:
+    """Expose every method of a synchronous SDK object as a coroutine"""
+
+    def __init__(self, target):
+        self.sync = target
+
+    def __getattr__(self, name):
+        method = getattr(self.sync, name)
+        if not callable(method):
+            return method
+
+        async def call(*args, **kwargs):
+            return await run_sync(method, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        # Cache on the instance so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
+
+
+class AsyncContextEngine(_AsyncWrapper):
+    def __init__(self, engine=None):
+        """Wrap a ContextEngine, sharing the process-wide caches by default"""
+        super().__init__(engine or ContextEngine())
+
+    async def iter_template_pages(self, fields=None, is_active=None, limit=500):
+        """Yield templates page by page without holding a cursor across awaits"""
+        after = None
+        while True:
+            page = await self.list_templates_page(after, limit, fields, is_active)
+            for template in page['templates']:
+                yield template
+            after = page['next_after']
+            if after is None:
+                break
+
+
+class AsyncSmartRewriter(_AsyncWrapper):
+    def __init__(self, rewriter=None):
+        """Wrap a SmartRewriter"""
+        super().__init__(rewriter or SmartRewriter())
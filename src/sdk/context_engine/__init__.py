@@ -3,15 +3,67 @@ Context Engine Module
 Provides template management and A/B testing capabilities
 """
 
-from src.skills.manage_templates import manage_templates
-from src.skills.run_ab_test import run_ab_test
-from src.skills.generate_optimization import generate_optimization as skill_generate_optimization
+from src.skills.manage_templates import manage_templates, list_templates_page as skill_list_templates_page, iter_templates as skill_iter_templates, get_templates_bulk, search_templates as skill_search_templates, rebuild_search_index as skill_rebuild_search_index
+from src.skills.template_versions import diff_versions
+from src.repositories import get_repository
+from src.sdk.context_engine.template_cache import TemplateCache
+from src.sdk.context_engine.renderer import TemplateRenderer, TemplateRenderError
+from src.config import get_setting
+from src.lazy import lazy_function
+import hashlib
+
+# A/B testing and optimization are imported on first use, so template-only callers skip them
+run_ab_test = lazy_function('src.skills.run_ab_test', 'run_ab_test')
+get_ab_test_results = lazy_function('src.skills.run_ab_test', 'get_ab_test_results')
+recompute_ab_test = lazy_function('src.skills.run_ab_test', 'recompute_ab_test')
+assign_variant = lazy_function('src.skills.assign_variant', 'assign_variant')
+skill_generate_optimization = lazy_function('src.skills.generate_optimization', 'generate_optimization')
+run_batch = lazy_function('src.sdk.context_engine.batch_executor', 'run_batch')
+import_jsonl = lazy_function('src.skills.bulk_transfer', 'import_jsonl')
+export_jsonl = lazy_function('src.skills.bulk_transfer', 'export_jsonl')
+similar_templates = lazy_function('src.skills.template_similarity', 'similar_templates')
+group_near_duplicates = lazy_function('src.skills.template_similarity', 'group_near_duplicates')
+skill_rebuild_similarity_index = lazy_function('src.skills.template_similarity', 'rebuild_similarity_index')
+
+# optimize_templates handling of near-duplicate templates
+DEDUPE_MODES = (None, 'skip', 'group')
+
+
+# Shared by every ContextEngine so the convenience functions hit the same caches
+_template_cache = None
+_template_renderer = None
+
+
+def get_template_cache():
+    """Get the process-wide template cache"""
+    global _template_cache
+    if _template_cache is None:
+        _template_cache = TemplateCache(
+            max_size=get_setting('templates', 'cache_size', 1024),
+            ttl=get_setting('templates', 'cache_ttl', 60.0)
+        )
+    return _template_cache
+
+
+def get_template_renderer():
+    """Get the process-wide template renderer"""
+    global _template_renderer
+    if _template_renderer is None:
+        _template_renderer = TemplateRenderer(max_size=get_setting('templates', 'cache_size', 1024))
+    return _template_renderer
+
+
+def template_etag(template):
+    """Compute an entity tag that changes whenever the template is updated"""
+    version = f"{template['id']}:{template['updated_at']}"
+    return hashlib.md5(version.encode()).hexdigest()
 
 
 class ContextEngine:
-    def __init__(self):
+    def __init__(self, cache=None, renderer=None):
         """Initialize the Context Engine module"""
-        pass
+        self.cache = cache or get_template_cache()
+        self.renderer = renderer or get_template_renderer()
 
     def create_template(self, name, description, content):
         """Create a new context template"""
@@ -24,57 +76,187 @@ class ContextEngine:
 
     def get_template(self, template_id):
         """Retrieve a specific template by ID"""
-        return manage_templates('get', template_id=template_id)
+        template = self.cache.get(template_id)
+        if template is None:
+            template = manage_templates('get', template_id=template_id)
+            if template is None:
+                return None
+            self.cache.set(template_id, template)
+        return dict(template)
 
-    def update_template(self, template_id, name=None, description=None, content=None):
+    def update_template(self, template_id, name=None, description=None, content=None, is_active=None):
         """Update an existing template"""
-        # Get current template data
-        current = self.get_template(template_id)
-        if not current:
-            raise ValueError(f"Template with ID {template_id} not found")
-
-        # Prepare updated data
+        # Empty values keep the current field, matching the previous behaviour
         template_data = {
-            'name': name or current['name'],
-            'description': description or current['description'],
-            'content': content or current['content']
+            'name': name or None,
+            'description': description or None,
+            'content': content or None,
+            'is_active': is_active
         }
 
-        return manage_templates('update', template_data, template_id)
+        result = manage_templates('update', template_data, template_id)
+        self.cache.invalidate(template_id)
+        if not result['success']:
+            raise ValueError(f"Template with ID {template_id} not found")
+        return result
 
     def delete_template(self, template_id):
         """Delete a template by ID"""
-        return manage_templates('delete', template_id=template_id)
+        result = manage_templates('delete', template_id=template_id)
+        self.cache.invalidate(template_id)
+        return result
 
     def list_templates(self):
         """List all templates"""
         return manage_templates('list')
 
+    def list_templates_page(self, after=None, limit=100, fields=None, is_active=None):
+        """List one page of templates after the given id, optionally projected and filtered"""
+        return skill_list_templates_page(after, limit, fields, is_active)
+
+    def iter_templates(self, fields=None, is_active=None):
+        """Stream templates one at a time, optionally projected and filtered"""
+        return skill_iter_templates(fields, is_active)
+
+    def search_templates(self, query, limit=None, offset=0):
+        """Full-text search over template names, descriptions and content, best matches first"""
+        return skill_search_templates(query, limit, offset)
+
+    def rebuild_search_index(self):
+        """Re-index every template for search"""
+        skill_rebuild_search_index()
+
+    def find_similar_templates(self, template_id, min_similarity=None, limit=None):
+        """Near-duplicates of a template by estimated content similarity, or None if it doesn't exist"""
+        return similar_templates(template_id, min_similarity, limit)
+
+    def rebuild_similarity_index(self):
+        """Recompute every template's MinHash signature, returning how many were indexed"""
+        return skill_rebuild_similarity_index()
+
+    def import_templates(self, stream, batch_size=None, progress=None):
+        """Bulk-import templates from a JSONL (optionally gzip) binary stream"""
+        return import_jsonl('templates', stream, batch_size, progress)
+
+    def export_templates(self, compress=False, page_size=None):
+        """Stream every template as JSONL bytes, optionally gzip-compressed"""
+        return export_jsonl('templates', compress, page_size)
+
+    def render_template(self, template_id, variables, strict=False):
+        """Render a template with variables, or return None if it doesn't exist"""
+        template = self.get_template(template_id)
+        if template is None:
+            return None
+        return self.renderer.render(template, variables, strict)
+
+    def render_template_batch(self, template_id, variable_sets, strict=False):
+        """Render a template against many variable sets, or return None if it doesn't exist"""
+        template = self.get_template(template_id)
+        if template is None:
+            return None
+        outputs, errors = self.renderer.render_batch(template, variable_sets, strict)
+        return {'outputs': outputs, 'errors': errors}
+
+    def list_template_versions(self, template_id):
+        """List a template's recorded versions, oldest first"""
+        return get_repository().list_versions(template_id)
+
+    def get_template_version(self, template_id, version):
+        """Get the content of one version, or None if it doesn't exist"""
+        content = get_repository().get_version(template_id, version)
+        if content is None:
+            return None
+        return {'template_id': template_id, 'version': version, 'content': content}
+
+    def diff_template_versions(self, template_id, from_version, to_version):
+        """Get a unified diff between two versions, or None if either doesn't exist"""
+        return diff_versions(template_id, from_version, to_version)
+
+    def rollback_template(self, template_id, version):
+        """Restore a version's content as the newest version, or return None if it doesn't exist"""
+        content = get_repository().get_version(template_id, version)
+        if content is None:
+            return None
+        self.update_template(template_id, content=content)
+        return {'success': True, 'version': get_repository().latest_version(template_id), 'restored_from': version}
+
     def run_ab_test(self, config, variant_a, variant_b):
         """Run an A/B test between two variants"""
         return run_ab_test(config, variant_a, variant_b)
 
-    def optimize_templates(self, template_ids=None, context=None):
-        """Optimize context templates"""
+    def get_ab_test(self, test_id):
+        """Get the current results of an A/B test from its running statistics"""
+        return get_ab_test_results(test_id)
+
+    def assign_variant(self, test_id, user_id):
+        """Get the sticky variant for a user in a running A/B test, without a DB hit"""
+        return assign_variant(test_id, user_id)
+
+    def recompute_ab_test(self, test_id):
+        """Rebuild an A/B test's statistics from the raw logs"""
+        return recompute_ab_test(test_id)
+
+    def optimize_templates(self, template_ids=None, context=None, max_workers=None, timeout=None, backend=None,
+                           dedupe=None):
+        """Optimize context templates
+
+        Templates are fetched in bulk and optimized concurrently on up to
+        max_workers threads. Items that fail or exceed timeout seconds are
+        returned with an 'error' instead of an 'optimization_result'.
+
+        With dedupe, near-duplicate templates are optimized once, through
+        the first of each group: 'skip' returns the others as skipped,
+        'group' gives them the first one's result. Either way they carry
+        'duplicate_of'.
+        """
+        if dedupe not in DEDUPE_MODES:
+            raise ValueError(f"Unknown dedupe mode: {dedupe}")
+        if max_workers is None:
+            max_workers = get_setting('optimizer', 'concurrency', 8)
+        if timeout is None:
+            timeout = get_setting('optimizer', 'item_timeout')
+
         if template_ids is None:
             # If no specific templates provided, optimize all active templates
-            all_templates = self.list_templates()
-            template_ids = [tmpl['id'] for tmpl in all_templates if tmpl['is_active']]
-        
-        optimization_results = []
-        for template_id in template_ids:
-            template = self.get_template(template_id)
-            if template:
-                # Use the template content for optimization
-                result = skill_generate_optimization(
-                    original_prompt=template['content'],
-                    context=context
-                )
-                optimization_results.append({
-                    'template_id': template_id,
+            templates = list(self.iter_templates(fields=['content'], is_active=True))
+        else:
+            found = get_templates_bulk(list(template_ids), fields=['content'])
+            templates = [found[template_id] for template_id in template_ids if template_id in found]
+
+        def optimize(template):
+            # Use the template content for optimization
+            return skill_generate_optimization(
+                original_prompt=template['content'],
+                context=context,
+                backend=backend
+            )
+
+        representatives = group_near_duplicates([template['id'] for template in templates]) if dedupe else {}
+        unique = [template for template in templates if representatives.get(template['id'], template['id']) == template['id']]
+
+        outcomes = {}
+        for template, (result, error) in zip(unique, run_batch(optimize, unique, max_workers=max_workers, timeout=timeout)):
+            if error is None:
+                outcomes[template['id']] = {
+                    'template_id': template['id'],
                     'optimization_result': result
-                })
-        
+                }
+            else:
+                outcomes[template['id']] = {
+                    'template_id': template['id'],
+                    'error': str(error) or type(error).__name__
+                }
+
+        optimization_results = []
+        for template in templates:
+            representative = representatives.get(template['id'], template['id'])
+            if representative == template['id']:
+                optimization_results.append(outcomes[template['id']])
+            elif dedupe == 'skip':
+                optimization_results.append({'template_id': template['id'], 'skipped': True, 'duplicate_of': representative})
+            else:
+                optimization_results.append(dict(outcomes[representative], template_id=template['id'], duplicate_of=representative))
+
         return optimization_results
 
 
@@ -89,9 +271,9 @@ def get_template(template_id):
     return engine.get_template(template_id)
 
 
-def update_template(template_id, name=None, description=None, content=None):
+def update_template(template_id, name=None, description=None, content=None, is_active=None):
     engine = ContextEngine()
-    return engine.update_template(template_id, name, description, content)
+    return engine.update_template(template_id, name, description, content, is_active)
 
 
 def delete_template(template_id):
@@ -104,11 +286,81 @@ def list_templates():
     return engine.list_templates()
 
 
+def list_templates_page(after=None, limit=100, fields=None, is_active=None):
+    engine = ContextEngine()
+    return engine.list_templates_page(after, limit, fields, is_active)
+
+
+def iter_templates(fields=None, is_active=None):
+    engine = ContextEngine()
+    return engine.iter_templates(fields, is_active)
+
+
+def search_templates(query, limit=None, offset=0):
+    engine = ContextEngine()
+    return engine.search_templates(query, limit, offset)
+
+
+def import_templates(stream, batch_size=None, progress=None):
+    engine = ContextEngine()
+    return engine.import_templates(stream, batch_size, progress)
+
+
+def export_templates(compress=False, page_size=None):
+    engine = ContextEngine()
+    return engine.export_templates(compress, page_size)
+
+
+def render_template(template_id, variables, strict=False):
+    engine = ContextEngine()
+    return engine.render_template(template_id, variables, strict)
+
+
+def render_template_batch(template_id, variable_sets, strict=False):
+    engine = ContextEngine()
+    return engine.render_template_batch(template_id, variable_sets, strict)
+
+
+def list_template_versions(template_id):
+    engine = ContextEngine()
+    return engine.list_template_versions(template_id)
+
+
+def get_template_version(template_id, version):
+    engine = ContextEngine()
+    return engine.get_template_version(template_id, version)
+
+
+def diff_template_versions(template_id, from_version, to_version):
+    engine = ContextEngine()
+    return engine.diff_template_versions(template_id, from_version, to_version)
+
+
+def rollback_template(template_id, version):
+    engine = ContextEngine()
+    return engine.rollback_template(template_id, version)
+
+
 def execute_ab_test(config, variant_a, variant_b):
     engine = ContextEngine()
     return engine.run_ab_test(config, variant_a, variant_b)
 
 
-def optimize_templates(template_ids=None, context=None):
+def get_ab_test(test_id):
+    engine = ContextEngine()
+    return engine.get_ab_test(test_id)
+
+
+def assign_ab_test_variant(test_id, user_id):
+    engine = ContextEngine()
+    return engine.assign_variant(test_id, user_id)
+
+
+def optimize_templates(template_ids=None, context=None, max_workers=None, timeout=None, dedupe=None):
+    engine = ContextEngine()
+    return engine.optimize_templates(template_ids, context, max_workers, timeout, dedupe=dedupe)
+
+
+def find_similar_templates(template_id, min_similarity=None, limit=None):
     engine = ContextEngine()
-    return engine.optimize_templates(template_ids, context)
\ No newline at end of file
+    return engine.find_similar_templates(template_id, min_similarity, limit)
\ No newline at end of file
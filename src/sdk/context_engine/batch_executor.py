@@ -0,0 +1,150 @@
+"""
+Batch Executor
+Runs a function over many items on a shared, bounded thread pool with per-item timeouts
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src import profiling
+
+# One pool for every batch, so worker threads and the SQLite connections they
+# open are reused across calls; it is replaced when too few threads are free
+_executor = None
+_executor_size = 0
+# Futures of timed-out items still holding a thread of the current pool
+_abandoned = set()
+_executor_lock = threading.Lock()
+
+
+class ItemTimeoutError(TimeoutError):
+    """Raised in place of a result when an item exceeds its time budget"""
+
+
+class ItemNotStartedError(RuntimeError):
+    """Raised in place of a result when an item never ran because every worker was held by timed-out items"""
+
+
+def get_executor(workers):
+    """Get the shared pool, replacing it if fewer than workers threads are not held by timed-out items"""
+    global _executor, _executor_size, _abandoned
+    with _executor_lock:
+        if _executor is None or _executor_size - len(_abandoned) < workers:
+            if _executor is not None:
+                # Threads still running timed-out items exit once those finish
+                _executor.shutdown(wait=False)
+            _executor_size = max(workers, _executor_size)
+            _executor = ThreadPoolExecutor(max_workers=_executor_size, thread_name_prefix='batch')
+            _abandoned = set()
+        return _executor
+
+
+def _abandon(executor, futures):
+    # Count the threads timed-out items hold until they finish
+    with _executor_lock:
+        if executor is not _executor:
+            return
+        _abandoned.update(futures)
+    # Outside the lock: a future that has finished meanwhile runs the callback at once
+    for future in futures:
+        future.add_done_callback(_release)
+
+
+def _release(future):
+    with _executor_lock:
+        _abandoned.discard(future)
+
+
+def shutdown(wait=True):
+    """Stop the shared pool, by default after every item it runs has finished, including timed-out ones"""
+    global _executor, _executor_size, _abandoned
+    with _executor_lock:
+        executor, _executor, _executor_size, _abandoned = _executor, None, 0, set()
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def _after_fork_in_child():
+    # The pool's threads do not exist in a forked child
+    global _executor, _executor_size, _abandoned, _executor_lock
+    _executor, _executor_size, _abandoned = None, 0, set()
+    _executor_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def run_batch(func, items, max_workers=8, timeout=None):
+    """Apply func to every item concurrently
+
+    Returns a list of (result, error) pairs in input order; exactly one of
+    the two is None. At most max_workers items run at once on the shared
+    pool. An item that runs longer than timeout seconds is reported as
+    ItemTimeoutError and no longer waited for, but keeps its worker until
+    it finishes. Once every worker is held by such items, the items not
+    started yet are reported as ItemNotStartedError.
+    """
+    items = list(items)
+    # Worker threads join the caller's profile session, if a request is being profiled
+    func = profiling.propagate(func)
+    if timeout is None and (max_workers <= 1 or len(items) <= 1):
+        return [_call(func, item) for item in items]
+
+    outcomes = [None] * len(items)
+    started = {}
+    started_lock = threading.Lock()
+
+    def run(index):
+        with started_lock:
+            started[index] = time.monotonic()
+        return func(items[index])
+
+    workers = max(1, min(max_workers, len(items)))
+    executor = get_executor(workers)
+    futures, pending, abandoned = {}, set(), set()
+    next_index = 0
+    while next_index < len(items) or pending:
+        # Items are handed to the pool as this batch's workers free up
+        abandoned = {f for f in abandoned if not f.done()}
+        while next_index < len(items) and len(pending) + len(abandoned) < workers:
+            future = executor.submit(run, next_index)
+            futures[future] = next_index
+            pending.add(future)
+            next_index += 1
+        if not pending:
+            # Every worker is held by an item that exceeded its time
+            for index in range(next_index, len(items)):
+                outcomes[index] = (None, ItemNotStartedError(
+                    f"Item not started: every worker was held by items that exceeded {timeout}s"))
+            break
+
+        wait_for = None
+        if timeout is not None:
+            with started_lock:
+                starts = [started[futures[f]] for f in pending if futures[f] in started]
+            wait_for = max(0.0, min(starts) + timeout - time.monotonic()) if starts else timeout
+        done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            error = future.exception()
+            outcomes[futures[future]] = (None, error) if error else (future.result(), None)
+
+        if timeout is not None:
+            now = time.monotonic()
+            with started_lock:
+                expired = {f for f in pending if now - started.get(futures[f], now) >= timeout}
+            for future in expired:
+                outcomes[futures[future]] = (None, ItemTimeoutError(f"Item exceeded {timeout}s"))
+            pending -= expired
+            abandoned |= expired
+            _abandon(executor, expired)
+    return outcomes
+
+
+def _call(func, item):
+    try:
+        return func(item), None
+    except Exception as e:
+        return None, e
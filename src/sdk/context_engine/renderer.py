@@ -0,0 +1,117 @@
+"""
+Template Renderer
+Compiles {placeholder} templates once and renders them against variable sets
+"""
+
+import string
+from src.sdk.context_engine.template_cache import TemplateCache
+
+
+_formatter = string.Formatter()
+
+
+class TemplateRenderError(ValueError):
+    """Raised when a template cannot be compiled or its variables are invalid"""
+
+
+class CompiledTemplate:
+    """Template content pre-split into literal text and placeholder fields"""
+
+    __slots__ = ('parts', 'variables')
+
+    def __init__(self, content):
+        """Parse content once using str.format placeholder syntax"""
+        parts = []
+        variables = []
+        try:
+            for literal, field_name, conversion, format_spec in _formatter.parse(content):
+                if field_name is None:
+                    parts.append((literal, None, None, None, None))
+                    continue
+                name = field_name.split('.', 1)[0].split('[', 1)[0]
+                if not name or name.isdigit():
+                    raise TemplateRenderError("Positional placeholders are not supported; use {name}")
+                if format_spec and '{' in format_spec:
+                    raise TemplateRenderError(f"Nested placeholders in '{{{field_name}:{format_spec}}}' are not supported")
+                # Plain {name} fields skip the formatter entirely when rendering
+                plain = field_name == name and not conversion and not format_spec
+                parts.append((literal, name, None if plain else field_name, conversion, format_spec))
+                if name not in variables:
+                    variables.append(name)
+        except ValueError as e:
+            if isinstance(e, TemplateRenderError):
+                raise
+            raise TemplateRenderError(f"Invalid template syntax: {e}") from None
+        self.parts = tuple(parts)
+        self.variables = tuple(variables)
+
+    def validate(self, variables, strict=False):
+        """Check that every placeholder has a value and, if strict, that no extras were given"""
+        if not isinstance(variables, dict):
+            raise TemplateRenderError("Variables must be an object mapping names to values")
+        missing = [name for name in self.variables if name not in variables]
+        if missing:
+            raise TemplateRenderError(f"Missing variables: {', '.join(missing)}")
+        if strict:
+            unknown = [name for name in variables if name not in self.variables]
+            if unknown:
+                raise TemplateRenderError(f"Unknown variables: {', '.join(unknown)}")
+
+    def render(self, variables, strict=False):
+        """Render the template with a mapping of variable values"""
+        self.validate(variables, strict)
+        chunks = []
+        for literal, name, field_name, conversion, format_spec in self.parts:
+            chunks.append(literal)
+            if name is None:
+                continue
+            if field_name is None:
+                chunks.append(str(variables[name]))
+                continue
+            try:
+                value, _ = _formatter.get_field(field_name, (), variables)
+                value = _formatter.convert_field(value, conversion)
+                chunks.append(format(value, format_spec or ''))
+            except (AttributeError, IndexError, KeyError, TypeError, ValueError) as e:
+                raise TemplateRenderError(f"Cannot render '{{{field_name}}}': {e}") from None
+        return ''.join(chunks)
+
+
+class TemplateRenderer:
+    def __init__(self, max_size=1024):
+        """Create a renderer caching up to max_size compiled templates"""
+        # Keyed by (id, updated_at), so an edited template never hits a stale entry
+        self._compiled = TemplateCache(max_size=max_size, ttl=float('inf'))
+
+    def compile(self, template):
+        """Get the compiled form of a template dict, compiling it on first use"""
+        key = (template['id'], template['updated_at'])
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = CompiledTemplate(template['content'])
+            self._compiled.set(key, compiled)
+        return compiled
+
+    def stats(self):
+        """Get size and hit/miss counters of the compiled template cache"""
+        return self._compiled.stats()
+
+    def render(self, template, variables, strict=False):
+        """Render a template dict with one set of variables"""
+        return self.compile(template).render(variables, strict)
+
+    def render_batch(self, template, variable_sets, strict=False):
+        """Render a template dict against many variable sets
+
+        Returns (outputs, errors): outputs[i] is None where rendering failed,
+        and errors lists {'index', 'error'} for each failure.
+        """
+        compiled = self.compile(template)
+        outputs, errors = [], []
+        for index, variables in enumerate(variable_sets):
+            try:
+                outputs.append(compiled.render(variables, strict))
+            except TemplateRenderError as e:
+                outputs.append(None)
+                errors.append({'index': index, 'error': str(e)})
+        return outputs, errors
@@ -4,8 +4,22 @@ Provides prompt optimization and user feedback collection capabilities
 """
 
 from src.skills.generate_optimization import generate_optimization as skill_generate_optimization
-from src.skills.collect_votes import collect_votes as skill_collect_votes
-import sqlite3
+from src.skills.optimization_cache import get_optimization_cache
+from src.skills.analytics_summary import read_summary, rebuild_summary
+from src.lazy import lazy_function
+
+# Feedback and evaluation ingestion are imported on first use
+skill_collect_votes = lazy_function('src.skills.collect_votes', 'collect_votes')
+skill_collect_votes_batch = lazy_function('src.skills.collect_votes', 'collect_votes_batch')
+skill_flush_votes = lazy_function('src.skills.collect_votes', 'flush_votes')
+skill_import_jsonl = lazy_function('src.skills.bulk_transfer', 'import_jsonl')
+skill_export_jsonl = lazy_function('src.skills.bulk_transfer', 'export_jsonl')
+skill_top_prompts = lazy_function('src.skills.prompt_scores', 'top_prompts')
+skill_get_prompt_score = lazy_function('src.skills.prompt_scores', 'get_prompt_score')
+skill_rebuild_prompt_scores = lazy_function('src.skills.prompt_scores', 'rebuild_prompt_scores')
+skill_log_evaluations = lazy_function('src.skills.log_evaluations', 'log_evaluations')
+skill_get_evaluation_metrics = lazy_function('src.skills.log_evaluations', 'get_evaluation_metrics')
+skill_query_evaluations = lazy_function('src.skills.log_evaluations', 'query_evaluations')
 
 
 class SmartRewriter:
@@ -17,46 +31,68 @@ class SmartRewriter:
         """Generate an optimized version of a prompt"""
         return skill_generate_optimization(original_prompt, context, performance_data)
 
+    def get_optimization_cache_stats(self):
+        """Get hit/miss statistics for memoized optimizations"""
+        cache = get_optimization_cache()
+        return cache.stats() if cache is not None else {'enabled': False}
+
     def collect_votes(self, prompt_id, user_id, score, comment=""):
         """Collect user feedback and votes on prompt quality"""
         return skill_collect_votes(prompt_id, user_id, score, comment)
 
+    def collect_votes_batch(self, votes, idempotency_key=None):
+        """Collect many votes in one transaction, deduplicated by idempotency key"""
+        return skill_collect_votes_batch(votes, idempotency_key)
+
+    def flush_votes(self):
+        """Write any votes still queued by buffered ingestion"""
+        return skill_flush_votes()
+
+    def import_votes(self, stream, batch_size=None, progress=None):
+        """Bulk-import votes from a JSONL (optionally gzip) binary stream, skipping known ids"""
+        return skill_import_jsonl('votes', stream, batch_size, progress)
+
+    def export_votes(self, compress=False, page_size=None):
+        """Stream every vote as JSONL bytes, optionally gzip-compressed"""
+        return skill_export_jsonl('votes', compress, page_size)
+
+    def top_prompts(self, k=None, min_votes=None, by='bayesian'):
+        """Best-rated prompts by Bayesian or Wilson score, from the per-prompt vote aggregates"""
+        return skill_top_prompts(k, min_votes, by)
+
+    def get_prompt_score(self, prompt_id):
+        """A prompt's vote count, mean, spread and scores, or None if it has no votes"""
+        return skill_get_prompt_score(prompt_id)
+
+    def rebuild_prompt_scores(self):
+        """Recompute the per-prompt vote aggregates from the stored votes"""
+        return skill_rebuild_prompt_scores()
+
+    def log_evaluations(self, logs):
+        """Bulk-append evaluation logs, indexing their numeric metrics"""
+        return skill_log_evaluations(logs)
+
+    def get_evaluation_metrics(self, version_id=None, metric=None):
+        """Aggregate evaluation metrics per version"""
+        return skill_get_evaluation_metrics(version_id, metric)
+
+    def query_evaluations(self, metric, version_id=None, min_value=None, max_value=None, limit=100):
+        """Find evaluation logs by metric value"""
+        return skill_query_evaluations(metric, version_id, min_value, max_value, limit)
+
     def get_analytics(self):
         """Get optimization analytics and performance metrics"""
-        conn = sqlite3.connect('promptops.db')
-        cursor = conn.cursor()
-        
-        # Get statistics about optimized prompts
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_optimizations,
-                AVG(improvement_score) as avg_improvement,
-                MAX(improvement_score) as max_improvement,
-                MIN(improvement_score) as min_improvement
-            FROM optimized_prompts
-        """)
-        optimization_stats = cursor.fetchone()
-        
-        # Get vote statistics
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_votes,
-                AVG(score) as avg_score,
-                MAX(score) as max_score,
-                MIN(score) as min_score
-            FROM user_votes
-        """)
-        vote_stats = cursor.fetchone()
-        
-        # Get prompt statistics
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_prompts
-            FROM prompts
-        """)
-        prompt_stats = cursor.fetchone()
-        
-        conn.close()
+        # Read the incrementally maintained summary instead of scanning tables
+        summary = read_summary()
+
+        def stats(metric):
+            count, total, min_value, max_value = summary.get(metric, (0, 0, None, None))
+            average = total / count if count else None
+            return count, average, max_value, min_value
+
+        optimization_stats = stats('optimizations')
+        vote_stats = stats('votes')
+        prompt_stats = stats('prompts')
         
         analytics = {
             'optimization_metrics': {
@@ -78,6 +114,11 @@ class SmartRewriter:
         
         return analytics
 
+    def rebuild_analytics(self):
+        """Recompute the analytics summary from the source tables"""
+        rebuild_summary()
+        return self.get_analytics()
+
 
 # Convenience functions
 def generate_optimization(original_prompt, context=None, performance_data=None):
@@ -85,11 +126,66 @@ def generate_optimization(original_prompt, context=None, performance_data=None):
     return rewriter.generate_optimization(original_prompt, context, performance_data)
 
 
+def get_optimization_cache_stats():
+    rewriter = SmartRewriter()
+    return rewriter.get_optimization_cache_stats()
+
+
 def collect_votes(prompt_id, user_id, score, comment=""):
     rewriter = SmartRewriter()
     return rewriter.collect_votes(prompt_id, user_id, score, comment)
 
 
+def collect_votes_batch(votes, idempotency_key=None):
+    rewriter = SmartRewriter()
+    return rewriter.collect_votes_batch(votes, idempotency_key)
+
+
+def flush_votes():
+    rewriter = SmartRewriter()
+    return rewriter.flush_votes()
+
+
+def import_votes(stream, batch_size=None, progress=None):
+    rewriter = SmartRewriter()
+    return rewriter.import_votes(stream, batch_size, progress)
+
+
+def export_votes(compress=False, page_size=None):
+    rewriter = SmartRewriter()
+    return rewriter.export_votes(compress, page_size)
+
+
+def top_prompts(k=None, min_votes=None, by='bayesian'):
+    rewriter = SmartRewriter()
+    return rewriter.top_prompts(k, min_votes, by)
+
+
+def get_prompt_score(prompt_id):
+    rewriter = SmartRewriter()
+    return rewriter.get_prompt_score(prompt_id)
+
+
+def log_evaluations(logs):
+    rewriter = SmartRewriter()
+    return rewriter.log_evaluations(logs)
+
+
+def get_evaluation_metrics(version_id=None, metric=None):
+    rewriter = SmartRewriter()
+    return rewriter.get_evaluation_metrics(version_id, metric)
+
+
+def query_evaluations(metric, version_id=None, min_value=None, max_value=None, limit=100):
+    rewriter = SmartRewriter()
+    return rewriter.query_evaluations(metric, version_id, min_value, max_value, limit)
+
+
 def get_analytics():
     rewriter = SmartRewriter()
-    return rewriter.get_analytics()
\ No newline at end of file
+    return rewriter.get_analytics()
+
+
+def rebuild_analytics():
+    rewriter = SmartRewriter()
+    return rewriter.rebuild_analytics()
\ No newline at end of file
@@ -0,0 +1,44 @@
+import math
+
+
+def merge_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    """Combine two (count, mean, M2) accumulators (Chan et al. parallel update)"""
+    n = n_a + n_b
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+    return n, mean, m2
+
+
+def batch_moments(values):
+    """Compute (count, mean, M2) for a batch of values"""
+    n = len(values)
+    if n == 0:
+        return 0, 0.0, 0.0
+    mean = sum(values) / n
+    m2 = sum((value - mean) ** 2 for value in values)
+    return n, mean, m2
+
+
+def variance(n, m2):
+    """Unbiased sample variance from an accumulator"""
+    return m2 / (n - 1) if n > 1 else 0.0
+
+
+def msprt_p_value(n_a, mean_a, m2_a, n_b, mean_b, m2_b, tau=1.0, min_variance=1e-6):
+    """Always-valid p-value of the mixture SPRT for a difference in means
+
+    Uses a normal mixing distribution N(0, tau^2) over the effect size and
+    plug-in sample variances. Returns 1.0 until each arm has two samples.
+    """
+    if n_a < 2 or n_b < 2:
+        return 1.0
+    v = max(variance(n_a, m2_a) / n_a + variance(n_b, m2_b) / n_b, min_variance)
+    tau2 = tau * tau
+    delta = mean_b - mean_a
+    log_likelihood_ratio = 0.5 * math.log(v / (v + tau2)) + tau2 * delta * delta / (2 * v * (v + tau2))
+    if log_likelihood_ratio <= 0:
+        return 1.0
+    return math.exp(-log_likelihood_ratio) if log_likelihood_ratio < 700 else 0.0
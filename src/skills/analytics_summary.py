@@ -0,0 +1,46 @@
+from src.metrics import timed_skill
+from src.repositories import get_repository
+from src.writer import write_operation
+
+# Summary rows and the table/column each one aggregates
+SUMMARY_SOURCES = {
+    'optimizations': ('optimized_prompts', 'improvement_score'),
+    'votes': ('user_votes', 'score'),
+    'prompts': ('prompts', None),
+}
+
+
+def record_values(conn, metric, values):
+    """Fold newly written values into a SQLite summary row inside the caller's transaction"""
+    if not values:
+        return
+    low, high = min(values), max(values)
+    conn.execute("""
+        INSERT INTO analytics_summary (metric, count, total, min_value, max_value)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (metric) DO UPDATE SET
+            count = count + excluded.count,
+            total = total + excluded.total,
+            min_value = MIN(COALESCE(min_value, excluded.min_value), excluded.min_value),
+            max_value = MAX(COALESCE(max_value, excluded.max_value), excluded.max_value)
+    """, (metric, len(values), sum(values), low, high))
+
+
+@timed_skill('analytics_summary.read_summary')
+def read_summary():
+    """Read every summary row as {metric: (count, total, min, max)}"""
+    return get_repository().read_summary()
+
+
+@timed_skill('analytics_summary.rebuild_summary')
+@write_operation('analytics_summary.rebuild_summary')
+def rebuild_summary():
+    """Recompute all summary rows from the source tables"""
+    get_repository().rebuild_summary()
+    return read_summary()
+
+
+def ensure_summary():
+    """Build the summary once for databases created before it existed"""
+    if get_repository().summary_missing():
+        rebuild_summary()
@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import threading
+import time
+
+from src.config import get_setting
+from src.repositories import get_repository
+from src.metrics import timed_skill
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = 10000
+
+# Test config keys giving percentages of users, and their defaults
+TRAFFIC_SETTINGS = {'traffic_percentage': 100, 'traffic_split': 50}
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def traffic_buckets(config):
+    """(traffic, split) bucket thresholds for a test config; raises ValueError unless both are 0-100"""
+    thresholds = []
+    for key, default in TRAFFIC_SETTINGS.items():
+        value = config.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100:
+            raise ValueError(f"A/B test {key} must be a number from 0 to 100, got {value!r}")
+        thresholds.append(int(value * BUCKETS / 100))
+    return tuple(thresholds)
+
+
+class AssignmentSnapshot:
+    """In-memory view of running A/B tests for hash-based sticky bucketing
+
+    The snapshot is reloaded when invalidated in this process or after
+    refresh_interval seconds, so assignments in between never touch the DB.
+    """
+
+    def __init__(self, refresh_interval=1.0):
+        self.refresh_interval = refresh_interval
+        self._tests = {}
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Force a reload on the next assignment"""
+        self._expires_at = 0.0
+
+    def refresh(self):
+        """Reload running tests and their traffic allocation"""
+        tests = {}
+        for test_id, variant_a_id, variant_b_id, config in get_repository().running_ab_tests():
+            # A malformed test stored before validation existed is left out rather than breaking every test
+            try:
+                tests[test_id] = (variant_a_id, variant_b_id, *traffic_buckets(config))
+            except (AttributeError, ValueError) as e:
+                logger.warning("Skipping A/B test %s in the assignment snapshot: %s", test_id, e)
+        self._tests = tests
+        self._expires_at = time.monotonic() + self.refresh_interval
+
+    def get(self, test_id):
+        """Get (variant_a_id, variant_b_id, traffic, split) for a running test"""
+        if time.monotonic() >= self._expires_at:
+            # One thread reloads; the others keep using the current snapshot
+            if self._lock.acquire(blocking=not self._tests):
+                try:
+                    if time.monotonic() >= self._expires_at:
+                        self.refresh()
+                finally:
+                    self._lock.release()
+        return self._tests.get(test_id)
+
+
+def get_snapshot():
+    """Get the process-wide assignment snapshot"""
+    global _snapshot
+    if _snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                _snapshot = AssignmentSnapshot(get_setting('ab_testing', 'snapshot_refresh_interval', 1.0))
+    return _snapshot
+
+
+def invalidate_snapshot():
+    """Reload running tests on the next assignment in this process"""
+    if _snapshot is not None:
+        _snapshot.invalidate()
+
+
+@timed_skill('assign_variant')
+def assign_variant(test_id, user_id):
+    test = get_snapshot().get(test_id)
+    if test is None:
+        return None
+    variant_a_id, variant_b_id, traffic, split = test
+
+    # Independent halves of one digest decide enrollment and arm
+    digest = hashlib.blake2b(f"{test_id}:{user_id}".encode(), digest_size=8).digest()
+    if int.from_bytes(digest[:4], 'big') % BUCKETS >= traffic:
+        return {'test_id': test_id, 'user_id': user_id, 'variant': None, 'variant_id': None}
+    if int.from_bytes(digest[4:], 'big') % BUCKETS < split:
+        return {'test_id': test_id, 'user_id': user_id, 'variant': 'variant_b', 'variant_id': variant_b_id}
+    return {'test_id': test_id, 'user_id': user_id, 'variant': 'variant_a', 'variant_id': variant_a_id}
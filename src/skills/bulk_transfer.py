@@ -0,0 +1,184 @@
+from datetime import datetime
+import json
+import uuid
+import zlib
+
+from src.config import get_setting
+from src.metrics import timed_skill
+from src.repositories import TEMPLATE_FIELDS, VOTE_FIELDS, get_repository
+from src.skills.collect_votes import _vote_row, insert_votes
+from src.skills.manage_templates import insert_templates
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Bytes read from an import stream, and JSONL buffered per exported chunk
+CHUNK_SIZE = 1 << 16
+
+
+def _text(value, field):
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value
+
+
+def _template_record(data):
+    created_at = data.get('created_at') or datetime.now()
+    return {
+        'id': data.get('id') or str(uuid.uuid4()),
+        'name': _text(data['name'], 'name'),
+        'description': _text(data.get('description') or '', 'description'),
+        'content': _text(data['content'], 'content'),
+        'created_at': created_at,
+        'updated_at': data.get('updated_at') or created_at,
+        'is_active': bool(data.get('is_active', True))
+    }
+
+
+def _vote_record(data):
+    row = _vote_row(data['prompt_id'], data['user_id'], data['score'], data.get('comment', ''), data.get('id'))
+    if data.get('timestamp'):
+        row = row[:5] + (data['timestamp'],)
+    return row
+
+
+def _select_templates(after, limit):
+    return get_repository().select_templates(TEMPLATE_FIELDS, after=after, limit=limit)
+
+
+def _select_votes(after, limit):
+    return (dict(zip(VOTE_FIELDS, row)) for row in get_repository().select_votes(after, limit))
+
+
+# kind -> (record parser, batch insert returning how many were new, row selector)
+KINDS = {
+    'templates': (_template_record, insert_templates, _select_templates),
+    'votes': (_vote_record, lambda rows: insert_votes(rows, deduplicate=True), _select_votes),
+}
+
+
+def _kind(kind):
+    if kind not in KINDS:
+        raise ValueError(f"Unknown bulk transfer kind: {kind}")
+    return KINDS[kind]
+
+
+def iter_lines(stream, chunk_size=CHUNK_SIZE):
+    """Yield the lines of a binary stream, gunzipping it if it starts with the gzip magic"""
+    head = b''
+    while len(head) < 2:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        head += chunk
+    decompressor = zlib.decompressobj(31) if head[:2] == GZIP_MAGIC else None
+
+    pending, chunk = b'', head
+    while chunk:
+        if decompressor is not None:
+            data = decompressor.decompress(chunk)
+            # Concatenated gzip members, as produced by appending exports
+            while decompressor.eof and decompressor.unused_data:
+                rest = decompressor.unused_data
+                decompressor = zlib.decompressobj(31)
+                data += decompressor.decompress(rest)
+        else:
+            data = chunk
+        lines = (pending + data).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+        chunk = stream.read(chunk_size)
+    if decompressor is not None:
+        pending += decompressor.flush()
+    if pending:
+        yield pending
+
+
+@timed_skill('bulk_transfer.import_jsonl')
+def import_jsonl(kind, stream, batch_size=None, progress=None):
+    """Import templates or votes from a JSONL (optionally gzip) binary stream
+
+    Records are parsed lazily and inserted batch_size at a time, each batch
+    in one transaction with executemany. Records whose id is already stored
+    are skipped, so an interrupted import can be rerun. progress is called
+    with the running totals after every batch. An invalid record raises
+    ValueError; batches before it stay committed.
+    """
+    parse, insert, _ = _kind(kind)
+    batch_size = batch_size or get_setting('bulk', 'batch_size', 5000)
+    stats = {'kind': kind, 'read': 0, 'imported': 0, 'skipped': 0, 'batches': 0}
+
+    def flush(batch):
+        inserted = insert(batch)
+        stats['batches'] += 1
+        stats['imported'] += inserted
+        stats['skipped'] += len(batch) - inserted
+        if progress is not None:
+            progress(dict(stats))
+
+    batch = []
+    for line_number, line in enumerate(iter_lines(stream), 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+            batch.append(parse(record))
+        except KeyError as e:
+            raise ValueError(f"Invalid {kind[:-1]} on line {line_number}: missing {e}; "
+                             f"{stats['imported']} imported before it") from None
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid {kind[:-1]} on line {line_number}: {e}; "
+                             f"{stats['imported']} imported before it") from None
+        stats['read'] += 1
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return stats
+
+
+@timed_skill('bulk_transfer.export_jsonl')
+def export_jsonl(kind, compress=False, page_size=None):
+    """Stream every template or vote as JSONL bytes, gzip-compressed if requested
+
+    Rows are read from one streaming cursor by default. With page_size they
+    are read in keyset pages instead, so no cursor stays open between
+    chunks (for consumers that resume the generator on other threads).
+    """
+    _, _, select = _kind(kind)
+    return _export(select, compress, page_size)
+
+
+def _records(select, page_size):
+    if not page_size:
+        yield from select(None, None)
+        return
+    after = None
+    while True:
+        page = list(select(after, page_size))
+        yield from page
+        if len(page) < page_size:
+            return
+        after = page[-1]['id']
+
+
+def _export(select, compress, page_size):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer, size = [], 0
+    for record in _records(select, page_size):
+        line = (json.dumps(record, default=str) + '\n').encode()
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            chunk = b''.join(buffer)
+            buffer, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    chunk = b''.join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
@@ -1,25 +1,222 @@
-import sqlite3
 from datetime import datetime
+import atexit
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
 import uuid
 
+from src.config import get_setting
+from src.metrics import timed_skill
+from src.repositories import get_repository
+from src.writer import WriterUnavailableError, write_operation
+from src.skills.run_ab_test import record_observations
+
+logger = logging.getLogger(__name__)
+
+# Namespace for deterministic vote ids derived from an idempotency key
+VOTE_ID_NAMESPACE = uuid.UUID('6f1c1e34-8d5a-4c8e-9a57-3f0b8e2d7c41')
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+class IdempotencyConflictError(ValueError):
+    """Raised when an idempotency key is reused for a different batch of votes"""
+
+
+def _vote_row(prompt_id, user_id, score, comment="", vote_id=None):
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 1 <= score <= 5:
+        raise ValueError(f"Vote score must be between 1 and 5, got {score!r}")
+    return (vote_id or str(uuid.uuid4()), prompt_id, user_id, score, comment, datetime.now())
+
+
+def _fingerprint(rows):
+    """Hash of a batch's votes, ignoring the generated ids and timestamps"""
+    votes = [(row[1], row[2], float(row[3]), row[4]) for row in rows]
+    return hashlib.sha256(json.dumps(votes, default=str).encode()).hexdigest()
+
+
+def _transient(error):
+    """Whether a failed write may succeed if retried later (lock contention, writer restart)"""
+    if isinstance(error, WriterUnavailableError):
+        return True
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in str(error) or 'busy' in str(error))
+
+
+@timed_skill('collect_votes.insert_votes')
+@write_operation('collect_votes.insert_votes')
+def insert_votes(rows, deduplicate=False, idempotency_key=None, fingerprint=None):
+    """Insert vote rows in one transaction, returning how many were new
+
+    With deduplicate, rows whose id is already stored are skipped; this is
+    how idempotent batches avoid double counting on retry. An idempotency
+    key is claimed with the batch's fingerprint in the same transaction,
+    and IdempotencyConflictError is raised if it was used for another batch.
+    """
+    repository = get_repository()
+    with repository.transaction():
+        if idempotency_key and repository.claim_idempotency_key(idempotency_key, fingerprint) != fingerprint:
+            raise IdempotencyConflictError(f"Idempotency key {idempotency_key!r} was already used for a different request")
+        rows = repository.add_votes(rows, deduplicate)
+        record_observations('votes', [(row[1], row[3]) for row in rows])
+    return len(rows)
+
+
+class VoteBuffer:
+    """Write-behind queue that group-commits votes on a size or time threshold"""
+
+    def __init__(self, batch_size=500, flush_interval=0.5):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self.dropped = 0
+
+    def add(self, row):
+        """Queue a vote row for the next group commit"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='vote-buffer', daemon=True)
+                self._thread.start()
+            self._queue.append(row)
+            if len(self._queue) >= self.batch_size:
+                self._wakeup.set()
+
+    def flush(self):
+        """Write all queued votes now, returning how many were written
+
+        A batch that fails on lock contention or an unreachable writer is
+        put back for the next flush. Any other failure means some row can
+        never be written, so the batch is retried row by row and the rows
+        that still fail are logged as dead letters and dropped.
+        """
+        with self._lock:
+            rows, self._queue = self._queue, []
+        if not rows:
+            return 0
+        try:
+            insert_votes(rows)
+            return len(rows)
+        except Exception as e:
+            if _transient(e):
+                self._requeue(rows)
+                raise
+        written = 0
+        for index, row in enumerate(rows):
+            try:
+                insert_votes([row])
+            except Exception as e:
+                if _transient(e):
+                    self._requeue(rows[index:])
+                    raise
+                self.dropped += 1
+                logger.error("Dropping vote %r that cannot be written: %s", row, e)
+            else:
+                written += 1
+        return written
+
+    def _requeue(self, rows):
+        with self._lock:
+            self._queue[:0] = rows
+
+    def pending(self):
+        """Number of votes waiting to be written"""
+        with self._lock:
+            return len(self._queue)
+
+    def close(self):
+        """Stop the background flusher and write any remaining votes
+
+        Runs at interpreter exit, so a failed final flush is logged rather than raised.
+        """
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Vote buffer could not write %d votes on close", self.pending())
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Vote buffer flush failed; will retry")
+
+
+def get_vote_buffer():
+    """Get the shared vote buffer, or None when buffered ingestion is disabled"""
+    global _buffer
+    if not get_setting('votes', 'buffered', False):
+        return None
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = VoteBuffer(
+                batch_size=get_setting('votes', 'batch_size', 500),
+                flush_interval=get_setting('votes', 'flush_interval', 0.5)
+            )
+            atexit.register(_buffer.close)
+        return _buffer
+
+
+@timed_skill('collect_votes.flush_votes')
+def flush_votes():
+    """Flush any buffered votes to the database"""
+    buffer = _buffer
+    return buffer.flush() if buffer is not None else 0
+
+
+@timed_skill('collect_votes')
 def collect_votes(prompt_id, user_id, score, comment=""):
-    conn = sqlite3.connect('promptops.db')
-    cursor = conn.cursor()
-    
-    vote_id = str(uuid.uuid4())
-    cursor.execute("""
-        INSERT INTO user_votes (id, prompt_id, user_id, score, comment, timestamp)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (
-        vote_id,
-        prompt_id,
-        user_id,
-        score,
-        comment,
-        datetime.now()
-    ))
-    
-    conn.commit()
-    conn.close()
-    
-    return {"success": True, "vote_id": vote_id}
\ No newline at end of file
+    row = _vote_row(prompt_id, user_id, score, comment)
+
+    buffer = get_vote_buffer()
+    if buffer is not None:
+        buffer.add(row)
+        return {"success": True, "vote_id": row[0], "queued": True}
+
+    insert_votes([row])
+    return {"success": True, "vote_id": row[0]}
+
+
+@timed_skill('collect_votes.collect_votes_batch')
+def collect_votes_batch(votes, idempotency_key=None):
+    # With an idempotency key each vote id is derived from the key and the
+    # vote's position, so a retried request maps onto the same rows; the key
+    # also records the batch's fingerprint, so it cannot be reused for another
+    rows = []
+    for index, vote in enumerate(votes):
+        vote_id = None
+        if idempotency_key:
+            vote_id = str(uuid.uuid5(VOTE_ID_NAMESPACE, f"{idempotency_key}:{index}"))
+        try:
+            rows.append(_vote_row(
+                vote['prompt_id'],
+                vote['user_id'],
+                vote['score'],
+                vote.get('comment', ''),
+                vote_id
+            ))
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Invalid vote at index {index}: {e}") from None
+
+    inserted = 0
+    if rows:
+        fingerprint = _fingerprint(rows) if idempotency_key else None
+        inserted = insert_votes(rows, deduplicate=bool(idempotency_key), idempotency_key=idempotency_key,
+                                fingerprint=fingerprint)
+    return {
+        "success": True,
+        "vote_ids": [row[0] for row in rows],
+        "inserted": inserted,
+        "duplicates": len(rows) - inserted
+    }
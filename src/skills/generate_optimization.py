@@ -1,34 +1,47 @@
-import sqlite3
-from datetime import datetime
 import uuid
 
-def generate_optimization(original_prompt, context=None, performance_data=None):
-    # This is a simplified implementation
-    # In a real scenario, this would involve calling an LLM API
-    
-    optimized_prompt = f"OPTIMIZED: {original_prompt}"
+from src.metrics import timed_skill
+from src.repositories import get_repository
+from src.writer import write_operation
+from src.skills.optimization_cache import cache_key, get_optimization_cache
+from src.skills.optimizer_backends import get_backend
+
+
+@timed_skill('generate_optimization')
+def generate_optimization(original_prompt, context=None, performance_data=None, backend=None):
+    backend = backend or get_backend()
+
+    # Identical requests are answered from the memo, and concurrent
+    # duplicates share a single backend call. The memo is kept in SQLite,
+    # so it is skipped when the repository does not persist
+    cache = get_optimization_cache() if get_repository().persistent else None
+    if cache is None:
+        return _optimize(original_prompt, context, performance_data, backend)
+
+    key = cache_key(original_prompt, context, performance_data, backend.name)
+    return cache.get_or_compute(
+        key,
+        lambda: _optimize(original_prompt, context, performance_data, backend, cache, key)
+    )
+
+
+def _optimize(original_prompt, context, performance_data, backend, cache=None, key=None):
+    optimized_prompt, improvement_score = backend.optimize(original_prompt, context, performance_data)
     
     # Store in database
-    conn = sqlite3.connect('promptops.db')
-    cursor = conn.cursor()
-    
-    optimization_id = str(uuid.uuid4())
-    cursor.execute("""
-        INSERT INTO optimized_prompts (id, original_prompt_id, optimized_content, created_at, improvement_score)
-        VALUES (?, ?, ?, ?, ?)
-    """, (
-        optimization_id,
-        str(uuid.uuid4()),  # original_prompt_id
-        optimized_prompt,
-        datetime.now(),
-        0.85  # placeholder score
-    ))
-    
-    conn.commit()
-    conn.close()
-    
-    return {
-        "optimization_id": optimization_id,
+    result = {
+        "optimization_id": str(uuid.uuid4()),
         "optimized_prompt": optimized_prompt,
-        "improvement_score": 0.85
-    }
\ No newline at end of file
+        "improvement_score": improvement_score
+    }
+    _store_optimization(result, key if cache is not None else None)
+    return result
+
+
+@write_operation('generate_optimization.store')
+def _store_optimization(result, key=None):
+    repository = get_repository()
+    with repository.transaction() as conn:
+        repository.add_optimization(result['optimization_id'], result['optimized_prompt'], result['improvement_score'])
+        if key is not None:
+            get_optimization_cache().store(conn, key, result)
@@ -0,0 +1,94 @@
+from datetime import datetime
+import json
+
+from src.config import get_setting
+from src.metrics import timed_skill
+from src.repositories import get_repository
+from src.writer import write_operation
+from src.skills.run_ab_test import record_observations
+
+
+def _promoted(metrics, promoted_names):
+    # Only the configured metrics with numeric values are indexed and aggregated
+    for name, value in metrics.items():
+        if name in promoted_names and isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, float(value)
+
+
+def _log_row(log):
+    """Evaluation row (EVALUATION_FIELDS order) and its metrics dict for one submitted log"""
+    if not isinstance(log, dict):
+        raise ValueError("log must be an object")
+    metrics = log.get('metrics')
+    if metrics is None and log.get('metrics_json'):
+        try:
+            metrics = json.loads(log['metrics_json'])
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"metrics_json is not valid JSON: {e}") from None
+    metrics = metrics or {}
+    if not isinstance(metrics, dict):
+        raise ValueError("metrics must be an object")
+    # human_score feeds A/B tests on evaluations, so it has to be a number when given
+    human_score = log.get('human_score')
+    if human_score is not None and (isinstance(human_score, bool) or not isinstance(human_score, (int, float))):
+        raise ValueError(f"human_score must be a number, got {human_score!r}")
+    row = (log.get('version_id'), log.get('response'), json.dumps(metrics), log.get('human_score'),
+           log.get('timestamp') or datetime.now())
+    return row, metrics
+
+
+@write_operation('log_evaluations.insert_batch')
+def _insert_batch(rows, promoted):
+    repository = get_repository()
+    with repository.transaction():
+        first_id = repository.add_evaluations(rows, promoted)
+        record_observations('evaluations', [(row[0], row[3]) for row in rows])
+    return first_id, len(rows)
+
+
+@timed_skill('log_evaluations')
+def log_evaluations(logs, batch_size=None):
+    batch_size = batch_size or get_setting('evaluations', 'batch_size', 10000)
+    promoted_names = set(get_setting('evaluations', 'promoted_metrics') or ())
+
+    inserted, first_id, last_id = 0, None, None
+    rows, promoted = [], []
+    for index, log in enumerate(logs):
+        try:
+            row, metrics = _log_row(log)
+        except ValueError as e:
+            raise ValueError(f"Invalid evaluation log at index {index}: {e}") from None
+        rows.append(row)
+        promoted.append(list(_promoted(metrics, promoted_names)))
+        if len(rows) >= batch_size:
+            start_id, count = _insert_batch(rows, promoted)
+            first_id = start_id if first_id is None else first_id
+            inserted, last_id, rows, promoted = inserted + count, start_id + count - 1, [], []
+    if rows:
+        start_id, count = _insert_batch(rows, promoted)
+        first_id = start_id if first_id is None else first_id
+        inserted, last_id = inserted + count, start_id + count - 1
+
+    return {"success": True, "inserted": inserted, "first_id": first_id, "last_id": last_id}
+
+
+@timed_skill('log_evaluations.get_evaluation_metrics')
+def get_evaluation_metrics(version_id=None, metric=None):
+    """Aggregate promoted metrics per version from the maintained rollups"""
+    return [
+        {
+            "version_id": row[0] or None,
+            "metric": row[1],
+            "count": row[2],
+            "mean": row[3] / row[2] if row[2] else None,
+            "min": row[4],
+            "max": row[5]
+        } for row in get_repository().evaluation_rollups(version_id, metric)
+    ]
+
+
+@timed_skill('log_evaluations.query_evaluations')
+def query_evaluations(metric, version_id=None, min_value=None, max_value=None, limit=100):
+    """Find logs by a promoted metric's value range using the metric index"""
+    rows = get_repository().query_evaluations(metric, version_id, min_value, max_value, limit)
+    return [{"log_id": row[0], "version_id": row[1] or None, metric: row[2]} for row in rows]
@@ -1,76 +1,139 @@
-import sqlite3
-from datetime import datetime
-import uuid
+import re
 
+from src.config import get_setting
+from src.metrics import timed_skill
+from src.repositories import TEMPLATE_FIELDS, get_repository
+from src.writer import write_operation
+
+
+@timed_skill('manage_templates', key=lambda action, *args, **kwargs: f"manage_templates.{action}")
 def manage_templates(action, template_data=None, template_id=None):
-    conn = sqlite3.connect('promptops.db')
-    cursor = conn.cursor()
-    
     if action == "create":
-        template_id = str(uuid.uuid4())
-        cursor.execute("""
-            INSERT INTO templates (id, name, description, template_content, created_at, updated_at, is_active)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            template_id,
-            template_data['name'],
-            template_data['description'],
-            template_data['content'],
-            datetime.now(),
-            datetime.now(),
-            True
-        ))
-        conn.commit()
-        return {"success": True, "template_id": template_id}
+        return _create_template(template_data)
         
     elif action == "get":
-        cursor.execute("SELECT * FROM templates WHERE id = ?", (template_id,))
-        result = cursor.fetchone()
-        if result:
-            return {
-                "id": result[0],
-                "name": result[1],
-                "description": result[2],
-                "content": result[3],
-                "created_at": result[4],
-                "updated_at": result[5],
-                "is_active": result[6]
-            }
-        return None
+        return get_repository().get_template(template_id)
         
     elif action == "update":
-        cursor.execute("""
-            UPDATE templates 
-            SET name=?, description=?, template_content=?, updated_at=?
-            WHERE id=?
-        """, (
-            template_data['name'],
-            template_data['description'],
-            template_data['content'],
-            datetime.now(),
-            template_id
-        ))
-        conn.commit()
-        return {"success": True}
+        return _update_template(template_data, template_id)
         
     elif action == "delete":
-        cursor.execute("DELETE FROM templates WHERE id=?", (template_id,))
-        conn.commit()
-        return {"success": True}
+        return _delete_template(template_id)
         
     elif action == "list":
-        cursor.execute("SELECT * FROM templates")
-        results = cursor.fetchall()
-        return [
-            {
-                "id": row[0],
-                "name": row[1],
-                "description": row[2],
-                "content": row[3],
-                "created_at": row[4],
-                "updated_at": row[5],
-                "is_active": row[6]
-            } for row in results
-        ]
-    
-    conn.close()
\ No newline at end of file
+        return list(get_repository().select_templates(TEMPLATE_FIELDS))
+
+
+@write_operation('manage_templates.create')
+def _create_template(template_data):
+    template_id = get_repository().create_template(
+        template_data['name'],
+        template_data['description'],
+        template_data['content']
+    )
+    return {"success": True, "template_id": template_id}
+
+
+@write_operation('manage_templates.update')
+def _update_template(template_data, template_id):
+    # Fields left as None keep their stored value; only content changes are versioned
+    updated = get_repository().update_template(
+        template_id,
+        template_data.get('name'),
+        template_data.get('description'),
+        template_data.get('content'),
+        template_data.get('is_active')
+    )
+    return {"success": updated}
+
+
+@write_operation('manage_templates.delete')
+def _delete_template(template_id):
+    get_repository().delete_template(template_id)
+    return {"success": True}
+
+
+@timed_skill('manage_templates.insert_templates')
+@write_operation('manage_templates.insert_templates')
+def insert_templates(templates):
+    """Insert complete templates in one transaction, skipping ids already stored
+
+    Returns how many were new.
+    """
+    return len(get_repository().add_templates(templates))
+
+
+MAX_PAGE_SIZE = 1000
+
+
+def _resolve_fields(fields):
+    fields = list(fields or TEMPLATE_FIELDS)
+    unknown = [field for field in fields if field not in TEMPLATE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown template fields: {', '.join(unknown)}")
+    if "id" not in fields:
+        fields.insert(0, "id")  # always returned; also the keyset cursor
+    return fields
+
+
+@timed_skill('manage_templates.list_templates_page')
+def list_templates_page(after=None, limit=100, fields=None, is_active=None):
+    """Return one keyset page of templates ordered by id"""
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    # Fetch one extra row to know whether another page follows
+    rows = list(get_repository().select_templates(_resolve_fields(fields), is_active, after, limit + 1))
+    templates = rows[:limit]
+    next_after = templates[-1]["id"] if len(rows) > limit else None
+    return {"templates": templates, "next_after": next_after}
+
+
+@timed_skill('manage_templates.iter_templates')
+def iter_templates(fields=None, is_active=None):
+    """Stream templates without materializing the whole table"""
+    # Fields are checked here so invalid ones fail before iteration starts
+    return get_repository().select_templates(_resolve_fields(fields), is_active)
+
+
+@timed_skill('manage_templates.get_templates_bulk')
+def get_templates_bulk(template_ids, fields=None):
+    """Fetch many templates by id with one query per chunk, keyed by id"""
+    return get_repository().get_templates(template_ids, _resolve_fields(fields))
+
+
+# A search term: a word, optionally ending in * for a prefix match
+SEARCH_TERM = re.compile(r'(\w+)(\*?)')
+
+
+def _match_expression(query):
+    # Terms are quoted so FTS5 operators and punctuation in the query are never parsed as syntax
+    terms = [f'"{word}"{star}' for word, star in SEARCH_TERM.findall(query or '')]
+    if not terms:
+        raise ValueError("Search query has no terms")
+    return ' '.join(terms)
+
+
+@timed_skill('manage_templates.search_templates')
+def search_templates(query, limit=None, offset=0):
+    """Rank templates matching every term of the query by name, description and content
+
+    A term ending in * matches as a prefix. Results carry a snippet of the
+    best matching field with the matched terms marked. When search.max_candidates
+    is set, queries matching more templates than that are ranked among the
+    oldest that many only, and the response is marked truncated.
+    """
+    max_limit = get_setting('search', 'max_limit', 100)
+    limit = max(1, min(int(limit or get_setting('search', 'limit', 20)), max_limit))
+    offset = max(0, int(offset or 0))
+    results, truncated = get_repository().search_templates(
+        _match_expression(query), limit, offset,
+        get_setting('search', 'snippet_tokens', 16), get_setting('search', 'max_candidates', 0)
+    )
+    return {"results": results, "next_offset": offset + limit if len(results) == limit else None,
+            "truncated": truncated}
+
+
+@timed_skill('manage_templates.rebuild_search_index')
+@write_operation('manage_templates.rebuild_search_index')
+def rebuild_search_index():
+    """Re-index every template for search"""
+    get_repository().rebuild_search_index()
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import threading
+import time
+
+from src.config import get_setting
+from src.db import get_connection, transaction
+
+# Bump when optimization output changes so stale results stop matching
+OPTIMIZER_VERSION = "1"
+
+# Run size-based eviction once per this many stores
+EVICTION_INTERVAL = 256
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def cache_key(original_prompt, context, performance_data, backend_name):
+    """Content address for an optimization request"""
+    payload = json.dumps(
+        [original_prompt, context, performance_data, backend_name, OPTIMIZER_VERSION],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class _InflightCall:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class OptimizationCache:
+    """Persistent memo of optimization results with TTL, size bound and single-flight"""
+
+    def __init__(self, ttl=86400, max_entries=100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._stores = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key):
+        """Get a stored result that has not expired"""
+        cursor = get_connection().execute(
+            "SELECT result_json FROM optimization_cache WHERE cache_key = ? AND created_at > ?",
+            (key, time.time() - self.ttl)
+        )
+        row = cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store(self, conn, key, result):
+        """Store a result inside the caller's transaction"""
+        conn.execute(
+            "INSERT OR REPLACE INTO optimization_cache (cache_key, result_json, created_at) VALUES (?, ?, ?)",
+            (key, json.dumps(result), time.time())
+        )
+        with self._lock:
+            self._stores += 1
+            evict = self._stores % EVICTION_INTERVAL == 0
+        if evict:
+            self._evict(conn)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached result for key, computing it at most once concurrently
+
+        compute must store its result through store() before returning.
+        """
+        result = self.lookup(key)
+        if result is not None:
+            with self._lock:
+                self.hits += 1
+            return result
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InflightCall()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            # Another leader may have finished between the lookup and registering
+            call.result = self.lookup(key) or compute()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.event.set()
+
+    def _evict(self, conn):
+        cursor = conn.execute("DELETE FROM optimization_cache WHERE created_at <= ?", (time.time() - self.ttl,))
+        evicted = cursor.rowcount
+        cursor = conn.execute("""
+            DELETE FROM optimization_cache WHERE created_at <= (
+                SELECT created_at FROM optimization_cache ORDER BY created_at DESC LIMIT 1 OFFSET ?
+            )
+        """, (self.max_entries,))
+        evicted += cursor.rowcount
+        with self._lock:
+            self.evictions += evicted
+
+    def clear(self):
+        """Remove every stored result"""
+        with transaction() as conn:
+            conn.execute("DELETE FROM optimization_cache")
+
+    def stats(self):
+        """Get hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'hit_ratio': round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0
+            }
+
+
+def get_optimization_cache():
+    """Get the shared optimization cache, or None when memoization is disabled"""
+    global _cache
+    if not get_setting('optimizer', 'cache_enabled', True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = OptimizationCache(
+                ttl=get_setting('optimizer', 'cache_ttl', 86400),
+                max_entries=get_setting('optimizer', 'cache_max_entries', 100000)
+            )
+        return _cache
@@ -0,0 +1,36 @@
+import time
+
+from src.config import get_setting
+
+
+class LocalBackend:
+    """Placeholder optimizer used until a model API is wired in"""
+
+    name = "local"
+
+    def optimize(self, original_prompt, context=None, performance_data=None):
+        # In a real scenario, this would involve calling an LLM API
+        return f"OPTIMIZED: {original_prompt}", 0.85
+
+
+class StubBackend(LocalBackend):
+    """Local optimizer with artificial latency, for benchmarking concurrency"""
+
+    name = "stub"
+
+    def __init__(self, latency=0.1):
+        self.latency = latency
+
+    def optimize(self, original_prompt, context=None, performance_data=None):
+        time.sleep(self.latency)
+        return super().optimize(original_prompt, context, performance_data)
+
+
+def get_backend():
+    """Build the optimizer backend selected in configuration"""
+    name = get_setting('optimizer', 'backend', 'local')
+    if name == "local":
+        return LocalBackend()
+    if name == "stub":
+        return StubBackend(latency=get_setting('optimizer', 'stub_latency', 0.1))
+    raise ValueError(f"Unknown optimizer backend: {name}")
@@ -0,0 +1,98 @@
+import math
+
+from src.config import get_setting
+from src.metrics import timed_skill
+from src.repositories import PROMPT_RANKINGS, get_repository
+from src.writer import write_operation
+
+# Votes are 1-5 (collect_votes._vote_row); Wilson scores rescale them to 0-1
+LOWEST_SCORE, HIGHEST_SCORE = 1, 5
+
+
+def _settings():
+    return (get_setting('leaderboard', 'prior_mean', 3.0), get_setting('leaderboard', 'prior_weight', 5),
+            get_setting('leaderboard', 'z', 1.96))
+
+
+def wilson_lower_bound(count, total, z=None):
+    """Lower bound of the Wilson interval around the mean vote rescaled to 0-1"""
+    if not count:
+        return 0.0
+    z = _settings()[2] if z is None else z
+    p = (total / count - LOWEST_SCORE) / (HIGHEST_SCORE - LOWEST_SCORE)
+    p = min(max(p, 0.0), 1.0)
+    spread = z * math.sqrt(p * (1 - p) / count + z * z / (4 * count * count))
+    return max((p + z * z / (2 * count) - spread) / (1 + z * z / count), 0.0)
+
+
+def score_rows(sums):
+    """Stored leaderboard rows (PROMPT_SCORE_FIELDS order) for (prompt_id, count, total, total_squares) sums
+
+    The Bayesian score is the mean vote shrunk towards a fixed prior, so a
+    prompt's score only changes when its own votes do.
+    """
+    prior_mean, prior_weight, z = _settings()
+    return [
+        (prompt_id, count, total, total_squares, (prior_mean * prior_weight + total) / (prior_weight + count),
+         wilson_lower_bound(count, total, z))
+        for prompt_id, count, total, total_squares in sums
+    ]
+
+
+def score_row(prompt_id, count, total, total_squares):
+    """Stored leaderboard row for one prompt's running sums"""
+    return score_rows([(prompt_id, count, total, total_squares)])[0]
+
+
+def fold_votes(current, votes):
+    """Score rows for prompts whose stored sums are current ({id: (count, total, total_squares)})
+    after adding votes ((prompt_id, score) pairs)"""
+    sums = {}
+    for prompt_id, score in votes:
+        count, total, total_squares = sums.get(prompt_id) or current.get(prompt_id) or (0, 0, 0)
+        sums[prompt_id] = (count + 1, total + score, total_squares + score * score)
+    return score_rows((prompt_id, *values) for prompt_id, values in sums.items())
+
+
+def _score(row):
+    prompt_id, count, total, total_squares, bayesian, wilson = row
+    mean = total / count
+    return {
+        'prompt_id': prompt_id,
+        'votes': count,
+        'mean': round(mean, 4),
+        'stddev': round(math.sqrt(max(total_squares / count - mean * mean, 0.0)), 4),
+        'bayesian_score': round(bayesian, 4),
+        'wilson_score': round(wilson, 4),
+    }
+
+
+@timed_skill('prompt_scores.top_prompts')
+def top_prompts(k=None, min_votes=None, by='bayesian'):
+    """Best-rated prompts with at least min_votes votes, read from the maintained aggregates"""
+    if by not in PROMPT_RANKINGS:
+        raise ValueError(f"Unknown ranking {by!r}; expected one of {', '.join(PROMPT_RANKINGS)}")
+    k = max(1, min(int(k or get_setting('leaderboard', 'k', 10)), get_setting('leaderboard', 'max_k', 100)))
+    min_votes = get_setting('leaderboard', 'min_votes', 1) if min_votes is None else max(int(min_votes), 1)
+    rows = get_repository().top_prompts(k, min_votes, by)
+    return [dict(_score(row), rank=rank) for rank, row in enumerate(rows, 1)]
+
+
+@timed_skill('prompt_scores.get_prompt_score')
+def get_prompt_score(prompt_id):
+    """A prompt's vote aggregates and scores, or None if it has no votes"""
+    row = get_repository().get_prompt_score(prompt_id)
+    return _score(row) if row else None
+
+
+@timed_skill('prompt_scores.rebuild_prompt_scores')
+@write_operation('prompt_scores.rebuild_prompt_scores')
+def rebuild_prompt_scores():
+    """Recompute every prompt's aggregates from the stored votes, e.g. after changing the prior"""
+    return get_repository().rebuild_prompt_scores()
+
+
+def ensure_prompt_scores():
+    """Build the leaderboard once for databases that had votes before it existed"""
+    if get_repository().prompt_scores_missing():
+        rebuild_prompt_scores()
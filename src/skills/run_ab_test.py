@@ -1,38 +1,171 @@
-import sqlite3
-import random
-from datetime import datetime
+import math
 import uuid
 
+from src.metrics import timed_skill
+from src.repositories import get_repository
+from src.writer import write_operation
+from src.skills.ab_statistics import batch_moments, merge_moments, msprt_p_value, variance
+from src.skills.assign_variant import invalidate_snapshot, traffic_buckets
+
+ARMS = ('variant_a', 'variant_b')
+
+# Metrics a test can be decided on: vote scores or evaluation human scores
+METRICS = ('votes', 'evaluations')
+
+RECOMPUTE_CHUNK_SIZE = 100000
+
+
+def _variant_id(variant):
+    # Variants may be given as an id or as an object carrying one
+    if isinstance(variant, str) and variant:
+        return variant
+    if isinstance(variant, dict):
+        for key in ('id', 'template_id', 'prompt_id', 'version_id'):
+            if variant.get(key):
+                return variant[key]
+    # A made-up id would never match the votes or evaluations the test is decided on
+    raise ValueError(f"A/B test variant needs an id, template_id, prompt_id or version_id: {variant!r}")
+
+
+@timed_skill('run_ab_test')
 def run_ab_test(config, variant_a, variant_b):
-    conn = sqlite3.connect('promptops.db')
-    cursor = conn.cursor()
-    
-    # Create test record
+    metric = config.get('metric', 'votes')
+    if metric not in METRICS:
+        raise ValueError(f"Unknown A/B test metric: {metric}")
+    traffic_buckets(config)
+
+    test_id = _create_test(config, metric, (_variant_id(variant_a), _variant_id(variant_b)))
+    invalidate_snapshot()
+
+    # Seed the accumulators from observations logged before the test started
+    return recompute_ab_test(test_id)
+
+
+@write_operation('run_ab_test.create')
+def _create_test(config, metric, variant_ids):
     test_id = str(uuid.uuid4())
-    cursor.execute("""
-        INSERT INTO ab_tests (id, name, variant_a_id, variant_b_id, sample_size, duration_days, status, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        test_id,
-        config['name'],
-        str(uuid.uuid4()),  # variant_a_id
-        str(uuid.uuid4()),  # variant_b_id
-        config['sample_size'],
-        config['duration_days'],
-        'running',
-        datetime.now()
-    ))
-    
-    # Simulate A/B test execution
-    results = {
+    get_repository().create_ab_test(test_id, config, metric, variant_ids)
+    return test_id
+
+
+def _decide(repository, test_id, test, p_value):
+    """Update the always-valid p-value and stop the test once it is conclusive"""
+    config = test['config']
+    a, b = test['arms']['variant_a'], test['arms']['variant_b']
+    p_value = min(test['p_value'], p_value)
+
+    winner, status = test['winner'], test['status']
+    if status == 'running':
+        if p_value < config.get('alpha', 0.05):
+            winner = 'variant_b' if b['mean'] > a['mean'] else 'variant_a'
+            status = 'completed'
+        elif test['sample_size'] and min(a['n'], b['n']) >= test['sample_size']:
+            status = 'completed'
+
+    changed = status != test['status']
+    test.update(p_value=p_value, winner=winner, status=status)
+    repository.save_ab_test(test_id, test)
+    if changed:
+        invalidate_snapshot()
+
+
+def _test_p_value(test):
+    a, b = test['arms']['variant_a'], test['arms']['variant_b']
+    return msprt_p_value(
+        a['n'], a['mean'], a['m2'], b['n'], b['mean'], b['m2'],
+        tau=test['config'].get('tau', 1.0)
+    )
+
+
+@timed_skill('run_ab_test.record_observations')
+def record_observations(metric, observations):
+    """Fold new (variant_id, value) observations into running tests
+
+    Called inside the writer's transaction, so accumulators stay in step
+    with the rows they summarize.
+    """
+    by_variant = {}
+    for variant_id, value in observations:
+        if value is not None:
+            by_variant.setdefault(variant_id, []).append(value)
+    if not by_variant:
+        return
+
+    repository = get_repository()
+    affected = set()
+    for test_id, arm, variant_id, n, mean, m2 in repository.running_arms(metric, list(by_variant)):
+        n, mean, m2 = merge_moments(n, mean, m2, *batch_moments(by_variant[variant_id]))
+        repository.update_arm(test_id, arm, n, mean, m2)
+        affected.add(test_id)
+
+    for test_id in affected:
+        test = repository.load_ab_test(test_id)
+        _decide(repository, test_id, test, _test_p_value(test))
+
+
+@timed_skill('run_ab_test.recompute_ab_test')
+@write_operation('run_ab_test.recompute_ab_test')
+def recompute_ab_test(test_id):
+    """Rebuild a test's accumulators from the raw logs, chunk by chunk with NumPy"""
+    import numpy as np
+
+    repository = get_repository()
+    with repository.transaction():
+        test = repository.load_ab_test(test_id)
+        if test is None:
+            return None
+        arm_by_variant = {}
+        for arm, stats in test['arms'].items():
+            arm_by_variant.setdefault(stats['variant_id'], []).append(arm)
+
+        moments = {arm: (0, 0.0, 0.0) for arm in ARMS}
+        for rows in repository.observation_chunks(test['metric'], list(arm_by_variant), RECOMPUTE_CHUNK_SIZE):
+            ids = np.array([row[0] for row in rows], dtype=object)
+            values = np.array([row[1] for row in rows], dtype=float)
+            for variant_id, arms in arm_by_variant.items():
+                chunk = values[ids == variant_id]
+                if chunk.size:
+                    chunk_moments = (chunk.size, float(chunk.mean()), float(((chunk - chunk.mean()) ** 2).sum()))
+                    for arm in arms:
+                        moments[arm] = merge_moments(*moments[arm], *chunk_moments)
+
+        for arm, (n, mean, m2) in moments.items():
+            repository.update_arm(test_id, arm, n, mean, m2)
+            test['arms'][arm].update(n=n, mean=mean, m2=m2)
+        # A full recomputation restarts the sequential test from the rebuilt totals
+        test['p_value'] = 1.0
+        _decide(repository, test_id, test, _test_p_value(test))
+    return _format_results(test_id, test)
+
+
+@timed_skill('run_ab_test.get_ab_test_results')
+def get_ab_test_results(test_id):
+    """Read a test's current results from its accumulators"""
+    test = get_repository().load_ab_test(test_id)
+    if test is None:
+        return None
+    return _format_results(test_id, test)
+
+
+def _format_results(test_id, test):
+    arms = {}
+    for arm in ARMS:
+        stats = test['arms'][arm]
+        arms[arm] = {
+            'variant_id': stats['variant_id'],
+            'n': stats['n'],
+            'mean': stats['mean'],
+            'std': math.sqrt(variance(stats['n'], stats['m2']))
+        }
+    return {
         'test_id': test_id,
-        'variant_a_performance': random.uniform(0.7, 0.95),
-        'variant_b_performance': random.uniform(0.7, 0.95),
-        'winner': 'variant_a' if random.random() > 0.5 else 'variant_b',
-        'confidence': random.uniform(0.8, 0.99)
+        'status': test['status'],
+        'metric': test['metric'],
+        'variant_a': arms['variant_a'],
+        'variant_b': arms['variant_b'],
+        'variant_a_performance': arms['variant_a']['mean'],
+        'variant_b_performance': arms['variant_b']['mean'],
+        'winner': test['winner'],
+        'p_value': test['p_value'],
+        'confidence': 1.0 - test['p_value']
     }
-    
-    conn.commit()
-    conn.close()
-    
-    return results
\ No newline at end of file
@@ -0,0 +1,166 @@
+import hashlib
+import re
+import zlib
+
+from src.config import get_setting
+from src.metrics import timed_skill
+from src.repositories import get_repository
+from src.writer import write_operation
+
+WORD = re.compile(r'\w+')
+
+_permutations = {}
+
+
+def _lsh_shape():
+    return get_setting('similarity', 'bands', 32), get_setting('similarity', 'rows', 4)
+
+
+def _coefficients(name, count):
+    # Odd 64-bit multipliers and offsets derived from fixed digests, so every process and release hashes identically
+    import numpy as np
+
+    if (name, count) not in _permutations:
+        digests = [hashlib.blake2b(f"{name}-{i}".encode(), digest_size=16).digest() for i in range(count)]
+        a = np.array([int.from_bytes(digest[:8], 'little') | 1 for digest in digests], dtype=np.uint64)
+        b = np.array([int.from_bytes(digest[8:], 'little') for digest in digests], dtype=np.uint64)
+        _permutations[name, count] = (a, b)
+    return _permutations[name, count]
+
+
+def _shingle_hashes(content, size=None):
+    import numpy as np
+
+    size = size or get_setting('similarity', 'shingle_size', 3)
+    words = np.fromiter(map(zlib.crc32, map(str.encode, WORD.findall(content.lower()))), dtype=np.uint64)
+    a, b = _coefficients('shingle', size)
+    if len(words) < size:
+        words = np.concatenate([words, np.zeros(size - len(words), dtype=np.uint64)])
+    # Multilinear hash of each window of size word hashes; the high 32 bits identify the shingle
+    combined = b[0] + sum(words[i:len(words) - size + 1 + i] * a[i] for i in range(size))
+    return np.unique(combined >> np.uint64(32))
+
+
+def shingles(content, size=None):
+    """32-bit hashes of the overlapping size-word shingles of lowercased content"""
+    return set(_shingle_hashes(content, size).tolist())
+
+
+def minhash(content):
+    """MinHash signature of the content's shingles, bands * rows uint32 values"""
+    import numpy as np
+
+    bands, rows = _lsh_shape()
+    a, b = _coefficients('minhash', bands * rows)
+    # Multiply-add-shift hashing: (a * x + b) wraps modulo 2**64 and the high 32 bits
+    # are the permuted value. One row per shingle, one column per permutation
+    permuted = (np.outer(_shingle_hashes(content), a) + b) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_buckets(signature):
+    """One bucket key per band of a signature (array or bytes); templates sharing a key are candidates"""
+    import numpy as np
+
+    bands, rows = _lsh_shape()
+    if isinstance(signature, bytes):
+        signature = np.frombuffer(signature, dtype=np.uint32)
+    a, b = _coefficients('band', rows)
+    salts, _ = _coefficients('band-salt', bands)
+    # Keys include the band, so equal values in different bands don't collide
+    keys = (signature.reshape(bands, rows).astype(np.uint64) * a).sum(axis=1) + b[0] + salts
+    keys ^= keys >> np.uint64(31)
+    return (keys * salts).view(np.int64).tolist()
+
+
+def signature_record(content):
+    """Serialized signature and LSH buckets stored for one template's content"""
+    signature = minhash(content)
+    return signature.tobytes(), band_buckets(signature)
+
+
+def similarity(signature, others):
+    """Estimated Jaccard similarity of one signature to each of several (bytes)"""
+    import numpy as np
+
+    if not others:
+        return []
+    base = np.frombuffer(signature, dtype=np.uint32)
+    matrix = np.frombuffer(b''.join(others), dtype=np.uint32).reshape(len(others), -1)
+    return (matrix == base).mean(axis=1).tolist()
+
+
+@timed_skill('template_similarity.similar_templates')
+def similar_templates(template_id, min_similarity=None, limit=None):
+    """Templates whose content is estimated to be at least min_similarity alike, most similar first
+
+    Only templates sharing an LSH bucket are compared, so the cost follows
+    the number of candidates rather than the size of the library. Returns
+    None if the template does not exist.
+    """
+    repository = get_repository()
+    if min_similarity is None:
+        min_similarity = get_setting('similarity', 'threshold', 0.8)
+    limit = max(1, min(int(limit or 20), 100))
+
+    signature = repository.get_signatures([template_id]).get(template_id)
+    if signature is None:
+        # Not indexed yet (created before the index existed)
+        template = repository.get_template(template_id)
+        if template is None:
+            return None
+        signature = signature_record(template['content'])[0]
+    candidates = set().union(*repository.bucket_members(band_buckets(signature)).values())
+    candidates.discard(template_id)
+
+    signatures = repository.get_signatures(list(candidates))
+    ids = list(signatures)
+    scores = similarity(signature, [signatures[candidate] for candidate in ids])
+    matches = sorted(
+        ({'template_id': candidate, 'similarity': round(score, 4)}
+         for candidate, score in zip(ids, scores) if score >= min_similarity),
+        key=lambda match: (-match['similarity'], match['template_id'])
+    )
+    return matches[:limit]
+
+
+@timed_skill('template_similarity.group_near_duplicates')
+def group_near_duplicates(template_ids, threshold=None):
+    """Map every template id to the first id (in the given order) of its near-duplicate group
+
+    Pairs sharing an LSH bucket whose estimated similarity reaches the
+    threshold are joined, transitively. Unindexed ids map to themselves.
+    """
+    repository = get_repository()
+    threshold = get_setting('similarity', 'threshold', 0.8) if threshold is None else threshold
+    template_ids = list(dict.fromkeys(template_ids))
+    order = {template_id: position for position, template_id in enumerate(template_ids)}
+    parent = {template_id: template_id for template_id in template_ids}
+
+    def find(template_id):
+        while parent[template_id] != template_id:
+            parent[template_id] = parent[parent[template_id]]
+            template_id = parent[template_id]
+        return template_id
+
+    signatures = repository.get_signatures(template_ids)
+    buckets = {template_id: band_buckets(signature) for template_id, signature in signatures.items()}
+    members = repository.bucket_members([key for keys in buckets.values() for key in keys])
+    for template_id, keys in buckets.items():
+        candidates = set().union(*(members.get(key, ()) for key in keys))
+        others = [candidate for candidate in candidates if candidate in signatures and candidate != template_id]
+        scores = similarity(signatures[template_id], [signatures[candidate] for candidate in others])
+        for candidate, score in zip(others, scores):
+            if score >= threshold:
+                a, b = find(template_id), find(candidate)
+                if a != b:
+                    # The earliest template stays the representative
+                    parent[max(a, b, key=order.get)] = min(a, b, key=order.get)
+    return {template_id: find(template_id) for template_id in template_ids}
+
+
+@timed_skill('template_similarity.rebuild_similarity_index')
+@write_operation('template_similarity.rebuild_similarity_index')
+def rebuild_similarity_index():
+    """Recompute every template's signature, e.g. after changing the similarity settings"""
+    return get_repository().rebuild_similarity_index()
@@ -0,0 +1,179 @@
+from datetime import datetime
+import difflib
+import hashlib
+import json
+import uuid
+import zlib
+
+from src.db import get_connection
+from src.metrics import timed_skill
+from src.repositories import get_repository
+
+# A keyframe is stored once a delta chain reaches this length, bounding rebuild cost
+KEYFRAME_INTERVAL = 16
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def encode_delta(base, content):
+    """Line-based delta: [start, end] copies base lines, a string inserts text"""
+    base_lines = base.splitlines(keepends=True)
+    new_lines = content.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(''.join(new_lines[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(',', ':')).encode())
+
+
+def apply_delta(base, payload):
+    base_lines = base.splitlines(keepends=True)
+    chunks = []
+    for op in json.loads(zlib.decompress(payload)):
+        chunks.append(op if isinstance(op, str) else ''.join(base_lines[op[0]:op[1]]))
+    return ''.join(chunks)
+
+
+def _latest(conn, template_id):
+    return conn.execute("""
+        SELECT seq, content_hash, depth FROM template_versions
+        WHERE template_id = ? ORDER BY seq DESC LIMIT 1
+    """, (template_id,)).fetchone()
+
+
+def _insert(conn, template_id, seq, content, digest, encoding, base_seq, payload, depth=0):
+    conn.execute("""
+        INSERT INTO template_versions
+            (id, template_id, version, content, created_at, seq, content_hash, encoding, base_seq, payload, size, depth)
+        VALUES (?, ?, ?, '', ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        str(uuid.uuid4()), template_id, str(seq), datetime.now(),
+        seq, digest, encoding, base_seq, payload, len(content), depth
+    ))
+
+
+@timed_skill('template_versions.record_version')
+def record_version(conn, template_id, content, previous_content=None):
+    """Record content as the template's next version inside the caller's transaction
+
+    previous_content is the template's current content; when the template
+    has no history yet it is recorded first as version 1. Returns the
+    version number now current.
+    """
+    latest = _latest(conn, template_id)
+    if latest is None and previous_content is not None and previous_content != content:
+        _insert(conn, template_id, 1, previous_content, content_hash(previous_content),
+                'full', None, zlib.compress(previous_content.encode()))
+        latest = (1, content_hash(previous_content), 0)
+
+    digest = content_hash(content)
+    if latest is not None and latest[1] == digest:
+        return latest[0]
+    seq = latest[0] + 1 if latest else 1
+
+    # Identical content seen before is stored as a reference to that version
+    match = conn.execute("""
+        SELECT seq, encoding, base_seq, depth FROM template_versions
+        WHERE template_id = ? AND content_hash = ? ORDER BY seq DESC LIMIT 1
+    """, (template_id, digest)).fetchone()
+    if match is not None:
+        target = match[2] if match[1] == 'ref' else match[0]
+        _insert(conn, template_id, seq, content, digest, 'ref', target, None, match[3])
+        return seq
+
+    full = zlib.compress(content.encode())
+    if latest is None or previous_content is None or latest[2] + 1 >= KEYFRAME_INTERVAL:
+        _insert(conn, template_id, seq, content, digest, 'full', None, full)
+        return seq
+
+    delta = encode_delta(previous_content, content)
+    if len(delta) < len(full):
+        _insert(conn, template_id, seq, content, digest, 'delta', latest[0], delta, latest[2] + 1)
+    else:
+        _insert(conn, template_id, seq, content, digest, 'full', None, full)
+    return seq
+
+
+def record_initial_versions(conn, templates):
+    """Record (template_id, content, created_at) as version 1 of new templates in one statement"""
+    conn.executemany("""
+        INSERT INTO template_versions
+            (id, template_id, version, content, created_at, seq, content_hash, encoding, base_seq, payload, size, depth)
+        VALUES (?, ?, '1', '', ?, 1, ?, 'full', NULL, ?, ?, 0)
+    """, [
+        (str(uuid.uuid4()), template_id, created_at, content_hash(content), zlib.compress(content.encode()), len(content))
+        for template_id, content, created_at in templates
+    ])
+
+
+@timed_skill('template_versions.rebuild_version')
+def rebuild_version(template_id, seq, conn=None):
+    """Reconstruct a version's content from its keyframe, or None if it does not exist"""
+    conn = conn or get_connection()
+    chain = []
+    while True:
+        row = conn.execute("""
+            SELECT encoding, base_seq, payload, content FROM template_versions
+            WHERE template_id = ? AND seq = ?
+        """, (template_id, seq)).fetchone()
+        if row is None:
+            return None
+        encoding, base_seq, payload, content = row
+        if encoding == 'ref':
+            seq = base_seq
+            continue
+        if encoding == 'plain':
+            break
+        if encoding == 'full':
+            content = zlib.decompress(payload).decode()
+            break
+        chain.append(payload)
+        seq = base_seq
+
+    for payload in reversed(chain):
+        content = apply_delta(content, payload)
+    return content
+
+
+def latest_version(template_id):
+    """Get the template's current version number, or None if it has no history"""
+    row = _latest(get_connection(), template_id)
+    return row[0] if row else None
+
+
+@timed_skill('template_versions.list_versions')
+def list_versions(template_id):
+    cursor = get_connection().execute("""
+        SELECT seq, content_hash, encoding, size, created_at FROM template_versions
+        WHERE template_id = ? ORDER BY seq
+    """, (template_id,))
+    return [
+        {
+            "version": row[0],
+            "content_hash": row[1],
+            "encoding": row[2],
+            "size": row[3],
+            "created_at": row[4]
+        } for row in cursor
+    ]
+
+
+@timed_skill('template_versions.diff_versions')
+def diff_versions(template_id, from_seq, to_seq):
+    """Unified diff between two versions, or None if either is missing"""
+    repository = get_repository()
+    old = repository.get_version(template_id, from_seq)
+    new = repository.get_version(template_id, to_seq)
+    if old is None or new is None:
+        return None
+    return ''.join(difflib.unified_diff(
+        old.splitlines(keepends=True),
+        new.splitlines(keepends=True),
+        fromfile=f"v{from_seq}",
+        tofile=f"v{to_seq}"
+    ))
@@ -0,0 +1,396 @@
+"""
+Writer Service Module
+Optional single-writer process that runs named write operations in group commits
+"""
+
+import functools
+import importlib
+import logging
+import os
+import queue
+import secrets
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from src import db
+from src.config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Operation name -> the undecorated write function
+OPERATIONS = {}
+
+# Modules defining write operations, imported by the writer so it can run all of them
+OPERATION_MODULES = (
+    'src.skills.analytics_summary',
+    'src.skills.collect_votes',
+    'src.skills.generate_optimization',
+    'src.skills.log_evaluations',
+    'src.skills.prompt_scores',
+    'src.skills.manage_templates',
+    'src.skills.run_ab_test',
+    'src.skills.template_similarity',
+)
+
+_local = threading.local()
+_client = None
+_client_lock = threading.Lock()
+# Set in the writer process, where operations always run directly
+_serving = False
+
+
+class WriterUnavailableError(ConnectionError):
+    """Raised when the writer service cannot be reached or stops responding"""
+
+
+def enabled():
+    """Whether writes are sent to the writer service instead of run in this process"""
+    return bool(get_setting('writer', 'enabled', False))
+
+
+def parse_address(address):
+    """'host:port' for TCP, anything else is a Unix socket path"""
+    host, sep, port = str(address).rpartition(':')
+    if sep and port.isdigit():
+        return (host or '127.0.0.1', int(port))
+    return address
+
+
+def _authkey():
+    key = get_setting('writer', 'authkey')
+    return key.encode() if isinstance(key, str) else key
+
+
+def key_file(address):
+    """Where a writer on a Unix socket without a configured authkey keeps its generated key"""
+    return f"{address}.key"
+
+
+def _require_authkey(address, authkey):
+    # Connections carry pickles, so every peer has to prove it knows the key
+    if authkey is None and not isinstance(address, str):
+        raise ValueError("writer.authkey must be set when the writer listens on a TCP address")
+
+
+def _read_key_file(address):
+    with open(key_file(address), 'rb') as f:
+        return f.read()
+
+
+def _write_key_file(address):
+    key = secrets.token_bytes(32)
+    path = key_file(address)
+    if os.path.exists(path):
+        os.remove(path)
+    # Created owner-only, so only processes running as the writer's user can connect
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+def write_operation(name):
+    """Decorator registering a write under a name the writer service can run
+
+    While writer.enabled is set (read on every call), calls are sent to
+    the writer process and return its result once the transaction holding
+    them has committed. They still run directly inside the writer itself,
+    and when the caller already holds a write transaction (which the
+    writer would wait on).
+    """
+    def decorate(func):
+        OPERATIONS[name] = func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _serving or not enabled() or db.in_transaction():
+                return func(*args, **kwargs)
+            return get_client().call(name, args, kwargs)
+        return wrapper
+    return decorate
+
+
+class WriterClient:
+    """Sends operations to the writer service over one connection per thread
+
+    Without an authkey the client reads the key the writer generated next
+    to its Unix socket; TCP addresses need an explicit authkey.
+    """
+
+    def __init__(self, address, authkey=None, timeout=30.0):
+        self.address = parse_address(address)
+        _require_authkey(self.address, authkey)
+        self.authkey = authkey
+        self.timeout = timeout
+
+    def call(self, name, args=(), kwargs=None):
+        """Run an operation in the writer and return its result, or raise its error"""
+        conn = self._connection()
+        try:
+            conn.send((name, args, kwargs or {}))
+            if not conn.poll(self.timeout):
+                raise WriterUnavailableError(f"No acknowledgement for {name} within {self.timeout}s")
+            ok, value = conn.recv()
+        except (OSError, EOFError, WriterUnavailableError) as e:
+            # The outcome of this write is unknown; don't reuse the connection
+            self.close()
+            if isinstance(e, WriterUnavailableError):
+                raise
+            raise WriterUnavailableError(f"Writer connection lost during {name}: {e}") from e
+        if ok:
+            return value
+        raise value
+
+    def close(self):
+        conn = getattr(_local, 'conn', None)
+        if conn is not None:
+            _local.conn = None
+            conn.close()
+
+    def _connection(self):
+        conn = getattr(_local, 'conn', None)
+        if conn is not None:
+            return conn
+        # Nothing has been sent yet, so connecting can be retried while the writer starts
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                conn = Client(self.address, authkey=self.authkey or _read_key_file(self.address))
+                break
+            except (OSError, AuthenticationError) as e:
+                # Also covers a key file from a previous writer that is about to be replaced
+                if time.monotonic() >= deadline:
+                    raise WriterUnavailableError(f"Cannot reach the writer at {self.address}: {e}") from e
+                time.sleep(0.05)
+        _local.conn = conn
+        return conn
+
+
+def get_client():
+    """Get the process-wide writer client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = WriterClient(
+                    get_setting('writer', 'address', 'promptops-writer.sock'),
+                    _authkey(),
+                    get_setting('writer', 'timeout', 30.0)
+                )
+    return _client
+
+
+class WriterService:
+    """Owns the database's writes for every worker process
+
+    Each client connection is served by its own thread, which queues the
+    operation and waits for its acknowledgement. A single committer thread
+    takes everything queued (up to batch_size operations, waiting up to
+    batch_window seconds for more) and runs it in one transaction, each
+    operation inside a savepoint so a failing one is rolled back alone.
+    The writer's connection uses synchronous=FULL, so an acknowledged
+    write survives power loss; readers keep using their own WAL snapshots.
+
+    Clients must authenticate: with no authkey, a Unix socket writer
+    generates a random key in an owner-only file next to the socket
+    (key_file), and a TCP address is refused.
+    """
+
+    def __init__(self, address, authkey=None, batch_size=256, batch_window=0.0):
+        global _serving
+        address = parse_address(address)
+        _require_authkey(address, authkey)
+        # From here on this process owns the writes, including any made before start()
+        _serving = True
+        self.address = address
+        self.authkey = authkey
+        self._generated_key = authkey is None
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.batches = 0
+        self.operations = 0
+        self._queue = queue.Queue()
+        self._listener = None
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Listen and start the committer; returns once clients can connect"""
+        for module in OPERATION_MODULES:
+            importlib.import_module(module)
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)  # left behind by a writer that did not shut down
+        if self._generated_key:
+            self.authkey = _write_key_file(self.address)
+        self._listener = Listener(self.address, authkey=self.authkey)
+        self.address = self._listener.address
+        self._threads = [
+            threading.Thread(target=self._accept_loop, args=(self._listener,), name='writer-accept', daemon=True),
+            threading.Thread(target=self._commit_loop, name='writer-commit', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve until interrupted, starting first if needed"""
+        if self._listener is None:
+            self.start()
+        try:
+            self._stopped.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stop accepting, commit what is already queued and close the socket"""
+        global _serving
+        if self._listener is None:
+            return
+        self._stopped.set()
+        self._queue.put(None)
+        try:
+            # Wake the accept loop so it notices the stop. A bare connection is
+            # used because the loop may already have exited, and an
+            # authenticating client would then wait forever for its challenge
+            family = socket.AF_UNIX if isinstance(self.address, str) else socket.AF_INET
+            with socket.socket(family) as sock:
+                sock.connect(self.address)
+        except OSError:
+            pass
+        for thread in self._threads:
+            thread.join()
+        self._listener.close()
+        self._listener = None
+        self._threads = []
+        if self._generated_key:
+            self.authkey = None
+            if os.path.exists(key_file(self.address)):
+                os.remove(key_file(self.address))
+        # Anything queued after the committer stopped is refused
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[3].set_exception(WriterUnavailableError("Writer stopped"))
+        _serving = False
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'operations': self.operations,
+            'queued': self._queue.qsize(),
+            'operations_per_batch': round(self.operations / self.batches, 2) if self.batches else 0.0
+        }
+
+    def _accept_loop(self, listener):
+        while not self._stopped.is_set():
+            try:
+                conn = listener.accept()
+            except AuthenticationError:
+                logger.warning("Writer refused a connection that did not authenticate")
+                continue
+            except (OSError, EOFError):
+                if self._stopped.is_set():
+                    return
+                logger.exception("Writer failed to accept a connection")
+                continue
+            if self._stopped.is_set():
+                conn.close()
+                return
+            threading.Thread(target=self._serve_connection, args=(conn,), name='writer-conn', daemon=True).start()
+
+    def _serve_connection(self, conn):
+        with conn:
+            while True:
+                try:
+                    name, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                future = Future()
+                if self._stopped.is_set():
+                    future.set_exception(WriterUnavailableError("Writer stopped"))
+                else:
+                    self._queue.put((name, args, kwargs, future))
+                try:
+                    reply = (True, future.result())
+                except Exception as e:
+                    reply = (False, e)
+                try:
+                    conn.send(reply)
+                except (OSError, EOFError):
+                    return
+                except Exception as e:
+                    # The result or error could not be pickled
+                    conn.send((False, RuntimeError(f"{name}: {e!r}")))
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            try:
+                timeout = deadline - time.monotonic()
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _commit_loop(self):
+        conn = db.get_connection()
+        conn.execute("PRAGMA synchronous=FULL")
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            outcomes = []
+            try:
+                with db.transaction():
+                    for name, args, kwargs, _ in batch:
+                        outcomes.append(self._run(conn, name, args, kwargs))
+            except Exception as e:
+                outcomes = [(False, e)] * len(batch)
+            self.batches += 1
+            self.operations += len(batch)
+            for (_, _, _, future), (ok, value) in zip(batch, outcomes):
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _run(self, conn, name, args, kwargs):
+        func = OPERATIONS.get(name)
+        if func is None:
+            return False, ValueError(f"Unknown write operation: {name}")
+        conn.execute("SAVEPOINT operation")
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            conn.execute("ROLLBACK TO operation")
+            conn.execute("RELEASE operation")
+            return False, e
+        conn.execute("RELEASE operation")
+        return True, result
+
+
+def create_service():
+    """Writer service configured from the writer settings"""
+    return WriterService(
+        get_setting('writer', 'address', 'promptops-writer.sock'),
+        _authkey(),
+        batch_size=get_setting('writer', 'batch_size', 256),
+        batch_window=get_setting('writer', 'batch_window', 0.0)
+    )
@@ -0,0 +1,14 @@
+-- Secondary indexes on the columns hot queries filter and sort on
+
+CREATE INDEX IF NOT EXISTS idx_user_votes_prompt_id ON user_votes (prompt_id);
+
+CREATE INDEX IF NOT EXISTS idx_user_votes_timestamp ON user_votes (timestamp);
+
+CREATE INDEX IF NOT EXISTS idx_optimized_prompts_created_at ON optimized_prompts (created_at);
+
+CREATE INDEX IF NOT EXISTS idx_template_versions_template_id ON template_versions (template_id);
+
+-- Includes id so active-only keyset pages are served in index order
+CREATE INDEX IF NOT EXISTS idx_templates_is_active ON templates (is_active, id);
+
+PRAGMA optimize;
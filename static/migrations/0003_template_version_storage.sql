@@ -0,0 +1,21 @@
+-- Compact template version history: keyframes and deltas stored compressed in payload
+
+ALTER TABLE template_versions ADD COLUMN seq INTEGER;
+
+ALTER TABLE template_versions ADD COLUMN content_hash TEXT;
+
+-- plain (text in content), full (zlib keyframe), delta (against base_seq) or ref (same content as base_seq)
+ALTER TABLE template_versions ADD COLUMN encoding TEXT NOT NULL DEFAULT 'plain';
+
+ALTER TABLE template_versions ADD COLUMN base_seq INTEGER;
+
+ALTER TABLE template_versions ADD COLUMN payload BLOB;
+
+ALTER TABLE template_versions ADD COLUMN size INTEGER;
+
+-- Deltas applied to rebuild this version from its keyframe
+ALTER TABLE template_versions ADD COLUMN depth INTEGER NOT NULL DEFAULT 0;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_template_versions_seq ON template_versions (template_id, seq);
+
+CREATE INDEX IF NOT EXISTS idx_template_versions_hash ON template_versions (template_id, content_hash);
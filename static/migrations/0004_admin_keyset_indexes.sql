@@ -0,0 +1,20 @@
+-- Indexes ending in the primary key, so admin list views page by (sort column, id) keysets
+
+DROP INDEX IF EXISTS idx_user_votes_timestamp;
+
+CREATE INDEX IF NOT EXISTS idx_user_votes_timestamp ON user_votes (timestamp, id);
+
+-- Serves prompt_id lookups as before, and the admin's prompt_id filter in timestamp order
+DROP INDEX IF EXISTS idx_user_votes_prompt_id;
+
+CREATE INDEX IF NOT EXISTS idx_user_votes_prompt_id ON user_votes (prompt_id, timestamp, id);
+
+DROP INDEX IF EXISTS idx_optimized_prompts_created_at;
+
+CREATE INDEX IF NOT EXISTS idx_optimized_prompts_created_at ON optimized_prompts (created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_templates_created_at ON templates (created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_ab_tests_status ON ab_tests (status, created_at, id);
+
+PRAGMA optimize;
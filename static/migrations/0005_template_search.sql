@@ -0,0 +1,11 @@
+-- Full-text index over template name, description and content
+-- External content: rows are read back from templates by rowid, and kept in sync by the repository's writes
+
+CREATE VIRTUAL TABLE IF NOT EXISTS templates_fts USING fts5(
+    name, description, template_content,
+    content='templates', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+INSERT INTO templates_fts (templates_fts) VALUES ('rebuild');
@@ -0,0 +1,14 @@
+-- MinHash signatures of template content (bands * rows uint32 values), for near-duplicate detection
+CREATE TABLE IF NOT EXISTS template_signatures (
+    template_id TEXT PRIMARY KEY,
+    signature BLOB NOT NULL
+);
+
+-- LSH buckets, one key per signature band: templates sharing any key are compared as
+-- near-duplicate candidates. A template's keys are recomputed from its signature to
+-- remove them, so the table needs no index on template_id
+CREATE TABLE IF NOT EXISTS template_lsh_buckets (
+    bucket INTEGER NOT NULL,
+    template_id TEXT NOT NULL,
+    PRIMARY KEY (bucket, template_id)
+) WITHOUT ROWID;
@@ -0,0 +1,16 @@
+-- Per-prompt vote aggregates, folded in as votes are written, so the leaderboard
+-- never groups user_votes. Scores are computed in Python (prompt_scores.score_row);
+-- python -m src.main rebuild-scores recomputes them from user_votes
+CREATE TABLE IF NOT EXISTS prompt_scores (
+    prompt_id TEXT PRIMARY KEY,
+    vote_count INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    score_sum_squares REAL NOT NULL,
+    bayesian_score REAL NOT NULL,
+    wilson_score REAL NOT NULL
+);
+
+-- Top-k queries walk one of these in score order; vote_count is included so the
+-- min_votes filter is answered from the index
+CREATE INDEX IF NOT EXISTS idx_prompt_scores_bayesian ON prompt_scores (bayesian_score DESC, prompt_id, vote_count);
+CREATE INDEX IF NOT EXISTS idx_prompt_scores_wilson ON prompt_scores (wilson_score DESC, prompt_id, vote_count);
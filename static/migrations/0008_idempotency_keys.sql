@@ -0,0 +1,8 @@
+-- Idempotency keys used by POST /votes/batch, with a fingerprint of the request that
+-- first used each one, so a key reused for a different batch is rejected instead of
+-- being treated as a retry
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
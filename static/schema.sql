@@ -69,4 +69,84 @@ CREATE TABLE IF NOT EXISTS user_votes (
     comment TEXT,
     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (prompt_id) REFERENCES prompts (id)
-);
\ No newline at end of file
+);
+
+-- Analytics summary table, maintained incrementally on write
+CREATE TABLE IF NOT EXISTS analytics_summary (
+    metric TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0,
+    total NUMERIC NOT NULL DEFAULT 0,
+    min_value NUMERIC,
+    max_value NUMERIC
+);
+
+-- Prompts have no writer in the skills layer, so keep their count with triggers
+CREATE TRIGGER IF NOT EXISTS prompts_summary_insert AFTER INSERT ON prompts
+BEGIN
+    INSERT INTO analytics_summary (metric, count) VALUES ('prompts', 1)
+    ON CONFLICT (metric) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS prompts_summary_delete AFTER DELETE ON prompts
+BEGIN
+    UPDATE analytics_summary SET count = count - 1 WHERE metric = 'prompts';
+END;
+
+-- Memoized optimization results keyed by a hash of their inputs
+CREATE TABLE IF NOT EXISTS optimization_cache (
+    cache_key TEXT PRIMARY KEY,
+    result_json TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_optimization_cache_created_at ON optimization_cache (created_at);
+
+-- Sequential test state for A/B tests
+CREATE TABLE IF NOT EXISTS ab_test_state (
+    test_id TEXT PRIMARY KEY,
+    metric TEXT NOT NULL,
+    config_json TEXT,
+    p_value REAL NOT NULL DEFAULT 1.0,
+    winner TEXT,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (test_id) REFERENCES ab_tests (id)
+);
+
+-- Running per-variant statistics for A/B tests (Welford count/mean/M2)
+CREATE TABLE IF NOT EXISTS ab_test_stats (
+    test_id TEXT NOT NULL,
+    arm TEXT NOT NULL,
+    variant_id TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    mean REAL NOT NULL DEFAULT 0,
+    m2 REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (test_id, arm),
+    FOREIGN KEY (test_id) REFERENCES ab_tests (id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ab_test_stats_variant ON ab_test_stats (metric, variant_id);
+
+CREATE INDEX IF NOT EXISTS idx_evaluation_logs_version ON evaluation_logs (version_id);
+
+-- Numeric metrics promoted out of evaluation_logs.metrics_json, clustered for range scans
+CREATE TABLE IF NOT EXISTS evaluation_metrics (
+    name TEXT NOT NULL,
+    version_id TEXT NOT NULL,
+    value REAL NOT NULL,
+    log_id INTEGER NOT NULL,
+    PRIMARY KEY (name, version_id, value, log_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_evaluation_metrics_value ON evaluation_metrics (name, value);
+
+-- Per version and metric rollups, maintained on ingestion
+CREATE TABLE IF NOT EXISTS evaluation_metric_rollups (
+    version_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    total REAL NOT NULL DEFAULT 0,
+    min_value REAL,
+    max_value REAL,
+    PRIMARY KEY (version_id, name)
+);
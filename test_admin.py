@@ -0,0 +1,72 @@
+"""
+Test script for the admin interface
+"""
+
+import os
+import re
+import sys
+import uuid
+sys.path.insert(0, os.path.abspath('.'))
+
+from src.main import initialize_database
+from src.admin.views import create_admin_app
+from src.sdk.context_engine import get_template, list_template_versions
+from src.sdk.smart_rewriter import collect_votes_batch
+
+
+def row_ids(response):
+    return re.findall(r'<td class="col-id">\s*([0-9a-f-]{36})', response.data.decode())
+
+
+def test_admin():
+    print("Testing admin interface...")
+
+    initialize_database()
+    print("✓ Database initialized")
+
+    app = create_admin_app()
+    client = app.test_client()
+    for url in ('/admin/', '/admin/template/', '/admin/abtest/', '/admin/vote/', '/admin/optimizedprompt/'):
+        assert client.get(url).status_code == 200, url
+    print("✓ Every admin view is registered and renders")
+
+    prompt_id = f"admin-{uuid.uuid4()}"
+    collect_votes_batch([{'prompt_id': prompt_id, 'user_id': f"user{i}", 'score': 1 + i % 5} for i in range(120)])
+    pages = [row_ids(client.get(f'/admin/vote/?flt0_0={prompt_id}&page={page}')) for page in range(3)]
+    assert [len(ids) for ids in pages] == [50, 50, 20]
+    assert len(set(sum(pages, []))) == 120
+    # Revisiting a page without its predecessor's bookmark falls back to OFFSET and agrees
+    view = next(v for v in app.extensions['admin'][0]._views if v.endpoint == 'vote')
+    view._bookmarks.clear()
+    assert row_ids(client.get(f'/admin/vote/?flt0_0={prompt_id}&page=2')) == pages[2]
+    print("✓ Vote pages are read by keyset and cover every row once")
+
+    # Past count_limit the total is unknown and paging continues without one
+    view.count_limit, view._counts = 100, type(view._counts)()
+    assert view.get_list(2, None, None, None, [(0, 'prompt_id', prompt_id)])[0] is None
+    assert row_ids(client.get(f'/admin/vote/?flt0_0={prompt_id}&page=2')) == pages[2]
+    print("✓ Views with more rows than count_limit page without a total")
+
+    name = f"Admin {uuid.uuid4()}"
+    response = client.post('/admin/template/new/',
+                           data={'name': name, 'description': '', 'template_content': 'Hi {name}', 'is_active': 'y'})
+    assert response.status_code == 302
+    template_id = next(i for i in row_ids(client.get('/admin/template/')) if get_template(i)['name'] == name)
+    assert get_template(template_id)['is_active']
+    client.post(f'/admin/template/edit/?id={template_id}',
+                data={'name': name, 'description': 'edited', 'template_content': 'Hello {name}'})
+    assert get_template(template_id)['content'] == 'Hello {name}'
+    assert [v['version'] for v in list_template_versions(template_id)] == [1, 2]
+    assert not get_template(template_id)['is_active']  # the unchecked box deactivates it
+    client.post('/admin/template/delete/', data={'id': template_id})
+    assert get_template(template_id) is None
+    print("✓ Template edits go through the context engine and are versioned")
+
+    assert client.get('/admin/vote/new/').status_code in (302, 403)
+    print("✓ Votes are read-only in the admin")
+
+    print("\nAdmin tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_admin()
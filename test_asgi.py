@@ -0,0 +1,81 @@
+"""
+Test script for the ASGI serving mode
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+sys.path.insert(0, os.path.abspath('.'))
+
+from src.main import initialize_database
+from src.api.routes import create_app
+from src.sdk.aio import AsyncContextEngine
+
+try:
+    from starlette.testclient import TestClient
+    from src.api.asgi import create_asgi_app
+except ImportError:  # starlette (and httpx for its test client) are optional
+    TestClient = None
+
+
+def test_asgi():
+    print("Testing ASGI serving mode...")
+
+    initialize_database()
+    print("✓ Database initialized")
+
+    # Async SDK calls run in the skill pool
+    async def create_and_read():
+        engine = AsyncContextEngine()
+        result = await engine.create_template("Async", "", "Hello {name}")
+        renders = await asyncio.gather(*(engine.render_template(result['template_id'], {'name': i}) for i in range(20)))
+        await engine.delete_template(result['template_id'])
+        return renders
+    assert asyncio.run(create_and_read()) == [f"Hello {i}" for i in range(20)]
+    print("✓ Async SDK runs skills off the event loop")
+
+    if TestClient is None:
+        print("- starlette not installed; skipping ASGI route checks")
+        return
+
+    flask_client = create_app().test_client()
+    with TestClient(create_asgi_app()) as client:
+        created = client.post('/templates', json={'name': 'ASGI', 'content': f'Hi {{name}} {uuid.uuid4()}'}).json()
+        template_id = created['template_id']
+        response = client.get(f'/templates/{template_id}')
+        assert response.json() == flask_client.get(f'/templates/{template_id}').json
+        assert client.get(f'/templates/{template_id}', headers={'If-None-Match': response.headers['etag']}).status_code == 304
+        assert client.get(f'/templates/{uuid.uuid4()}').status_code == 404
+
+        rendered = client.post(f'/templates/{template_id}/render/batch', json={'variable_sets': [{'name': 'a'}, {}]}).json()
+        assert rendered['outputs'][0].startswith('Hi a ') and rendered['errors'][0]['index'] == 1
+        assert client.post(f'/templates/{template_id}/render', json={'variables': {}}).status_code == 400
+
+        page = client.get('/templates?limit=1&fields=name').json()
+        assert set(page['templates'][0]) == {'id', 'name'}
+        assert client.get('/templates?fields=bogus').status_code == 400
+        lines = client.get('/templates?format=ndjson&fields=name').text.splitlines()
+        assert len(lines) == len(flask_client.get('/templates').json)
+
+        client.put(f'/templates/{template_id}', json={'content': 'Bye {name}'})
+        assert [v['version'] for v in client.get(f'/templates/{template_id}/versions').json()] == [1, 2]
+        assert client.post(f'/templates/{template_id}/rollback', json={'version': 1}).json()['version'] == 3
+
+        prompt_id = f"asgi-{uuid.uuid4()}"
+        votes = [{'prompt_id': prompt_id, 'user_id': f"user{i}", 'score': 5} for i in range(10)]
+        assert client.post('/votes/batch', json={'votes': votes}).json()['inserted'] == 10
+        assert client.post('/votes/batch', json={'votes': [{'prompt_id': prompt_id, 'score': 9}]}).status_code == 400
+        assert client.post('/votes', json={'prompt_id': prompt_id, 'user_id': 'u', 'score': "4"}).status_code == 400
+        headers = {'Idempotency-Key': str(uuid.uuid4())}
+        assert client.post('/votes/batch', json={'votes': votes}, headers=headers).status_code == 200
+        assert client.post('/votes/batch', json={'votes': votes[:5]}, headers=headers).status_code == 409
+        assert client.get('/analytics').json() == flask_client.get('/analytics').json
+        client.delete(f'/templates/{template_id}')
+    print("✓ ASGI routes match the Flask API")
+
+    print("\nASGI serving tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_asgi()
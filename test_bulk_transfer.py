@@ -0,0 +1,138 @@
+"""
+Test script for streaming bulk import and export
+"""
+
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import uuid
+sys.path.insert(0, os.path.abspath('.'))
+
+from src import db, repositories
+from src.main import initialize_database, main
+from src.repositories.memory import MemoryRepository
+from src.repositories.sqlite import SQLiteRepository
+from src.skills.bulk_transfer import export_jsonl, import_jsonl, iter_lines
+
+
+def export_records(kind, **options):
+    data = b''.join(export_jsonl(kind, **options))
+    if options.get('compress'):
+        data = gzip.decompress(data)
+    return [json.loads(line) for line in data.splitlines()]
+
+
+def jsonl(records, compress=False):
+    data = ''.join(json.dumps(record) + '\n' for record in records).encode()
+    return gzip.compress(data) if compress else data
+
+
+def check_round_trip(source, target):
+    """Export everything from the source database and import it into the target"""
+    repositories.configure(source)
+    templates = [{'name': f"bulk {i}", 'content': f"Hello {{name}} {i}"} for i in range(25)]
+    votes = [{'prompt_id': f"bulk-{i % 3}", 'user_id': f"user{i}", 'score': 1 + i % 5} for i in range(40)]
+    stats = import_jsonl('templates', io.BytesIO(jsonl(templates, compress=True)), batch_size=10)
+    assert stats == {'kind': 'templates', 'read': 25, 'imported': 25, 'skipped': 0, 'batches': 3}
+    assert import_jsonl('votes', io.BytesIO(jsonl(votes)))['imported'] == 40
+
+    exported_templates = export_records('templates', compress=True)
+    exported_votes = export_records('votes', page_size=7)
+    assert len(exported_templates) == 25 and len(exported_votes) == 40
+    assert [t['id'] for t in exported_templates] == sorted(t['id'] for t in exported_templates)
+    assert export_records('votes') == exported_votes
+
+    repositories.configure(target)
+    stats = import_jsonl('templates', io.BytesIO(jsonl(exported_templates)))
+    assert stats['imported'] == 25
+    import_jsonl('votes', io.BytesIO(jsonl(exported_votes, compress=True)), batch_size=16)
+    assert export_records('templates') == exported_templates
+    assert export_records('votes') == exported_votes
+    assert target.latest_version(exported_templates[0]['id']) == 1
+    assert target.read_summary()['votes'][0] == 40
+
+    # Re-running an import skips everything already stored
+    stats = import_jsonl('votes', io.BytesIO(jsonl(exported_votes)))
+    assert (stats['imported'], stats['skipped']) == (0, 40)
+
+    # An id repeated within one import is stored once
+    vote = {'id': str(uuid.uuid4()), 'prompt_id': 'bulk-repeat', 'user_id': 'u', 'score': 3}
+    stats = import_jsonl('votes', io.BytesIO(jsonl([vote] * 3)))
+    assert (stats['imported'], stats['skipped']) == (1, 2)
+    template = dict(exported_templates[0], id=str(uuid.uuid4()))
+    stats = import_jsonl('templates', io.BytesIO(jsonl([template, dict(template, name="second copy")])))
+    assert (stats['imported'], stats['skipped']) == (1, 1)
+    assert target.get_template(template['id'])['name'] == template['name']
+    assert [row['id'] for row in target.select_templates(['id'])].count(template['id']) == 1
+
+
+def test_bulk_transfer():
+    print("Testing bulk import and export...")
+
+    assert list(iter_lines(io.BytesIO(b'a\nb\n\nc'), chunk_size=1)) == [b'a', b'b', b'', b'c']
+    two_members = gzip.compress(b'a\nb') + gzip.compress(b'\nc\n')
+    assert list(iter_lines(io.BytesIO(two_members), chunk_size=3)) == [b'a', b'b', b'c']
+    print("✓ Lines are split across chunks and concatenated gzip members")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'bulk.db'))
+        initialize_database()
+        try:
+            check_round_trip(SQLiteRepository(), MemoryRepository())
+            print("✓ SQLite export imports into the memory repository")
+            repositories.configure(None)
+
+            db.configure(os.path.join(tmp, 'target.db'))
+            initialize_database()
+            check_round_trip(MemoryRepository(), SQLiteRepository())
+            print("✓ Memory export imports into SQLite and re-imports are skipped")
+            repositories.configure(None)
+
+            lines = jsonl([{'name': 'good', 'content': 'x'}]) + b'{"name": "bad"}\n'
+            try:
+                import_jsonl('templates', io.BytesIO(lines))
+                assert False, "invalid records should be rejected"
+            except ValueError as e:
+                assert 'line 2' in str(e) and 'content' in str(e)
+            try:
+                import_jsonl('widgets', io.BytesIO(b''))
+                assert False, "unknown kinds should be rejected"
+            except ValueError:
+                pass
+            print("✓ Invalid records report their line number")
+
+            from src.api.routes import create_app
+            client = create_app().test_client()
+            prompt_id = f"bulk-api-{uuid.uuid4()}"
+            body = jsonl([{'prompt_id': prompt_id, 'user_id': f"u{i}", 'score': 4} for i in range(5)], compress=True)
+            response = client.post('/bulk/votes?batch_size=2', data=body)
+            assert response.status_code == 200 and response.get_json()['imported'] == 5
+            assert client.post('/bulk/votes', data=b'not json\n').status_code == 400
+            assert client.get('/bulk/widgets').status_code == 404
+
+            response = client.get('/bulk/votes?gzip=true')
+            assert response.mimetype == 'application/gzip'
+            exported = [json.loads(line) for line in gzip.decompress(response.data).splitlines()]
+            assert sum(vote['prompt_id'] == prompt_id for vote in exported) == 5
+            assert client.get('/bulk/templates').mimetype == 'application/x-ndjson'
+            print("✓ API streams exports and imports request bodies")
+
+            path = os.path.join(tmp, 'templates.jsonl.gz')
+            main(['export', 'templates', path])
+            db.configure(os.path.join(tmp, 'cli.db'))
+            main(['import', 'templates', path, '--batch-size', '10'])
+            repositories.configure(None)
+            assert len(export_records('templates')) == 26
+            print("✓ CLI exports to and imports from gzip files")
+        finally:
+            repositories.configure(None)
+            db.configure(None)
+
+    print("\nBulk transfer tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_bulk_transfer()
@@ -7,7 +7,29 @@ import sys
 sys.path.insert(0, os.path.abspath('.'))
 
 from src.main import initialize_database
-from src.sdk.context_engine import ContextEngine, create_template, list_templates, optimize_templates
+from src.sdk.context_engine import ContextEngine, create_template, list_templates, list_templates_page, optimize_templates
+from src.api.routes import create_app
+from src.sdk.context_engine import batch_executor
+from src.skills.optimizer_backends import LocalBackend
+import subprocess
+import threading
+import time
+import uuid
+
+
+class FlakyBackend(LocalBackend):
+    """Fails on one prompt and stalls on another until released"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def optimize(self, original_prompt, context=None, performance_data=None):
+        if original_prompt.startswith("fail"):
+            raise RuntimeError("backend error")
+        if original_prompt.startswith("slow"):
+            self.release.wait(5.0)
+        return super().optimize(original_prompt, context, performance_data)
 
 
 def test_context_engine():
@@ -55,6 +77,114 @@ def test_context_engine():
     })
     print(f"✓ Context optimization for all active templates: {len(all_optimization_results)} optimizations")
     
+    # Test template cache invalidation and conditional GETs
+    template_id = result['template_id']
+    first = context_engine.get_template(template_id)
+    hits = context_engine.cache.stats()['hits']
+    assert context_engine.get_template(template_id) == first
+    assert context_engine.cache.stats()['hits'] == hits + 1
+    context_engine.update_template(template_id, content="Updated context template with {variable}.")
+    assert context_engine.get_template(template_id)['content'] == "Updated context template with {variable}."
+    print("✓ Template cache serves hits and is invalidated on update")
+    
+    client = create_app().test_client()
+    response = client.get(f'/templates/{template_id}')
+    etag = response.headers['ETag']
+    not_modified = client.get(f'/templates/{template_id}', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304 and not_modified.data == b''
+    print("✓ Conditional GET returns 304 for an unchanged template")
+    
+    # Test compiled rendering, single and batch
+    assert context_engine.render_template(template_id, {'variable': 'X'}) == "Updated context template with X."
+    response = client.post(f'/templates/{template_id}/render/batch', json={
+        'variable_sets': [{'variable': i} for i in range(1000)] + [{}]
+    })
+    assert response.json['outputs'][999] == "Updated context template with 999."
+    assert response.json['outputs'][1000] is None
+    assert response.json['errors'] == [{'index': 1000, 'error': 'Missing variables: variable'}]
+    response = client.post(f'/templates/{template_id}/render', json={'variables': {'variable': 1, 'extra': 2}, 'strict': True})
+    assert response.status_code == 400
+    print("✓ Templates render singly and in batches with variable validation")
+    
+    # Test keyset pagination with projection
+    paged_ids, after = [], None
+    while True:
+        page = list_templates_page(after=after, limit=2, fields=['name'])
+        assert all(set(row) == {'id', 'name'} for row in page['templates'])
+        paged_ids.extend(row['id'] for row in page['templates'])
+        after = page['next_after']
+        if after is None:
+            break
+    assert paged_ids == sorted(tmpl['id'] for tmpl in list_templates())
+    print(f"✓ Keyset pagination walked {len(paged_ids)} templates")
+
+    # Test compact version history, diff and rollback
+    lines = [f"Line {i} of a long template with {{variable}}.\n" for i in range(200)]
+    history = [''.join(lines)]
+    versioned_id = create_template(name="Versioned", description="", content=history[0])['template_id']
+    for edit in range(40):
+        lines[edit * 5] = f"Edited line {edit}.\n"
+        history.append(''.join(lines))
+        context_engine.update_template(versioned_id, content=history[-1])
+    versions = context_engine.list_template_versions(versioned_id)
+    assert [v['version'] for v in versions] == list(range(1, 42))
+    assert {v['encoding'] for v in versions} == {'full', 'delta'}
+    for number in (1, 16, 17, 41):
+        assert context_engine.get_template_version(versioned_id, number)['content'] == history[number - 1]
+    stored = context_engine.diff_template_versions(versioned_id, 40, 41)
+    assert "-Line 195 of" in stored and "+Edited line 39." in stored
+    response = client.post(f'/templates/{versioned_id}/rollback', json={'version': 1})
+    assert response.json['version'] == 42
+    assert context_engine.get_template(versioned_id)['content'] == history[0]
+    assert client.get(f'/templates/{versioned_id}/versions').json[-1]['encoding'] == 'ref'
+    assert client.get(f'/templates/{versioned_id}/versions/99').status_code == 404
+    assert client.get(f'/templates/{versioned_id}/diff?from=1&to=42').json['diff'] == ''
+    context_engine.delete_template(versioned_id)
+    assert context_engine.list_template_versions(versioned_id) == []
+    print("✓ Template versions are delta-encoded, diffable and restorable")
+
+    # Test concurrent optimization with partial failures and timeouts
+    # Unique contents so memoized results from earlier runs don't apply
+    run_id = uuid.uuid4()
+    ids = [create_template(name="Batch", description="", content=f"{content}-{run_id}")['template_id']
+           for content in ("ok", "fail", "slow")]
+    backend = FlakyBackend()
+    batch_results = context_engine.optimize_templates(ids, max_workers=3, timeout=0.3, backend=backend)
+    assert [item['template_id'] for item in batch_results] == ids
+    assert 'optimization_result' in batch_results[0]
+    assert batch_results[1]['error'] == "backend error"
+    assert 'exceeded' in batch_results[2]['error']
+    for template_id in ids:
+        context_engine.delete_template(template_id)
+    print("✓ Concurrent optimization returns partial results on failure and timeout")
+
+    # Items queued behind timed-out ones are reported as never started, not as timeouts
+    ids = [create_template(name="Batch", description="", content=f"slow-{n}-{run_id}")['template_id'] for n in range(3)]
+    batch_results = context_engine.optimize_templates(ids, max_workers=1, timeout=0.2, backend=backend)
+    assert 'exceeded' in batch_results[0]['error']
+    assert all('not started' in item['error'] for item in batch_results[1:])
+    print("✓ Items that never started are reported separately from timeouts")
+
+    # Batches share one pool, whose threads outlive each call
+    workers = lambda: {thread for thread, _ in batch_executor.run_batch(
+        lambda item: threading.current_thread(), range(20), max_workers=4, timeout=5)}
+    assert len(workers() | workers()) <= 4
+    # Let the timed-out items finish before the next test swaps the database
+    backend.release.set()
+    batch_executor.shutdown()
+    for template_id in ids:
+        context_engine.delete_template(template_id)
+    print("✓ Batches reuse the shared worker pool")
+
+    # A fresh interpreter shows what importing the SDK and the CLI pulls in
+    loaded = subprocess.run([sys.executable, '-c', (
+        "import sys; from src.sdk.context_engine import ContextEngine; import src.main; "
+        "print(' '.join(sorted(sys.modules)))"
+    )], capture_output=True, text=True, check=True).stdout.split()
+    for module in ('flask', 'sqlalchemy', 'flask_admin', 'src.skills.run_ab_test', 'src.skills.generate_optimization'):
+        assert module not in loaded, module
+    print("✓ Importing ContextEngine and the CLI leaves the API, admin and unused skills unloaded")
+    
     print("\nContext Engine Module tests completed successfully!")
 
 
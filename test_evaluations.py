@@ -0,0 +1,66 @@
+"""
+Test script for evaluation log ingestion
+"""
+
+import os
+import sys
+import uuid
+sys.path.insert(0, os.path.abspath('.'))
+
+from src.main import initialize_database
+from src.api.routes import create_app
+from src.sdk.smart_rewriter import log_evaluations, get_evaluation_metrics, query_evaluations
+
+
+def test_evaluations():
+    print("Testing evaluation log ingestion...")
+
+    initialize_database()
+    print("✓ Database initialized")
+
+    version_id = f"version-{uuid.uuid4()}"
+    logs = [
+        {
+            'version_id': version_id,
+            'response': f"response {i}",
+            'metrics': {'accuracy': i / 1000, 'latency_ms': 100 + i % 50, 'label': 'text'},
+            'human_score': 1 + i % 5
+        } for i in range(2500)
+    ]
+    result = log_evaluations(logs)
+    assert result['inserted'] == 2500
+    assert result['last_id'] - result['first_id'] == 2499
+    print(f"✓ Logs ingested: {result['inserted']}")
+
+    metrics = {row['metric']: row for row in get_evaluation_metrics(version_id=version_id)}
+    assert set(metrics) == {'accuracy', 'latency_ms'}  # the promoted_metrics default
+    assert metrics['accuracy']['count'] == 2500
+    assert abs(metrics['accuracy']['mean'] - 1.2495) < 1e-9
+    assert metrics['latency_ms']['min'] == 100 and metrics['latency_ms']['max'] == 149
+    print("✓ Metric rollups aggregated per version")
+
+    top = query_evaluations('accuracy', version_id=version_id, min_value=2.49, limit=5)
+    assert [row['accuracy'] for row in top] == [2.499, 2.498, 2.497, 2.496, 2.495]
+    print("✓ Logs filtered by metric value through the index")
+
+    client = create_app().test_client()
+    response = client.post('/evaluations/batch', json={'logs': logs[:10]})
+    assert response.json['inserted'] == 10
+    response = client.get(f'/evaluations/metrics?version_id={version_id}&metric=accuracy')
+    assert response.json[0]['count'] == 2510
+    print("✓ Evaluation endpoints ingest and aggregate")
+
+    assert client.post('/evaluations/batch', json={'entries': logs[:1]}).status_code == 400
+    assert client.post('/evaluations/batch', data='not json', content_type='application/json').status_code == 400
+    response = client.post('/evaluations/batch', json={'logs': [logs[0], {'metrics_json': '{broken'}]})
+    assert response.status_code == 400 and 'index 1' in response.json['error']
+    for human_score in ("good", True, [4]):
+        response = client.post('/evaluations/batch', json={'logs': [dict(logs[0], human_score=human_score)]})
+        assert response.status_code == 400 and 'human_score' in response.json['error']
+    print("✓ Malformed evaluation batches are rejected with 400")
+
+    print("\nEvaluation log ingestion tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_evaluations()
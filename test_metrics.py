@@ -0,0 +1,58 @@
+"""
+Test script for latency instrumentation and the metrics endpoint
+"""
+
+import os
+import sys
+import uuid
+sys.path.insert(0, os.path.abspath('.'))
+
+from src.main import initialize_database
+from src.api.routes import create_app
+from src import metrics
+from src.db import get_connection
+from src.sdk.context_engine import create_template, get_template
+
+
+def test_metrics():
+    print("Testing metrics instrumentation...")
+
+    initialize_database()
+    print("✓ Database initialized")
+
+    assert metrics.statement_label("UPDATE templates SET name = ?") == "UPDATE templates"
+    assert metrics.statement_label("INSERT OR REPLACE INTO optimization_cache VALUES (?)") == "INSERT optimization_cache"
+    assert metrics.statement_label("SELECT COUNT(*) FROM user_votes WHERE prompt_id = ?") == "SELECT user_votes"
+    print("✓ SQL statements are labelled by operation and table")
+
+    skill_calls = metrics.SKILL_LATENCY.count('manage_templates.create')
+    template_id = create_template("Metrics", "", f"Content {uuid.uuid4()}")['template_id']
+    assert metrics.SKILL_LATENCY.count('manage_templates.create') == skill_calls + 1
+    assert metrics.SQL_LATENCY.count('INSERT templates') >= 1
+    try:
+        get_connection().execute("SELECT * FROM missing_table")
+    except Exception:
+        pass
+    assert metrics.SQL_ERRORS.value('SELECT missing_table') >= 1
+    print("✓ Skill calls and SQL statements are timed")
+
+    client = create_app().test_client()
+    client.get(f'/templates/{template_id}')
+    client.get(f'/templates/{template_id}')
+    get_template(template_id)
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    body = response.data.decode()
+    assert 'promptops_http_request_duration_seconds_count{method="GET",route="/templates/<template_id>",status="200"}' in body
+    assert 'promptops_skill_duration_seconds_bucket{skill="manage_templates.get",le="+Inf"}' in body
+    assert 'promptops_cache_hit_ratio{cache="templates"}' in body
+    for line in body.splitlines():
+        assert line.startswith('#') or len(line.rsplit(' ', 1)) == 2
+    print("✓ GET /metrics exposes route, skill, SQL and cache metrics")
+
+    client.delete(f'/templates/{template_id}')
+    print("\nMetrics tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_metrics()
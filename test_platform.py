@@ -2,6 +2,9 @@
 Test script for PromptOps platform
 """
 
+import os
+
+from src.config import get_config
 from src.main import initialize_database
 from src.sdk.context_engine import ContextEngine, create_template, list_templates, optimize_templates
 from src.sdk.smart_rewriter import SmartRewriter, generate_optimization, get_analytics
@@ -12,6 +15,19 @@ def test_platform():
     # Initialize database
     initialize_database()
     print("✓ Database initialized")
+
+    # Migrations are found beside the schema file, whatever the working directory
+    from src.migrations import current_version, discover_migrations
+    database = get_config()['database']
+    previous, cwd = database['schema_file'], os.getcwd()
+    database['schema_file'] = os.path.abspath(previous)
+    os.chdir(os.path.dirname(cwd))
+    try:
+        assert current_version() == discover_migrations()[-1][0] > 1
+    finally:
+        os.chdir(cwd)
+        database['schema_file'] = previous
+    print("✓ Migrations resolve relative to the schema file")
     
     # Test Context Engine
     context_engine = ContextEngine()
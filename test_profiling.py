@@ -0,0 +1,75 @@
+"""
+Test script for on-demand request profiling
+"""
+
+import os
+import sys
+import tempfile
+import uuid
+sys.path.insert(0, os.path.abspath('.'))
+
+from src.main import initialize_database
+from src.api.routes import create_app
+from src import profiling
+from src.config import get_config
+from src.sdk.context_engine import create_template
+
+
+def test_profiling():
+    print("Testing request profiling...")
+
+    initialize_database()
+    print("✓ Database initialized")
+
+    profiler = profiling.get_profiler()
+    assert profiler.select({'X-Profile': 'cprofile'}, '/optimize-context') is None
+    assert profiling.propagate(len) is len
+    client = create_app().test_client()
+    assert client.get('/profiling').status_code == 404
+    assert client.put('/profiling', json={'sample_rate': 1.0}).status_code == 404
+    assert profiler.sample_rate == 0.0
+    print("✓ Nothing is profiled, wrapped or exposed by default")
+
+    output_dir = profiler.output_dir
+    settings = get_config()['profiling']
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler.output_dir = tmp
+        profiler.header = 'X-Profile'
+        settings['runtime_api'] = True
+        template_ids = [create_template("Profiled", "", f"Content {uuid.uuid4()} {{variable}}")['template_id']
+                        for _ in range(3)]
+
+        response = client.post('/optimize-context', json={'template_ids': template_ids},
+                               headers={profiler.header: 'cprofile'})
+        assert response.status_code == 200
+        profile_id = response.headers['X-Profile-Id']
+        with open(os.path.join(tmp, f"{profile_id}.txt")) as f:
+            summary = f.read()
+        assert 'POST /optimize-context' in summary and 'generate_optimization' in summary
+        print("✓ X-Profile header captures cProfile stats including worker threads")
+
+        response = client.get(f'/templates/{template_ids[0]}', headers={profiler.header: '1'})
+        assert os.path.exists(os.path.join(tmp, f"{response.headers['X-Profile-Id']}.folded"))
+        assert 'X-Profile-Id' not in client.get(f'/templates/{template_ids[0]}').headers
+        print("✓ Sampled stacks are written as collapsed-stack files")
+
+        assert client.put('/profiling', json={'sample_rate': 2}).status_code == 400
+        settings = client.put('/profiling', json={'sample_rate': 1.0, 'routes': ['/templates/<template_id>']}).json
+        assert settings['sample_rate'] == 1.0
+        assert 'X-Profile-Id' in client.get(f'/templates/{template_ids[0]}').headers
+        assert 'X-Profile-Id' not in client.get('/analytics').headers
+        client.put('/profiling', json={'sample_rate': 0.0, 'routes': []})
+        assert len(client.get('/profiling').json['recent']) == 4
+        print("✓ PUT /profiling samples matching routes at runtime")
+
+        for template_id in template_ids:
+            client.delete(f'/templates/{template_id}')
+        profiler.output_dir = output_dir
+        profiler.header = ''
+        settings['runtime_api'] = False
+
+    print("\nProfiling tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_profiling()
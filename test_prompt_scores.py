@@ -0,0 +1,118 @@
+"""
+Test script for the per-prompt vote leaderboard
+"""
+
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, os.path.abspath('.'))
+
+from src import db, repositories
+from src.api.routes import create_app
+from src.main import initialize_database, main
+from src.repositories.memory import MemoryRepository
+from src.sdk.smart_rewriter import (collect_votes, collect_votes_batch, get_prompt_score, import_votes, top_prompts,
+                                    SmartRewriter)
+from src.skills.prompt_scores import ensure_prompt_scores, score_row, wilson_lower_bound
+
+
+def expected_scores(votes):
+    by_prompt = {}
+    for prompt_id, score in votes:
+        by_prompt.setdefault(prompt_id, []).append(score)
+    return {prompt_id: score_row(prompt_id, len(scores), sum(scores), sum(s * s for s in scores))
+            for prompt_id, scores in by_prompt.items()}
+
+
+def check_leaderboard():
+    rng = random.Random(5)
+    votes = [('great', 5)] * 40 + [('great', 4)] * 10 + [('lucky', 5)] * 2 + [('poor', 1)] * 30 + [('poor', 2)] * 5
+    votes += [(f"p{rng.randrange(30)}", rng.randint(1, 5)) for _ in range(300)]
+    rng.shuffle(votes)
+    collect_votes(*votes[0][:1], 'first', votes[0][1])
+    collect_votes_batch([{'prompt_id': p, 'user_id': f"u{i}", 'score': s} for i, (p, s) in enumerate(votes[1:200])])
+    import_votes(io.BytesIO(''.join(json.dumps({'prompt_id': p, 'user_id': f"v{i}", 'score': s}) + '\n'
+                                    for i, (p, s) in enumerate(votes[200:])).encode()))
+
+    expected = expected_scores(votes)
+    great = get_prompt_score('great')
+    assert great['votes'] == 50 and great['mean'] == 4.8
+    assert math.isclose(great['stddev'], 0.4)
+    assert great['bayesian_score'] == round(expected['great'][4], 4)
+    assert get_prompt_score('missing') is None
+
+    # Two perfect votes don't outrank fifty mostly perfect ones
+    top = top_prompts(k=3)
+    assert [prompt['prompt_id'] for prompt in top][:1] == ['great'] and top[0]['rank'] == 1
+    assert [p['prompt_id'] for p in top] == sorted(expected, key=lambda p: (-expected[p][4], p))[:3]
+    wilson = top_prompts(k=50, by='wilson')
+    assert [p['prompt_id'] for p in wilson] == sorted(expected, key=lambda p: (-expected[p][5], p))[:len(wilson)]
+    assert top_prompts(k=100, min_votes=3)[-1]['prompt_id'] == 'poor'
+    assert 'lucky' not in {p['prompt_id'] for p in top_prompts(k=100, min_votes=3)}
+    assert all(p['votes'] >= 30 for p in top_prompts(k=100, min_votes=30))
+    try:
+        top_prompts(by='median')
+        assert False, "unknown rankings should be rejected"
+    except ValueError:
+        pass
+    return expected
+
+
+def test_prompt_scores():
+    print("Testing prompt leaderboard...")
+
+    assert wilson_lower_bound(0, 0) == 0.0
+    assert wilson_lower_bound(100, 500) > wilson_lower_bound(2, 10) > 0.3
+    assert 0 <= wilson_lower_bound(10, 10) < 0.01
+    print("✓ Wilson lower bounds favour prompts with more evidence")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'scores.db'))
+        initialize_database()
+        try:
+            expected = check_leaderboard()
+            print("✓ SQLite aggregates follow single, batch and bulk votes")
+
+            memory = MemoryRepository()
+            repositories.configure(memory)
+            check_leaderboard()
+            assert not memory.prompt_scores_missing()
+            ensure_prompt_scores()
+            print("✓ Memory repository ranks prompts the same way")
+            repositories.configure(None)
+
+            client = create_app().test_client()
+            response = client.get('/prompts/top?k=2&min_votes=10')
+            assert response.status_code == 200 and [p['prompt_id'] for p in response.get_json()][0] == 'great'
+            assert len(response.get_json()) == 2
+            assert client.get('/prompts/top?by=median').status_code == 400
+            assert client.get('/prompts/great/score').get_json()['votes'] == 50
+            assert client.get('/prompts/missing/score').status_code == 404
+            print("✓ API serves the leaderboard and per-prompt scores")
+
+            conn = db.get_connection()
+            conn.execute("DELETE FROM prompt_scores")
+            conn.commit()
+            assert repositories.get_repository().prompt_scores_missing()
+            initialize_database()
+            assert get_prompt_score('great')['votes'] == 50
+            conn.execute("UPDATE prompt_scores SET vote_count = 0")
+            conn.commit()
+            main(['rebuild-scores'])
+            assert SmartRewriter().rebuild_prompt_scores() == len(expected)
+            stored = {row[0]: row for row in conn.execute("SELECT * FROM prompt_scores")}
+            assert all(math.isclose(stored[p][4], expected[p][4]) for p in expected)
+            print("✓ Leaderboard is backfilled and rebuilt from user_votes")
+        finally:
+            repositories.configure(None)
+            db.configure(None)
+
+    print("\nPrompt leaderboard tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_prompt_scores()
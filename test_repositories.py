@@ -0,0 +1,193 @@
+"""
+Conformance tests shared by the SQLite and in-memory repositories
+"""
+
+from datetime import datetime
+import os
+import sys
+import tempfile
+import uuid
+sys.path.insert(0, os.path.abspath('.'))
+
+from src import db, repositories
+from src.main import initialize_database
+from src.repositories.memory import MemoryRepository
+from src.repositories.sqlite import SQLiteRepository
+from src.skills.collect_votes import _vote_row
+
+
+def check_templates(repository):
+    template_id = repository.create_template("Greeting", "says hi", "Hello {name}")
+    template = repository.get_template(template_id)
+    assert template['name'] == "Greeting" and template['content'] == "Hello {name}"
+    assert template['is_active'] == 1 and isinstance(template['created_at'], str)
+    assert repository.get_template(str(uuid.uuid4())) is None
+
+    assert repository.update_template(template_id, content="Hi {name}")
+    assert repository.update_template(template_id, name="Greeting 2")
+    assert not repository.update_template(str(uuid.uuid4()), name="missing")
+    template = repository.get_template(template_id)
+    assert (template['name'], template['description'], template['content']) == ("Greeting 2", "says hi", "Hi {name}")
+
+    assert repository.latest_version(template_id) == 2
+    assert [version['version'] for version in repository.list_versions(template_id)] == [1, 2]
+    assert repository.get_version(template_id, 1) == "Hello {name}"
+    assert repository.get_version(template_id, 3) is None
+
+    ids = sorted(repository.create_template(f"t{i}", "", f"content {i}") for i in range(5))
+    selected = [row['id'] for row in repository.select_templates(['id', 'name']) if row['id'] in ids]
+    assert selected == ids
+    page = list(repository.select_templates(['id', 'content'], after=ids[1], limit=2))
+    assert [row['id'] for row in page] == sorted(i for i in ids + [template_id] if i > ids[1])[:2]
+    assert set(page[0]) == {'id', 'content'}
+    assert all(row['is_active'] for row in repository.select_templates(['id', 'is_active'], is_active=True))
+
+    found = repository.get_templates(ids[:2] + [str(uuid.uuid4())], ['id', 'name'])
+    assert sorted(found) == ids[:2] and found[ids[0]]['name'].startswith('t')
+
+    assert repository.delete_template(template_id)
+    assert repository.get_template(template_id) is None and repository.list_versions(template_id) == []
+    assert not repository.delete_template(template_id)
+
+
+def check_votes_and_summary(repository):
+    assert not repository.summary_missing()
+    key = str(uuid.uuid4())
+    assert repository.claim_idempotency_key(key, 'first') == 'first'
+    assert repository.claim_idempotency_key(key, 'second') == 'first'
+    before = repository.read_summary()['votes']
+    rows = [_vote_row('conformance', f"user{i}", score) for i, score in enumerate((2, 5, 3))]
+    with repository.transaction():
+        assert len(repository.add_votes(rows)) == 3
+    stored = repository.add_votes(rows[:1] + [_vote_row('conformance', 'late', 1)], deduplicate=True)
+    assert [row[2] for row in stored] == ['late']
+    vote_ids = [row[0] for row in repository.select_votes()]
+    assert vote_ids == sorted(vote_ids) and len(vote_ids) >= 4
+    assert [row[0] for row in repository.select_votes(after=vote_ids[0], limit=2)] == vote_ids[1:3]
+
+    count, total, low, high = repository.read_summary()['votes']
+    assert count == before[0] + 4 and total == before[1] + 11
+    assert low == (1 if before[2] is None else min(before[2], 1))
+
+    repository.add_optimization(str(uuid.uuid4()), "OPTIMIZED: x", 0.5)
+    summary = repository.read_summary()
+    repository.rebuild_summary()
+    assert repository.read_summary()['votes'] == summary['votes']
+    assert repository.read_summary()['optimizations'][0] == summary['optimizations'][0]
+
+
+def check_ab_tests(repository):
+    test_id = str(uuid.uuid4())
+    variants = (f"a-{test_id}", f"b-{test_id}")
+    config = {'name': 'conformance', 'sample_size': 100, 'duration_days': 7}
+    repository.create_ab_test(test_id, config, 'votes', variants)
+
+    test = repository.load_ab_test(test_id)
+    assert test['status'] == 'running' and test['metric'] == 'votes' and test['config'] == config
+    assert test['p_value'] == 1.0 and test['winner'] is None
+    assert test['arms']['variant_b'] == {'variant_id': variants[1], 'n': 0, 'mean': 0.0, 'm2': 0.0}
+    assert repository.load_ab_test(str(uuid.uuid4())) is None
+
+    assert [row[:3] for row in repository.running_arms('votes', [variants[0]])] == [(test_id, 'variant_a', variants[0])]
+    assert repository.running_arms('evaluations', variants) == []
+    repository.update_arm(test_id, 'variant_a', 2, 3.5, 0.5)
+    assert repository.load_ab_test(test_id)['arms']['variant_a']['n'] == 2
+    assert any(row[0] == test_id for row in repository.running_ab_tests())
+
+    repository.add_votes([_vote_row(variants[0], f"user{i}", 4) for i in range(5)])
+    chunks = list(repository.observation_chunks('votes', variants, 2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1] and chunks[0][0] == (variants[0], 4)
+
+    test.update(status='completed', winner='variant_b', p_value=0.01)
+    repository.save_ab_test(test_id, test)
+    loaded = repository.load_ab_test(test_id)
+    assert (loaded['status'], loaded['winner'], loaded['p_value']) == ('completed', 'variant_b', 0.01)
+    assert loaded['arms']['variant_a']['n'] == 2
+    assert not any(row[0] == test_id for row in repository.running_ab_tests())
+    assert repository.running_arms('votes', variants) == []
+
+
+def check_evaluations(repository):
+    version_id = f"version-{uuid.uuid4()}"
+    rows = [(version_id, f"response {i}", '{}', 1 + i % 5, datetime.now()) for i in range(4)] + \
+        [(None, "unversioned", '{}', None, datetime.now())]
+    promoted = [[('accuracy', i / 4), ('latency_ms', 100.0 + i)] for i in range(5)]
+    first_id = repository.add_evaluations(rows, promoted)
+    assert repository.add_evaluations(rows[:1], [[]]) == first_id + 5
+
+    rollups = {row[1]: row[2:] for row in repository.evaluation_rollups(version_id)}
+    assert rollups == {'accuracy': (4, 1.5, 0.0, 0.75), 'latency_ms': (4, 406.0, 100.0, 103.0)}
+    assert [row[2:] for row in repository.evaluation_rollups('', 'accuracy')] == [(1, 1.0, 1.0, 1.0)]
+
+    assert repository.query_evaluations('accuracy', version_id, min_value=0.25, limit=2) == \
+        [(first_id + 3, version_id, 0.75), (first_id + 2, version_id, 0.5)]
+    assert repository.query_evaluations('accuracy', version_id, max_value=0.3, limit=5) == \
+        [(first_id + 1, version_id, 0.25), (first_id, version_id, 0.0)]
+    assert repository.query_evaluations('unknown') == []
+
+    chunks = list(repository.observation_chunks('evaluations', [version_id], 3))
+    assert sorted(value for chunk in chunks for value in chunk) == \
+        [(version_id, 1), (version_id, 1), (version_id, 2), (version_id, 3), (version_id, 4)]
+
+
+def check_repository(repository):
+    check_templates(repository)
+    check_votes_and_summary(repository)
+    check_ab_tests(repository)
+    check_evaluations(repository)
+
+
+def test_repositories():
+    print("Testing repositories...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'repository.db'))
+        initialize_database()
+        check_repository(SQLiteRepository())
+        print("✓ SQLite repository conforms")
+        db.configure(None)
+
+        check_repository(MemoryRepository())
+        print("✓ Memory repository conforms")
+
+        # The skills and SDK run on the memory repository without touching the database file
+        unused = os.path.join(tmp, 'unused.db')
+        db.configure(unused)
+        repositories.configure(MemoryRepository())
+        try:
+            initialize_database()
+            from src.sdk.context_engine import (create_template, update_template, list_template_versions,
+                                                rollback_template, execute_ab_test, get_ab_test, list_templates_page)
+            from src.sdk.smart_rewriter import (collect_votes_batch, generate_optimization, get_analytics,
+                                                log_evaluations, get_evaluation_metrics)
+
+            template_id = create_template("Memory", "", "v1")['template_id']
+            update_template(template_id, content="v2")
+            assert rollback_template(template_id, 1)['version'] == 3
+            assert len(list_template_versions(template_id)) == 3
+            assert list_templates_page(limit=10)['templates'][0]['id'] == template_id
+
+            test = execute_ab_test({'name': 'memory', 'sample_size': 1000, 'duration_days': 1}, 'mem-a', 'mem-b')
+            collect_votes_batch([{'prompt_id': 'mem-a', 'user_id': f"u{i}", 'score': 2 + i % 2} for i in range(20)]
+                                + [{'prompt_id': 'mem-b', 'user_id': f"u{i}", 'score': 4 + i % 2} for i in range(20)])
+            results = get_ab_test(test['test_id'])
+            assert results['variant_a']['n'] == 20 and results['variant_b_performance'] == 4.5
+
+            generate_optimization("memory prompt")
+            analytics = get_analytics()
+            assert analytics['vote_metrics']['total_votes'] == 40
+            assert analytics['optimization_metrics']['total_optimizations'] == 1
+
+            assert log_evaluations([{'version_id': 'mem-v', 'metrics': {'accuracy': 0.5}, 'human_score': 4}])['first_id'] == 1
+            assert get_evaluation_metrics('mem-v')[0]['mean'] == 0.5
+            assert not os.path.exists(unused)
+        finally:
+            repositories.configure(None)
+            db.configure(None)
+        print("✓ Skills run on the memory repository without disk I/O")
+
+    print("\nRepository tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_repositories()
@@ -4,10 +4,26 @@ Test script specifically for Smart Rewriter Module
 
 import os
 import sys
+import threading
+import uuid
 sys.path.insert(0, os.path.abspath('.'))
 
 from src.main import initialize_database
-from src.sdk.smart_rewriter import SmartRewriter, generate_optimization, collect_votes, get_analytics
+from src.sdk.smart_rewriter import SmartRewriter, generate_optimization, collect_votes, get_analytics, rebuild_analytics
+from src.skills.generate_optimization import generate_optimization as skill_generate_optimization
+from src.skills.optimizer_backends import StubBackend
+
+
+class CountingBackend(StubBackend):
+    """Stub backend that counts how often it is called"""
+
+    def __init__(self, latency):
+        super().__init__(latency)
+        self.calls = 0
+
+    def optimize(self, original_prompt, context=None, performance_data=None):
+        self.calls += 1
+        return super().optimize(original_prompt, context, performance_data)
 
 
 def test_smart_rewriter():
@@ -54,9 +70,31 @@ def test_smart_rewriter():
     )
     print(f"✓ Instance optimization: {instance_result['improvement_score']} improvement score")
     
+    # Identical requests are memoized, and concurrent duplicates share one backend call
+    backend = CountingBackend(latency=0.2)
+    prompt = f"Summarize the release notes ({uuid.uuid4()})"
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(skill_generate_optimization(prompt, {"tone": "brief"}, backend=backend)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    repeat = skill_generate_optimization(prompt, {"tone": "brief"}, backend=backend)
+    assert backend.calls == 1
+    assert len({result['optimization_id'] for result in results + [repeat]}) == 1
+    print(f"✓ Memoized optimization: {smart_rewriter.get_optimization_cache_stats()}")
+    
     instance_analytics = smart_rewriter.get_analytics()
     print(f"✓ Instance analytics retrieved: {len(instance_analytics)} metric categories")
     
+    # Incrementally maintained analytics must match a full rebuild
+    rebuilt_analytics = rebuild_analytics()
+    assert rebuilt_analytics == instance_analytics
+    print("✓ Incremental analytics match a full rebuild")
+    
     print("\nSmart Rewriter Module tests completed successfully!")
 
 
@@ -0,0 +1,111 @@
+"""
+Test script for full-text template search
+"""
+
+import io
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.abspath('.'))
+
+from src import db, repositories
+from src.api.routes import create_app
+from src.config import get_config
+from src.main import initialize_database, main
+from src.repositories.memory import MemoryRepository
+from src.sdk.context_engine import (create_template, update_template, delete_template, import_templates,
+                                    search_templates, ContextEngine)
+
+
+def ids(result):
+    return [row['id'] for row in result['results']]
+
+
+def check_search():
+    greeting = create_template("Customer greeting", "Welcomes new customers", "Hello {name}, welcome to our café!")['template_id']
+    refund = create_template("Refund policy", "", "Explain the refund process; end with a friendly greeting")['template_id']
+    summary = create_template("Summarize ticket", "Support", "Summarize the support ticket below in three bullets")['template_id']
+
+    # Name matches rank above content matches; diacritics are folded
+    assert ids(search_templates("greeting")) == [greeting, refund]
+    assert ids(search_templates("greet*")) == [greeting, refund]
+    assert ids(search_templates("cafe")) == [greeting]
+    assert ids(search_templates("support ticket")) == [summary]
+    result = search_templates("refund")
+    assert result['results'][0]['snippet'].count('<mark>') >= 1 and result['results'][0]['score'] > 0
+
+    # Query syntax is never passed through to FTS5
+    assert ids(search_templates('"greeting" (welcome')) == [greeting]
+    try:
+        search_templates(' "" - ')
+        assert False, "queries without terms should be rejected"
+    except ValueError:
+        pass
+
+    update_template(greeting, content="Goodbye {name}")
+    assert search_templates("cafe")['results'] == []
+    assert ids(search_templates("goodbye")) == [greeting]
+    update_template(refund, name="Returns policy")
+    assert ids(search_templates("returns")) == [refund]
+    delete_template(summary)
+    assert search_templates("ticket")['results'] == []
+
+    first = search_templates("greeting", limit=1)
+    assert len(first['results']) == 1 and first['next_offset'] == 1
+    assert ids(search_templates("greeting", limit=1, offset=1)) == [refund]
+
+
+def test_template_search():
+    print("Testing template search...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'search.db'))
+        initialize_database()
+        try:
+            check_search()
+            print("✓ SQLite index follows create, update and delete")
+
+            repositories.configure(MemoryRepository())
+            check_search()
+            print("✓ Memory repository ranks and snippets the same way")
+            repositories.configure(None)
+
+            lines = b''.join(b'{"name": "imported %d", "content": "zebra crossing %d"}\n' % (i, i) for i in range(30))
+            import_templates(io.BytesIO(lines))
+            assert len(search_templates("zebra", limit=100)['results']) == 30
+            assert not search_templates("zebra", limit=100)['truncated']
+            settings = get_config()['search']
+            settings['max_candidates'] = 10
+            try:
+                result = search_templates("zebra", limit=100)
+                assert len(result['results']) == 10 and result['truncated']
+                assert not search_templates("zebra crossing 7")['truncated']
+            finally:
+                settings['max_candidates'] = 0
+            print("✓ Rankings cut short by search.max_candidates are marked truncated")
+
+            client = create_app().test_client()
+            response = client.get('/templates/search?q=zeb*&limit=5')
+            assert response.status_code == 200
+            assert len(response.get_json()['results']) == 5 and response.get_json()['next_offset'] == 5
+            assert client.get('/templates/search?q=').status_code == 400
+            print("✓ Bulk imports are indexed and served by GET /templates/search")
+
+            # The index can be rebuilt from the templates table
+            db.get_connection().execute("INSERT INTO templates_fts (templates_fts) VALUES ('delete-all')")
+            db.get_connection().commit()
+            assert search_templates("zebra")['results'] == []
+            main(['rebuild-search'])
+            assert len(search_templates("zebra", limit=100)['results']) == 30
+            ContextEngine().rebuild_search_index()
+            assert len(search_templates("zebra", limit=100)['results']) == 30
+            print("✓ Search index rebuilds from the templates table")
+        finally:
+            repositories.configure(None)
+            db.configure(None)
+
+    print("\nTemplate search tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_template_search()
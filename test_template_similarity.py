@@ -0,0 +1,116 @@
+"""
+Test script for near-duplicate template detection
+"""
+
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, os.path.abspath('.'))
+
+from src import db, repositories
+from src.api.routes import create_app
+from src.main import initialize_database, main
+from src.repositories.memory import MemoryRepository
+from src.sdk.context_engine import (create_template, update_template, delete_template, find_similar_templates,
+                                    optimize_templates, ContextEngine)
+from src.skills.template_similarity import minhash, shingles, similarity
+
+BASE = ("You are a helpful support agent. Read the customer ticket below and summarize the problem "
+        "in three concise bullet points, then propose the next step for the {team} team. Quote the "
+        "customer's own words where they describe an error, list any order numbers you find, and flag "
+        "tickets that mention a refund, a security issue or a legal threat so a lead can review them first.")
+
+
+def check_similarity():
+    original = create_template("Ticket summary", "", BASE)['template_id']
+    edited = create_template("Ticket summary v2", "", BASE.replace("three", "four"))['template_id']
+    extended = create_template("Ticket summary v3", "", BASE + " Keep it friendly and brief.")['template_id']
+    other = create_template("Translate", "", "Translate the following paragraph into formal German "
+                            "and keep any code blocks unchanged.")['template_id']
+
+    similar = find_similar_templates(original)
+    assert {match['template_id'] for match in similar} == {edited, extended}
+    assert similar[0]['similarity'] >= similar[1]['similarity'] >= 0.7
+    assert find_similar_templates(other) == []
+    assert find_similar_templates('missing') is None
+    assert len(find_similar_templates(original, limit=1)) == 1
+
+    results = optimize_templates([original, edited, extended, other], dedupe='skip')
+    assert [result.get('duplicate_of') for result in results] == [None, original, original, None]
+    assert results[1]['skipped'] and 'optimization_result' in results[0] and 'optimization_result' in results[3]
+    grouped = optimize_templates([edited, original, other], dedupe='group')
+    assert grouped[1]['duplicate_of'] == edited and grouped[1]['template_id'] == original
+    assert grouped[1]['optimization_result'] == grouped[0]['optimization_result']
+    assert all('duplicate_of' not in result for result in optimize_templates([original, edited]))
+    try:
+        optimize_templates([original], dedupe='merge')
+        assert False, "unknown dedupe modes should be rejected"
+    except ValueError:
+        pass
+
+    # Signatures follow content changes and deletes
+    update_template(edited, content="Write a sonnet about the sea, in iambic pentameter, with a volta.")
+    update_template(extended, name="Renamed only")
+    assert [match['template_id'] for match in find_similar_templates(original)] == [extended]
+    delete_template(extended)
+    assert find_similar_templates(original) == []
+    return original
+
+
+def test_template_similarity():
+    print("Testing near-duplicate detection...")
+
+    rng = random.Random(3)
+    words = [f"w{i}" for i in range(500)]
+    errors = []
+    for _ in range(100):
+        a = [rng.choice(words) for _ in range(60)]
+        b = [word if rng.random() > 0.1 else rng.choice(words) for word in a]
+        shingles_a, shingles_b = shingles(' '.join(a)), shingles(' '.join(b))
+        jaccard = len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+        errors.append(similarity(minhash(' '.join(a)).tobytes(), [minhash(' '.join(b)).tobytes()])[0] - jaccard)
+    assert abs(sum(errors) / len(errors)) < 0.02 and max(map(abs, errors)) < 0.2
+    print("✓ MinHash estimates Jaccard similarity of shingles")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'similarity.db'))
+        initialize_database()
+        try:
+            original = check_similarity()
+            print("✓ SQLite signatures follow create, update and delete")
+
+            repositories.configure(MemoryRepository())
+            check_similarity()
+            print("✓ Memory repository finds the same near-duplicates")
+            repositories.configure(None)
+
+            copy = create_template("Copy", "", BASE)['template_id']
+            client = create_app().test_client()
+            response = client.get(f'/templates/{original}/similar?min_similarity=0.9')
+            assert response.status_code == 200 and response.get_json() == [{'template_id': copy, 'similarity': 1.0}]
+            assert client.get('/templates/missing/similar').status_code == 404
+            response = client.post('/optimize-context', json={'template_ids': [original, copy], 'dedupe': 'skip'})
+            assert response.get_json()[1] == {'template_id': copy, 'skipped': True, 'duplicate_of': original}
+            assert client.post('/optimize-context', json={'template_ids': [original], 'dedupe': 'x'}).status_code == 400
+            print("✓ API lists similar templates and dedupes optimizations")
+
+            conn = db.get_connection()
+            conn.execute("DELETE FROM template_lsh_buckets")
+            conn.execute("DELETE FROM template_signatures")
+            conn.commit()
+            # Unindexed templates are still compared against indexed ones
+            assert find_similar_templates(original) == []
+            main(['rebuild-similarity'])
+            assert [match['template_id'] for match in find_similar_templates(original)] == [copy]
+            assert ContextEngine().rebuild_similarity_index() >= 2
+            print("✓ Similarity index rebuilds from the templates table")
+        finally:
+            repositories.configure(None)
+            db.configure(None)
+
+    print("\nNear-duplicate detection tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_template_similarity()
@@ -0,0 +1,101 @@
+"""
+Test script for batched and buffered vote ingestion
+"""
+
+import os
+import sys
+import uuid
+sys.path.insert(0, os.path.abspath('.'))
+
+from src.main import initialize_database
+from src.api.routes import create_app
+from src.db import get_connection
+from src.skills.collect_votes import IdempotencyConflictError, VoteBuffer, _vote_row
+from src.sdk.smart_rewriter import collect_votes_batch
+
+
+def count_votes(prompt_id):
+    cursor = get_connection().execute("SELECT COUNT(*) FROM user_votes WHERE prompt_id = ?", (prompt_id,))
+    return cursor.fetchone()[0]
+
+
+def test_vote_ingestion():
+    print("Testing vote ingestion...")
+
+    initialize_database()
+    print("✓ Database initialized")
+
+    # Batch insert with an idempotency key
+    prompt_id = f"batch-{uuid.uuid4()}"
+    votes = [{'prompt_id': prompt_id, 'user_id': f"user{i}", 'score': i % 5 + 1} for i in range(1000)]
+    key = str(uuid.uuid4())
+    first = collect_votes_batch(votes, idempotency_key=key)
+    assert first['inserted'] == 1000
+    print(f"✓ Batch inserted: {first['inserted']} votes")
+
+    # Retrying the same request must not create duplicates
+    retry = collect_votes_batch(votes, idempotency_key=key)
+    assert retry['inserted'] == 0 and retry['duplicates'] == 1000
+    assert retry['vote_ids'] == first['vote_ids']
+    assert count_votes(prompt_id) == 1000
+    print("✓ Idempotent retry created no duplicate rows")
+
+    # Reusing the key for a different batch is a conflict, not a retry
+    try:
+        collect_votes_batch(votes[:999] + [dict(votes[999], score=1)], idempotency_key=key)
+        assert False, "a reused idempotency key must be rejected"
+    except IdempotencyConflictError:
+        pass
+    assert count_votes(prompt_id) == 1000
+    print("✓ Idempotency key reused for a different batch is rejected")
+
+    # Write-behind buffer group-commits on flush
+    buffer_prompt_id = f"buffer-{uuid.uuid4()}"
+    buffer = VoteBuffer(batch_size=10000, flush_interval=60)
+    for i in range(50):
+        buffer.add(_vote_row(buffer_prompt_id, f"user{i}", 3))
+    assert buffer.pending() == 50
+    assert count_votes(buffer_prompt_id) == 0
+    buffer.close()
+    assert buffer.pending() == 0
+    assert count_votes(buffer_prompt_id) == 50
+    print("✓ Buffered votes flushed on close")
+
+    # A row that can never be written is dropped instead of blocking the queue
+    buffer = VoteBuffer(batch_size=10000, flush_interval=60)
+    duplicate = _vote_row(buffer_prompt_id, "user0", 3, vote_id=first['vote_ids'][0])
+    for row in [_vote_row(buffer_prompt_id, "late0", 4), duplicate, _vote_row(buffer_prompt_id, "late1", 4)]:
+        buffer.add(row)
+    assert buffer.flush() == 2
+    assert buffer.pending() == 0 and buffer.dropped == 1
+    assert count_votes(buffer_prompt_id) == 52
+    buffer.close()
+    try:
+        _vote_row(buffer_prompt_id, "user0", True)
+        assert False, "bool scores must be rejected"
+    except ValueError:
+        pass
+    print("✓ Unwritable votes are dead-lettered and bool scores rejected")
+
+    # Bulk endpoint
+    client = create_app().test_client()
+    api_prompt_id = f"api-{uuid.uuid4()}"
+    payload = {'votes': [{'prompt_id': api_prompt_id, 'user_id': 'u', 'score': 5}] * 3}
+    headers = {'Idempotency-Key': str(uuid.uuid4())}
+    response = client.post('/votes/batch', json=payload, headers=headers)
+    assert response.status_code == 200 and response.json['inserted'] == 3
+    response = client.post('/votes/batch', json=payload, headers=headers)
+    assert response.json['inserted'] == 0
+    response = client.post('/votes/batch', json={'votes': payload['votes'][:2]}, headers=headers)
+    assert response.status_code == 409
+    response = client.post('/votes/batch', json={'votes': [{'prompt_id': 'p', 'user_id': 'u', 'score': 9}]})
+    assert response.status_code == 400
+    for score in (9, "4", True):
+        assert client.post('/votes', json={'prompt_id': 'p', 'user_id': 'u', 'score': score}).status_code == 400
+    print("✓ POST /votes/batch is idempotent and validates scores")
+
+    print("\nVote ingestion tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_vote_ingestion()
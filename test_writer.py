@@ -0,0 +1,116 @@
+"""
+Test script for the single-writer service
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
+sys.path.insert(0, os.path.abspath('.'))
+
+from src.main import initialize_database
+from src.db import get_connection
+from src.skills.collect_votes import _vote_row
+from src.writer import WriterClient, WriterService, WriterUnavailableError, key_file
+
+
+def count_votes(prompt_id):
+    return get_connection().execute("SELECT COUNT(*) FROM user_votes WHERE prompt_id = ?", (prompt_id,)).fetchone()[0]
+
+
+def test_writer():
+    print("Testing writer service...")
+
+    initialize_database()
+    print("✓ Database initialized")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = WriterService(os.path.join(tmp, 'writer.sock')).start()
+        client = WriterClient(service.address, timeout=10)
+        prompt_id = f"writer-{uuid.uuid4()}"
+
+        def send(thread):
+            for i in range(20):
+                client.call('collect_votes.insert_votes', ([_vote_row(prompt_id, f"user{thread}-{i}", 4)],))
+        threads = [threading.Thread(target=send, args=(n,)) for n in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert count_votes(prompt_id) == 200
+        stats = service.stats()
+        assert stats['operations'] >= 200 and stats['batches'] <= stats['operations']
+        print(f"✓ Concurrent writes from 10 clients committed in {stats['batches']} transactions")
+
+        bad_row = _vote_row(prompt_id, "bad", 4)[:3] + (9,) + _vote_row(prompt_id, "bad", 4)[4:]
+        try:
+            client.call('collect_votes.insert_votes', ([bad_row],))
+            assert False, "constraint violation should be raised to the caller"
+        except sqlite3.IntegrityError:
+            pass
+        try:
+            client.call('no_such.operation')
+            assert False, "unknown operations should be rejected"
+        except ValueError:
+            pass
+        assert client.call('collect_votes.insert_votes', ([_vote_row(prompt_id, "after", 5)],)) == 1
+        assert count_votes(prompt_id) == 201
+        print("✓ A failing operation is rolled back alone and its error reaches the caller")
+        client.close()
+
+        # Without a configured authkey the writer generates one that only its user can read
+        assert os.stat(key_file(service.address)).st_mode & 0o777 == 0o600
+        try:
+            WriterClient(service.address, authkey=b'guess', timeout=0.3).call('collect_votes.insert_votes', ([],))
+            assert False, "clients without the key should be refused"
+        except WriterUnavailableError:
+            pass
+        service.stop()
+        assert not os.path.exists(key_file(service.address))
+        for cls in (WriterService, WriterClient):
+            try:
+                cls('127.0.0.1:7788')
+                assert False, "TCP addresses need an explicit authkey"
+            except ValueError:
+                pass
+        print("✓ Clients authenticate with the configured or generated key")
+
+        # Separate processes: a writer, and a worker whose skill writes are routed to it
+        config_path = os.path.join(tmp, 'writer.yaml')
+        with open(config_path, 'w') as f:
+            f.write(f"writer:\n  enabled: true\n  address: {os.path.join(tmp, 'service.sock')}\n  timeout: 10\n")
+        env = dict(os.environ, PROMPTOPS_CONFIG=config_path, PROMPTOPS_DB_PATH=os.path.join(tmp, 'writer.db'))
+        writer = subprocess.Popen([sys.executable, '-m', 'src.main', 'writer'], env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            worker = subprocess.run([sys.executable, '-c', (
+                "from src import writer; "
+                "from src.sdk.context_engine import create_template, get_template; "
+                "from src.sdk.smart_rewriter import collect_votes; "
+                "template_id = create_template('Routed', '', 'Hi {name}')['template_id']; "
+                "collect_votes('routed', 'user', 5); "
+                "assert writer._local.conn is not None; "
+                "print(get_template(template_id)['content'])"
+            )], env=env, capture_output=True, text=True, timeout=60)
+            assert worker.returncode == 0, worker.stderr
+            assert worker.stdout.strip() == 'Hi {name}'
+        finally:
+            writer.terminate()
+            writer.wait(timeout=10)
+        print("✓ With writer.enabled, a worker's writes go through the writer process")
+
+        with open(config_path, 'w') as f:
+            f.write("writer:\n  enabled: true\n  address: 127.0.0.1:7788\n")
+        refused = subprocess.run([sys.executable, '-m', 'src.main', 'writer'], env=env,
+                                 capture_output=True, text=True, timeout=60)
+        assert refused.returncode != 0 and 'authkey' in refused.stderr
+        print("✓ A TCP writer without an authkey refuses to start")
+
+    print("\nWriter service tests completed successfully!")
+
+
+if __name__ == "__main__":
+    test_writer()